@@ -0,0 +1,140 @@
+"""
+Benchmark for the indicator engine.
+
+Runs every indicator over a synthetic random-walk series three ways: the vectorised
+batch functions, the incremental (one bar at a time) classes, and straightforward
+pure-Python loops. The loops double as a reference implementation, so the script also
+checks that all three agree before reporting timings.
+
+    python -m benchmarks.indicators_bench --bars 100000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from src.application.analysis import indicators as ind
+
+
+def naive_sma(values, period):
+    out = [math.nan] * len(values)
+    for i in range(period - 1, len(values)):
+        out[i] = sum(values[i - period + 1:i + 1]) / period
+    return out
+
+
+def naive_smoothed(values, period, alpha):
+    out = [math.nan] * len(values)
+    if len(values) < period:
+        return out
+    out[period - 1] = sum(values[:period]) / period
+    for i in range(period, len(values)):
+        out[i] = out[i - 1] + alpha * (values[i] - out[i - 1])
+    return out
+
+
+def naive_ema(values, period):
+    return naive_smoothed(values, period, 2 / (period + 1))
+
+
+def naive_rsi(close, period):
+    change = [close[i] - close[i - 1] for i in range(1, len(close))]
+    gain = naive_smoothed([max(c, 0.0) for c in change], period, 1 / period)
+    loss = naive_smoothed([max(-c, 0.0) for c in change], period, 1 / period)
+    out = [math.nan]
+    for g, l in zip(gain, loss):
+        out.append(math.nan if math.isnan(g) else 100.0 if l == 0 else 100 - 100 / (1 + g / l))
+    return out
+
+
+def naive_atr(high, low, close, period):
+    tr = [high[0] - low[0]]
+    for i in range(1, len(close)):
+        tr.append(max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])))
+    return naive_smoothed(tr, period, 1 / period)
+
+
+def naive_std(window, ddof=0):
+    mean = sum(window) / len(window)
+    return math.sqrt(sum((v - mean) ** 2 for v in window) / (len(window) - ddof))
+
+
+def naive_bollinger(close, period, width):
+    middle = naive_sma(close, period)
+    upper = [math.nan] * len(close)
+    for i in range(period - 1, len(close)):
+        upper[i] = middle[i] + width * naive_std(close[i - period + 1:i + 1])
+    return upper
+
+
+def naive_macd(close, fast, slow, signal):
+    line = [f - s for f, s in zip(naive_ema(close, fast), naive_ema(close, slow))]
+    return [math.nan] * (slow - 1) + naive_ema(line[slow - 1:], signal)
+
+
+def naive_volatility(close, period):
+    returns = [math.log(close[i] / close[i - 1]) for i in range(1, len(close))]
+    out = [math.nan] * len(close)
+    for i in range(period, len(close)):
+        out[i] = naive_std(returns[i - period:i], ddof=1)
+    return out
+
+
+def incremental(close, high, low):
+    sma, ema = ind.IncrementalSMA(20), ind.IncrementalEMA(12)
+    rsi, atr = ind.IncrementalRSI(14), ind.IncrementalATR(14)
+    bands, macd, vol = ind.IncrementalBollinger(20), ind.IncrementalMACD(), ind.IncrementalVolatility(20)
+    last = {}
+    for c, h, l in zip(close, high, low):
+        last = {
+            "sma": sma.update(c), "ema": ema.update(c), "rsi": rsi.update(c), "atr": atr.update(h, l, c),
+            "bollinger": bands.update(c), "macd": macd.update(c), "volatility": vol.update(c)
+        }
+    return {
+        "sma": last["sma"], "ema": last["ema"], "rsi": last["rsi"], "atr": last["atr"],
+        "bollinger": last["bollinger"][2], "macd": last["macd"][1], "volatility": last["volatility"]
+    }
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main(args):
+    rng = np.random.default_rng(7)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.0004, args.bars)))
+    high = close + np.abs(rng.normal(0, 0.0002, args.bars))
+    low = close - np.abs(rng.normal(0, 0.0002, args.bars))
+    lists = close.tolist(), high.tolist(), low.tolist()
+
+    cases = {
+        "sma": (lambda: ind.sma(close, 20), lambda: naive_sma(lists[0], 20)),
+        "ema": (lambda: ind.ema(close, 12), lambda: naive_ema(lists[0], 12)),
+        "rsi": (lambda: ind.rsi(close, 14), lambda: naive_rsi(lists[0], 14)),
+        "atr": (lambda: ind.atr(high, low, close, 14), lambda: naive_atr(lists[1], lists[2], lists[0], 14)),
+        "bollinger": (lambda: ind.bollinger(close, 20)[2], lambda: naive_bollinger(lists[0], 20, 2.0)),
+        "macd": (lambda: ind.macd(close)[1], lambda: naive_macd(lists[0], 12, 26, 9)),
+        "volatility": (lambda: ind.rolling_volatility(close, 20), lambda: naive_volatility(lists[0], 20)),
+    }
+
+    streamed, stream_time = timed(lambda: incremental(*lists))
+    print(f"{args.bars} bars")
+    print(f"{'indicator':>12} {'vectorised':>12} {'naive loop':>12} {'speedup':>9}")
+    for name, (vectorised, naive) in cases.items():
+        fast, fast_time = timed(vectorised)
+        slow, slow_time = timed(naive)
+        if not np.allclose(fast, np.array(slow), rtol=1e-7, atol=1e-10, equal_nan=True):
+            raise AssertionError(f"{name}: vectorised result differs from the reference loop")
+        if not math.isclose(fast[-1], streamed[name], rel_tol=1e-6, abs_tol=1e-9):
+            raise AssertionError(f"{name}: incremental result differs from the batch result")
+        print(f"{name:>12} {fast_time * 1000:>10.2f}ms {slow_time * 1000:>10.2f}ms {slow_time / fast_time:>8.0f}x")
+    print(f"incremental, all 7 indicators: {stream_time / args.bars * 1e6:.2f}us per bar")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorised vs incremental vs naive indicator timings")
+    parser.add_argument("--bars", type=int, default=100_000)
+    main(parser.parse_args())
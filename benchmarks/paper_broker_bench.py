@@ -0,0 +1,109 @@
+"""
+Throughput benchmark for the paper broker.
+
+In-process mode drives PaperBroker directly with a mix of market orders (with
+stop-loss/take-profit), resting limit orders, cancels and price updates. HTTP mode
+starts the v20 app on a local uvicorn server and posts the same market orders through
+httpx, which measures the REST surface the OANDA clients see.
+
+    python -m benchmarks.paper_broker_bench --orders 200000
+    python -m benchmarks.paper_broker_bench --http --orders 20000 --concurrency 64
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from src.infrastructure.paper_broker.paper_broker import PaperBroker, PaperBrokerError
+
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+
+
+def in_process(orders: int, seed: int = 7):
+    rng = random.Random(seed)
+    broker = PaperBroker(balance=1e12)
+    mids = {instrument: 1.0 + rng.random() for instrument in INSTRUMENTS}
+    for instrument, mid in mids.items():
+        broker.set_price(instrument, mid - 0.00005, mid + 0.00005)
+    resting = []
+
+    started = time.perf_counter()
+    for n in range(orders):
+        instrument = rng.choice(INSTRUMENTS)
+        mid = mids[instrument]
+        roll = rng.random()
+        units = rng.choice((-1, 1)) * rng.randint(1, 100) * 1000
+        if roll < 0.6:
+            broker.submit_order(instrument, units, take_profit=mid + 0.002 * (1 if units > 0 else -1),
+                                stop_loss=mid - 0.002 * (1 if units > 0 else -1))
+        elif roll < 0.9:
+            response = broker.submit_order(instrument, units, price=mid - 0.001 * (1 if units > 0 else -1))
+            resting.append(response["orderCreateTransaction"]["id"])
+        elif resting:
+            try:
+                broker.cancel_order(resting.pop(rng.randrange(len(resting))))
+            except PaperBrokerError:
+                pass  # Already filled.
+        if n % 10 == 0:
+            mids[instrument] = mid + rng.uniform(-0.0005, 0.0005)
+            broker.set_price(instrument, mids[instrument] - 0.00005, mids[instrument] + 0.00005)
+    elapsed = time.perf_counter() - started
+
+    print(f"in-process: {orders} orders in {elapsed:.2f}s = {orders / elapsed:,.0f} orders/s")
+    print(broker.stats())
+
+
+async def over_http(orders: int, concurrency: int, port: int):
+    import httpx
+    import uvicorn
+
+    from src.infrastructure.paper_broker.v20_app import app, paper_broker
+
+    paper_broker.balance = 1e12
+    for instrument in INSTRUMENTS:
+        paper_broker.set_price(instrument, 1.09995, 1.10005)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.1)
+
+    path = f"/v3/accounts/{paper_broker.account_id}/orders"
+    remaining = iter(range(orders))
+    latencies = []
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            body = {"order": {"type": "MARKET", "instrument": random.choice(INSTRUMENTS),
+                              "units": str(random.choice((-1000, 1000))), "timeInForce": "FOK"}}
+            sent = time.perf_counter()
+            response = await client.post(path, json=body)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - sent)
+
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}",
+                                     limits=httpx.Limits(max_connections=concurrency)) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+            elapsed = time.perf_counter() - started
+    finally:
+        server.should_exit = True
+        await server_task
+
+    latencies.sort()
+    print(f"http: {orders} orders in {elapsed:.2f}s = {orders / elapsed:,.0f} orders/s, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paper broker order throughput")
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--http", action="store_true", help="Go through the v20 REST surface instead")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    if args.http:
+        asyncio.run(over_http(args.orders, args.concurrency, args.port))
+    else:
+        in_process(args.orders)
@@ -0,0 +1,128 @@
+"""
+Load test for the /prices SSE endpoint.
+
+Starts the FastAPI app in-process on a single uvicorn worker, replaces the OANDA pricing
+stream with a synthetic feed, then opens an increasing number of concurrent /prices
+subscribers and reports delivered updates and end-to-end lag for each step. A step is
+considered sustained while the p99 lag stays under --max-lag seconds.
+
+    python -m benchmarks.prices_sse_load --steps 100,500,1000,2000 --duration 15
+
+On one x86_64 core (Python 3.11, clients in the same process as the server), 4 instruments
+at max_rate=4: 500 subscribers get ~7,800 updates/s with 98% delivered, p50 lag ~30ms and
+p99 70-100ms. At 750, conflation drops 15-18% of updates and p99 reaches ~500ms. At 1000,
+41% are delivered and p99 is ~1.5s (saturated).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+import httpx
+import uvicorn
+
+from server import app
+from src.infrastructure.oanda_api.price_hub import price_hub
+
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+
+
+class SyntheticStream:
+    """Stands in for AsyncOandaApiService: emits PRICE messages at a fixed rate per instrument."""
+
+    def __init__(self, ticks_per_second: float):
+        self.interval = 1 / ticks_per_second
+
+    async def stream_pricing(self, symbols):
+        prices = {symbol: 1.0 + random.random() for symbol in symbols}
+        while True:
+            for symbol in symbols:
+                prices[symbol] += random.uniform(-0.0005, 0.0005)
+                yield {
+                    "type": "PRICE",
+                    "instrument": symbol,
+                    "time": datetime.now(timezone.utc).isoformat(),
+                    "bids": [{"price": f"{prices[symbol]:.5f}"}],
+                    "asks": [{"price": f"{prices[symbol] + 0.0001:.5f}"}]
+                }
+            await asyncio.sleep(self.interval)
+
+    async def aclose(self):
+        pass
+
+
+async def subscriber(client: httpx.AsyncClient, url: str, lags: list, counts: list, stop: asyncio.Event):
+    try:
+        async with client.stream("GET", url) as response:
+            async for line in response.aiter_lines():
+                if stop.is_set():
+                    return
+                if not line.startswith("data:"):
+                    continue
+                now = time.time()
+                for _, tick_time, _, _ in json.loads(line[5:]):
+                    lags.append(now - datetime.fromisoformat(tick_time).timestamp())
+                    counts[0] += 1
+    except (httpx.HTTPError, asyncio.CancelledError):
+        pass
+
+
+async def run_step(port: int, subscribers: int, duration: float, max_rate: float):
+    lags, counts, stop = [], [0], asyncio.Event()
+    url = f"http://127.0.0.1:{port}/prices?instruments={','.join(INSTRUMENTS)}&max_rate={max_rate}"
+    limits = httpx.Limits(max_connections=subscribers, max_keepalive_connections=0)
+    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+        tasks = [asyncio.create_task(subscriber(client, url, lags, counts, stop)) for _ in range(subscribers)]
+        # Let connections settle before measuring.
+        await asyncio.sleep(2)
+        lags.clear()
+        counts[0] = 0
+        await asyncio.sleep(duration)
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    expected = subscribers * len(INSTRUMENTS) * max_rate * duration
+    p50 = statistics.median(lags) if lags else float("inf")
+    p99 = statistics.quantiles(lags, n=100)[98] if len(lags) >= 100 else float("inf")
+    return counts[0], expected, p50, p99
+
+
+async def main(args):
+    # The app configures INFO logging; one httpx line per subscriber would bury the table.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    price_hub.service_factory = lambda: SyntheticStream(args.tick_rate)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.1)
+
+    print(f"{'subscribers':>12} {'updates/s':>12} {'delivered':>10} {'p50 lag':>10} {'p99 lag':>10}  status")
+    try:
+        for subscribers in [int(step) for step in args.steps.split(",")]:
+            delivered, expected, p50, p99 = await run_step(args.port, subscribers, args.duration, args.max_rate)
+            status = "ok" if p99 <= args.max_lag else "saturated"
+            print(f"{subscribers:>12} {delivered / args.duration:>12.0f} {delivered / expected:>10.1%} "
+                  f"{p50 * 1000:>8.1f}ms {p99 * 1000:>8.1f}ms  {status}")
+            if status == "saturated":
+                break
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent subscriber load test for /prices")
+    parser.add_argument("--steps", default="100,250,500,1000,2000,4000")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--max-rate", type=float, default=4, help="Updates per second per instrument requested by each client")
+    parser.add_argument("--tick-rate", type=float, default=20, help="Synthetic upstream ticks per second per instrument")
+    parser.add_argument("--max-lag", type=float, default=1.0, help="p99 lag in seconds above which a step counts as saturated")
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
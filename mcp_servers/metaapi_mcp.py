@@ -1,6 +1,6 @@
 from mcp.server.fastmcp import FastMCP
-from src.infrastructure.meta_api.meta_api_service import MetaApiService
-from application.services.meta_trading_app_service import MetaTradingAppService
+from src.infrastructure.meta_api.connection_manager import metaapi_connections
+from src.application.services.meta_trading_app_service import MetaTradingAppService
 from src.model_types.common import MarketData
 
 mcp = FastMCP("trade")
@@ -10,42 +10,35 @@ async def get_active_positions():
     """
     Retrieve currently active (open) trading positions from the MetaTrader account.
 
-    This function initializes the MetaApi service, connects to the trading account, 
-    and fetches all open positions using the TradingAppService. It's designed to be 
+    This function borrows the warm MetaApi connection for the trading account from the
+    connection manager and fetches all open positions using the TradingAppService. It's designed to be 
     used as an MCP tool that provides visibility into the user's current trading activity.
 
     Workflow:
-    1. Initialize and authenticate with the MetaTrader account via MetaApiService.
+    1. Get a connected MetaApiService from the connection manager (deployed and synchronized
+       on first use, shared afterwards).
     2. Use TradingAppService to retrieve active/open positions.
     3. Print the retrieved positions for inspection or debugging purposes.
     4. Handle and log any exceptions that may occur.
-    5. Cleanly close the MetaApi connection and undeploy the account.
+
+    The account stays deployed after the call; the manager undeploys it once it has been idle
+    for METAAPI_IDLE_TIMEOUT seconds.
 
     Assumptions:
-    - `MetaApiService` provides async methods: `initialize()`, `connection.close()`, and `account.undeploy()`.
     - `TradingAppService` has an async method `get_active_positions()` that returns a list of current open trades.
 
     This tool is useful for monitoring live trades or debugging strategy performance.
     """
-    meta_api_service = MetaApiService()
-    await meta_api_service.initialize()
-    trading_service = MetaTradingAppService(meta_api_service)
-
     try:
-        # Fetch and print active trading positions
-        positions = await trading_service.get_active_positions()
-        print(f"Current positions: {positions}")
+        async with metaapi_connections.session() as meta_api_service:
+            trading_service = MetaTradingAppService(meta_api_service)
+            # Fetch and print active trading positions
+            positions = await trading_service.get_active_positions()
+            print(f"Current positions: {positions}")
 
     except Exception as e:
         print(f"Error occurred: {str(e)}")
 
-    finally:
-        # Cleanup resources
-        if meta_api_service.connection:
-            await meta_api_service.connection.close()
-        if meta_api_service.account:
-            await meta_api_service.account.undeploy()
-
 # @mcp.tool()
 async def monitor_market(market_data: MarketData):
     """
@@ -55,42 +48,31 @@ async def monitor_market(market_data: MarketData):
             market_data (MarketData): Contains the trading symbol (e.g., "GBPUSD").
 
         Steps:
-        1. Initializes MetaApiService and connects to MetaTrader.
+        1. Gets the shared, already connected MetaApiService from the connection manager.
         2. Uses TradingAppService to fetch live market data for the symbol.
         3. Prints the current data or logs any errors.
-        4. Cleans up by closing the connection and undeploying the account.
 
         Note: Requires async support in both MetaApiService and TradingAppService.
     """
 
-    # Initialize services
-    meta_api_service = MetaApiService()
-    await meta_api_service.initialize()
-    trading_service = MetaTradingAppService(meta_api_service)
-
     try:
-        # Monitor market
-        market_data = await trading_service.monitor_market(market_data.symbol)
-        print(f"Current market data for GBPUSD: {market_data}")
+        async with metaapi_connections.session() as meta_api_service:
+            trading_service = MetaTradingAppService(meta_api_service)
+            # Monitor market
+            market_data = await trading_service.monitor_market(market_data.symbol)
+            print(f"Current market data for GBPUSD: {market_data}")
 
     except Exception as e:
         print(f"Error occurred: {str(e)}")
 
-    finally:
-        # Cleanup
-        if meta_api_service.connection:
-            await meta_api_service.connection.close()
-        if meta_api_service.account:
-            await meta_api_service.account.undeploy()
-
 # @mcp.tool()
 async def place_trade():
     """
     Asynchronously places a trade using the MetaApi and TradingAppService.
 
     This function performs the following steps:
-    1. Initializes the MetaApiService to set up connection to the MetaTrader account.
-    2. Creates a TradingAppService instance using the initialized MetaApiService.
+    1. Gets the shared MetaApiService for the MetaTrader account from the connection manager.
+    2. Creates a TradingAppService instance using that MetaApiService.
     3. Attempts to place a trade with the specified parameters:
         - Symbol: "GBPUSD"
         - Trade type: Buy order ("ORDER_TYPE_BUY")
@@ -100,43 +82,28 @@ async def place_trade():
         - Take Profit: 1.15
     4. Prints the result of the trade if successful.
     5. If an exception occurs, prints the error message.
-    6. Finally, ensures proper cleanup by:
-        - Closing the connection to MetaTrader.
-        - Undeploying the MetaTrader account instance.
 
     Note:
-        This function assumes that the `MetaApiService` and `TradingAppService` 
-        are correctly implemented and support async operations such as `initialize`, 
-        `place_trade`, `close`, and `undeploy`.
+        The connection is left open for the next call; the connection manager closes it
+        and undeploys the account after METAAPI_IDLE_TIMEOUT seconds without use.
     """
-    # Initialize services
-    meta_api_service = MetaApiService()
-
-    await meta_api_service.initialize()
-    trading_service = MetaTradingAppService(meta_api_service)
-
     try:
-        # Place a trade
-        trade_result = await trading_service.place_trade(
-            symbol="GBPUSD",
-            trade_type="ORDER_TYPE_BUY",
-            volume=0.1,
-            price=1.1,
-            stop_loss=1.05,
-            take_profit=1.15
-        )
-        print(f"Trade executed: {trade_result}")
+        async with metaapi_connections.session() as meta_api_service:
+            trading_service = MetaTradingAppService(meta_api_service)
+            # Place a trade
+            trade_result = await trading_service.place_trade(
+                symbol="GBPUSD",
+                trade_type="ORDER_TYPE_BUY",
+                volume=0.1,
+                price=1.1,
+                stop_loss=1.05,
+                take_profit=1.15
+            )
+            print(f"Trade executed: {trade_result}")
 
     except Exception as e:
         print(f"Error occurred: {str(e)}")
 
-    finally:
-        # Cleanup
-        if meta_api_service.connection:
-            await meta_api_service.connection.close()
-        if meta_api_service.account:
-            await meta_api_service.account.undeploy()
-
 
 if __name__ == "__main__":
     # Initialize and run the server
@@ -1,9 +1,9 @@
 import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, List
 from mcp.server.fastmcp import FastMCP
 from src.bot.tools.common_nodes import simple_search
 from src.bot.tools.trade_tools import place_trade, get_active_positions
-from src.application.services.oanda_trading_app_service import OandaTradingAppService
+from src.infrastructure.oanda_api.price_hub import price_hub
 
 mcp = FastMCP("trade2")
 
@@ -43,13 +43,25 @@ def get_active_positions_tool() -> Any:
     return positions
 
 @mcp.tool()
-def monitor_market(symbols: list) -> None:
+async def monitor_market(symbols: list, seconds: float = 5) -> List[Dict[str, Any]]:
     """
     Monitor the market for a list of trading symbols.
     :param symbols: List of trading symbols (e.g., ["EUR_USD", "GBP_USD"])
+    :param seconds: How long to collect ticks for
+    :return: The latest tick per symbol seen during the window
     """
-    trading_service = OandaTradingAppService()
-    trading_service.monitor_market(symbols)
+    # Shares the hub's upstream stream instead of opening a blocking stream per call.
+    subscription = price_hub.subscribe(symbols, policy="conflate")
+    latest = {}
+    try:
+        async with asyncio.timeout(seconds):
+            async for tick in subscription:
+                latest[tick["instrument"]] = tick
+    except TimeoutError:
+        pass
+    finally:
+        await subscription.close()
+    return list(latest.values())
 
 if __name__ == "__main__":
     # place_trade_tool("EUR_USD", -100, 1.082, 1.097)
@@ -1,14 +1,29 @@
 import uvicorn
 from dotenv import load_dotenv
-from src.bot.utils import checkpoint_event, format_state_snapshot, interrupt_event, message_chunk_event, custom_event
+from src.bot.utils import checkpoint_event, format_state_snapshot, interrupt_event, message_chunk_event, custom_event, price_event
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sse_starlette.sse import EventSourceResponse
 import asyncio
+import os
 from typing import AsyncGenerator, Dict
 from langgraph.types import Command
 
 from src.bot.orchestrator_graph import graph, get_memory
+from src.bot.memory_pool import memory_pool
+from src.bot.memory_writer import memory_writer
+from src.bot.context import context_assembler
+from src.bot.summarizer import summarizer
+from src.bot.response_cache import response_cache
+from src.bot import llm
+from src.bot.tools import registry
+from src.bot import executors
+from src.infrastructure.oanda_api.client_pool import oanda_client_pool
+from src.infrastructure.oanda_api.price_hub import price_hub
+from src.infrastructure.oanda_api.account_state import account_state
+from src.infrastructure import rate_limiter, single_flight
+from src.infrastructure.market_data.tick_store import tick_store
+from src.infrastructure.market_data.bar_builder import bar_builder
 
 # Track active connections
 active_connections: Dict[str, asyncio.Event] = {}
@@ -39,6 +54,28 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def startup():
+    # Instruments the tick store keeps streaming regardless of other subscribers.
+    instruments = os.getenv("TICK_STORE_INSTRUMENTS", "")
+    await tick_store.start(symbol.strip() for symbol in instruments.split(",") if symbol.strip())
+    await bar_builder.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Persist any conversation memory still waiting in the write-behind queue.
+    await memory_writer.stop()
+    await summarizer.stop()
+    await llm.aclose()
+    executors.shutdown()
+    oanda_client_pool.close()
+    await tick_store.stop()
+    await bar_builder.stop()
+    await account_state.stop()
+    await price_hub.close()
+
+
 @app.post("/agent")
 async def agent(request: Request):
     """Endpoint for running the agent."""
@@ -113,6 +150,8 @@ async def agent(request: Request):
                     yield message_chunk_event(chunk_data[1]["langgraph_node"], chunk_data[0])
                 elif chunk_type == "custom":
                     yield custom_event(chunk_data)
+            # The turn is over; compress old messages without holding up the client.
+            summarizer.schedule(graph, config)
         finally:
             if thread_id in active_connections:
                 del active_connections[thread_id]
@@ -156,6 +195,35 @@ async def history(thread_id: str | None = None):
     }
 
 
+# Server-side cap on /prices updates per second per instrument.
+PRICES_MAX_RATE = float(os.getenv("PRICES_MAX_RATE", "10"))
+if PRICES_MAX_RATE <= 0:
+    raise ValueError("PRICES_MAX_RATE must be positive")
+
+
+@app.get("/prices")
+async def prices(request: Request, instruments: str | None = None, max_rate: float | None = None):
+    """Endpoint streaming live prices, conflated to at most max_rate updates per second per instrument."""
+    if not instruments:
+        raise HTTPException(status_code=400, detail="instruments is required")
+    if max_rate is not None and max_rate <= 0:
+        raise HTTPException(status_code=422, detail="max_rate must be positive")
+    symbols = [symbol.strip() for symbol in instruments.split(",") if symbol.strip()]
+    interval = 1 / min(max_rate or PRICES_MAX_RATE, PRICES_MAX_RATE)
+
+    async def generate_events() -> AsyncGenerator[dict, None]:
+        # Conflation keeps only the latest tick per instrument between sends.
+        subscription = price_hub.subscribe(symbols, policy="conflate")
+        try:
+            while not await request.is_disconnected():
+                yield price_event(await subscription.drain())
+                await asyncio.sleep(interval)
+        finally:
+            await subscription.close()
+
+    return EventSourceResponse(generate_events())
+
+
 @app.post("/agent/stop")
 async def stop_agent(request: Request):
     """Endpoint for stopping the running agent."""
@@ -169,6 +237,35 @@ async def stop_agent(request: Request):
         return {"status": "stopped", "thread_id": thread_id}
     raise HTTPException(status_code=404, detail="Thread is not running")
 
+@app.get("/metrics")
+async def metrics():
+    """Endpoint returning runtime counters used to size the caches and pools."""
+    return {
+        "memory_pool": memory_pool.stats(),
+        "memory_writer": memory_writer.stats(),
+        "embedding_cache": memory_pool.embedding_cache_stats(),
+        "context": context_assembler.stats(),
+        "summarizer": summarizer.stats(),
+        "response_cache": response_cache.stats(),
+        "tools": registry.stats(),
+        "thread_pools": executors.stats(),
+        "oanda_clients": oanda_client_pool.stats(),
+        "price_hub": price_hub.stats(),
+        "tick_store": tick_store.stats(),
+        "bar_builder": bar_builder.stats(),
+        "account_state": account_state.stats(),
+        "single_flight": single_flight.stats(),
+        "rate_limiter": rate_limiter.stats()
+    }
+
+
+@app.get("/health")
+async def health():
+    """Endpoint checking the pooled broker connections."""
+    return {
+        "oanda": await executors.run_blocking("broker", oanda_client_pool.health_check)
+    }
+
 def main():
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
 
@@ -0,0 +1,285 @@
+import math
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Batch indicators take NumPy arrays and return arrays of the same length, NaN where the
+# window is not full yet. EMA-style indicators are seeded with the SMA of their first
+# `period` values (TA-Lib convention), and the incremental classes below follow the same
+# rules so both modes produce identical numbers.
+
+
+def _nan(length: int) -> np.ndarray:
+    return np.full(length, np.nan)
+
+
+def _recursive(x: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t] with y[-1] = seed, without a Python loop.
+
+    Within a block, y[t] = d^(t+1) * y0 + alpha * d^t * cumsum(x[k] * d^-k). Blocks are kept
+    short enough that d^-k stays far from float64 overflow.
+    """
+    decay = 1.0 - alpha
+    if decay == 0.0:
+        return x.astype(np.float64)
+    block = max(1, min(1024, int(200 / -math.log10(decay))))
+    out = np.empty(len(x))
+    previous = seed
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        powers = decay ** np.arange(len(chunk))
+        acc = np.cumsum(chunk / powers)
+        out[start:start + len(chunk)] = decay * powers * previous + alpha * powers * acc
+        previous = out[start + len(chunk) - 1]
+    return out
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    out = _nan(len(values))
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).mean(axis=1)
+    return out
+
+
+def _smoothed(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    out = _nan(len(values))
+    if len(values) >= period:
+        seed = values[:period].mean()
+        out[period - 1] = seed
+        out[period:] = _recursive(values[period:], alpha, seed)
+    return out
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    return _smoothed(values, period, 2.0 / (period + 1))
+
+
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder's smoothing (RMA), used by RSI and ATR
+    """
+    return _smoothed(values, period, 1.0 / period)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    out = _nan(len(close))
+    if len(close) <= period:
+        return out
+    change = np.diff(close)
+    gain = wilder(np.clip(change, 0, None), period)
+    loss = wilder(np.clip(-change, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    out[1:period] = np.nan
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous = np.concatenate(([np.nan], close[:-1]))
+    ranges = np.vstack((high - low, np.abs(high - previous), np.abs(low - previous)))
+    return np.nanmax(ranges, axis=0)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    return wilder(true_range(high, low, close), period)
+
+
+def bollinger(close: np.ndarray, period: int = 20, width: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :return: lower, middle and upper bands (population standard deviation)
+    """
+    middle = sma(close, period)
+    deviation = _nan(len(close))
+    if len(close) >= period:
+        deviation[period - 1:] = sliding_window_view(close, period).std(axis=1)
+    return middle - width * deviation, middle, middle + width * deviation
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :return: MACD line, signal line and histogram
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = _nan(len(close))
+    valid = slow - 1
+    if len(close) > valid:
+        signal_line[valid:] = ema(line[valid:], signal)
+    return line, signal_line, line - signal_line
+
+
+def rolling_volatility(close: np.ndarray, period: int = 20) -> np.ndarray:
+    """
+    Sample standard deviation of log returns over `period` bars (not annualised)
+    """
+    out = _nan(len(close))
+    if len(close) > period:
+        returns = np.diff(np.log(close))
+        out[period:] = sliding_window_view(returns, period).std(axis=1, ddof=1)
+    return out
+
+
+class IncrementalSMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    def update(self, value: float) -> Optional[float]:
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        return self.total / self.period if len(self.window) == self.period else None
+
+
+class IncrementalEMA:
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        self.period = period
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1)
+        self.seed = IncrementalSMA(period)
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> Optional[float]:
+        if self.value is None:
+            self.value = self.seed.update(value)
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class IncrementalRSI:
+    def __init__(self, period: int = 14):
+        self.gain = IncrementalEMA(period, 1.0 / period)
+        self.loss = IncrementalEMA(period, 1.0 / period)
+        self.previous: Optional[float] = None
+
+    def update(self, close: float) -> Optional[float]:
+        if self.previous is None:
+            self.previous = close
+            return None
+        change = close - self.previous
+        self.previous = close
+        gain = self.gain.update(max(change, 0.0))
+        loss = self.loss.update(max(-change, 0.0))
+        if gain is None:
+            return None
+        return 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+class IncrementalATR:
+    def __init__(self, period: int = 14):
+        self.average = IncrementalEMA(period, 1.0 / period)
+        self.previous: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        if self.previous is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.previous), abs(low - self.previous))
+        self.previous = close
+        return self.average.update(tr)
+
+
+class _RollingMoments:
+    """
+    O(1) rolling mean and variance over a fixed window
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.squares = 0.0
+
+    def update(self, value: float) -> bool:
+        if len(self.window) == self.period:
+            old = self.window[0]
+            self.total -= old
+            self.squares -= old * old
+        self.window.append(value)
+        self.total += value
+        self.squares += value * value
+        return len(self.window) == self.period
+
+    def mean(self) -> float:
+        return self.total / self.period
+
+    def variance(self, ddof: int = 0) -> float:
+        mean = self.mean()
+        return max(self.squares - self.period * mean * mean, 0.0) / (self.period - ddof)
+
+
+class IncrementalBollinger:
+    def __init__(self, period: int = 20, width: float = 2.0):
+        self.moments = _RollingMoments(period)
+        self.width = width
+
+    def update(self, close: float) -> Optional[Tuple[float, float, float]]:
+        if not self.moments.update(close):
+            return None
+        middle = self.moments.mean()
+        deviation = math.sqrt(self.moments.variance())
+        return middle - self.width * deviation, middle, middle + self.width * deviation
+
+
+class IncrementalMACD:
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = IncrementalEMA(fast)
+        self.slow = IncrementalEMA(slow)
+        self.signal = IncrementalEMA(signal)
+
+    def update(self, close: float) -> Optional[Tuple[float, Optional[float], Optional[float]]]:
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is None or slow is None:
+            return None
+        line = fast - slow
+        signal = self.signal.update(line)
+        return line, signal, line - signal if signal is not None else None
+
+
+class IncrementalVolatility:
+    def __init__(self, period: int = 20):
+        self.moments = _RollingMoments(period)
+        self.previous: Optional[float] = None
+
+    def update(self, close: float) -> Optional[float]:
+        if self.previous is None:
+            self.previous = close
+            return None
+        full = self.moments.update(math.log(close / self.previous))
+        self.previous = close
+        return math.sqrt(self.moments.variance(ddof=1)) if full else None
+
+
+def _last(values: np.ndarray) -> Optional[float]:
+    return None if len(values) == 0 or np.isnan(values[-1]) else round(float(values[-1]), 6)
+
+
+def summarize(bars: Dict[str, np.ndarray]) -> Dict[str, Optional[float]]:
+    """
+    Latest value of every indicator for a set of OHLC columns
+    """
+    high, low, close = bars["high"], bars["low"], bars["close"]
+    lower, middle, upper = bollinger(close)
+    line, signal, histogram = macd(close)
+    return {
+        "close": _last(close),
+        "sma_20": _last(sma(close, 20)),
+        "sma_50": _last(sma(close, 50)),
+        "ema_12": _last(ema(close, 12)),
+        "ema_26": _last(ema(close, 26)),
+        "rsi_14": _last(rsi(close, 14)),
+        "atr_14": _last(atr(high, low, close, 14)),
+        "bollinger_lower": _last(lower),
+        "bollinger_middle": _last(middle),
+        "bollinger_upper": _last(upper),
+        "macd": _last(line),
+        "macd_signal": _last(signal),
+        "macd_histogram": _last(histogram),
+        "volatility_20": _last(rolling_volatility(close, 20))
+    }
@@ -0,0 +1,166 @@
+import itertools
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.application.analysis.indicators import sma
+from src.application.backtest.simulated_broker import FixedSpread, SimulatedBroker
+from src.infrastructure.market_data.candle_store import candle_store
+
+
+class Strategy(ABC):
+    """
+    Event-driven strategy. `on_bar` sees each closed bar (or tick) and trades through the broker's
+    TradingService methods, exactly as it would against a live broker.
+    """
+
+    async def on_start(self, broker: SimulatedBroker):
+        pass
+
+    @abstractmethod
+    async def on_bar(self, broker: SimulatedBroker, symbol: str, bar: Dict[str, float]):
+        pass
+
+
+def performance(equity: np.ndarray, trades: int, wins: int) -> Dict[str, Any]:
+    """
+    Headline numbers for an equity curve sampled once per bar
+    """
+    if len(equity) < 2:
+        return {"return": 0.0, "max_drawdown": 0.0, "sharpe": 0.0, "trades": trades, "win_rate": None}
+    returns = np.diff(equity) / equity[:-1]
+    peak = np.maximum.accumulate(equity)
+    std = returns.std()
+    return {
+        "return": float(equity[-1] / equity[0] - 1),
+        "max_drawdown": float(((peak - equity) / peak).max()),
+        # Per-bar Sharpe ratio; scale by sqrt(bars per year) to annualise.
+        "sharpe": float(returns.mean() / std) if std > 0 else 0.0,
+        "trades": trades,
+        "win_rate": wins / trades if trades else None
+    }
+
+
+async def run_backtest(strategy: Strategy, bars: Dict[str, np.ndarray], symbol: str,
+                       broker: Optional[SimulatedBroker] = None) -> Dict[str, Any]:
+    """
+    Event-driven path: replay bars (or ticks) one by one through a SimulatedBroker.
+    Use it for strategies with stops, targets, limit orders or state; plain signal
+    strategies are much faster through `vectorized_backtest`.
+    :param bars: time, open, high, low, close columns, e.g. from candle_store.load, or
+        time, bid, ask tick columns, e.g. from tick_store.last_n
+    """
+    broker = broker or SimulatedBroker()
+    await strategy.on_start(broker)
+    ticks = "bid" in bars
+    names = ("time", "bid", "ask") if ticks else ("time", "open", "high", "low", "close")
+    equity = np.empty(len(bars["time"]))
+    for i, row in enumerate(zip(*(bars[name].tolist() for name in names))):
+        if ticks:
+            broker.on_tick(symbol, *row)
+        else:
+            broker.on_bar(symbol, *row)
+        await strategy.on_bar(broker, symbol, dict(zip(names, row)))
+        equity[i] = broker.equity()
+    broker.close_all()
+    if len(equity):
+        equity[-1] = broker.equity()
+    wins = sum(1 for trade in broker.closed_trades if trade.pnl > 0)
+    return {**performance(equity, len(broker.closed_trades), wins), "equity": equity, "broker": broker}
+
+
+def vectorized_backtest(close: np.ndarray, position: np.ndarray, units: float = 10_000,
+                        balance: float = 100_000.0, spread=None, slippage: float = 0.0) -> Dict[str, Any]:
+    """
+    Fast path for signal strategies, with no per-bar Python code.
+
+    `position[t]` is the target exposure (-1, 0, 1 or fractions) decided on bar t's close
+    and held over bar t + 1. Every change in exposure pays half the spread plus slippage,
+    matching SimulatedBroker's market fills at the close. Stops and limit orders need
+    `run_backtest`.
+    """
+    spread = spread or FixedSpread()
+    # Spread models are plain arithmetic, so they accept the whole close array.
+    cost_per_unit = np.broadcast_to(spread(close) / 2 + slippage, close.shape)
+    held = np.concatenate(([0.0], position[:-1])) * units
+    traded = np.abs(np.diff(np.concatenate(([0.0], position)))) * units
+    gross = held * np.diff(close, prepend=close[0])
+    pnl = gross - traded * cost_per_unit
+    # Closing the final exposure is charged too, as run_backtest closes everything at the end.
+    pnl[-1] -= abs(position[-1]) * units * cost_per_unit[-1]
+    equity = balance + np.cumsum(pnl)
+
+    # A round trip runs from one exposure change to the next while a position is held.
+    changes = np.flatnonzero(np.diff(np.concatenate(([0.0], position, [0.0]))))
+    starts, ends = changes[:-1], np.minimum(changes[1:], len(close) - 1)
+    held_segments = position[starts] != 0
+    starts, ends = starts[held_segments], ends[held_segments]
+    cumulative = np.concatenate(([0.0], np.cumsum(gross)))
+    trade_pnl = (cumulative[ends + 1] - cumulative[starts + 1]
+                 - np.abs(position[starts]) * units * (cost_per_unit[starts] + cost_per_unit[ends]))
+    wins = int((trade_pnl > 0).sum())
+    return {**performance(equity, len(starts), wins), "equity": equity}
+
+
+def sma_cross_signal(bars: Dict[str, np.ndarray], fast: int = 10, slow: int = 50) -> np.ndarray:
+    """
+    Long when the fast SMA is above the slow one, short when below
+    """
+    close = bars["close"]
+    return np.nan_to_num(np.sign(sma(close, fast) - sma(close, slow)))
+
+
+def _evaluate(signal: Callable[..., np.ndarray], instrument: str, granularity: str,
+              start: Optional[float], end: Optional[float], options: Dict[str, Any],
+              params: Dict[str, Any]) -> Dict[str, Any]:
+    # Each worker maps the cached columns itself; the OS page cache shares them across processes.
+    bars = candle_store.load(instrument, granularity, start, end)
+    result = vectorized_backtest(bars["close"], signal(bars, **params), **options)
+    result.pop("equity")
+    return {"params": params, **result}
+
+
+def sweep(signal: Callable[..., np.ndarray], grid: Dict[str, Iterable], instrument: str, granularity: str,
+          start: Optional[float] = None, end: Optional[float] = None, processes: Optional[int] = None,
+          **options) -> List[Dict[str, Any]]:
+    """
+    Run the vectorised backtest for every combination in `grid` across a process pool.
+    `signal` must be a module-level function (it is pickled to the workers) taking the bar
+    columns plus the grid parameters and returning target positions.
+    :return: One result per combination, best return first
+    """
+    names = list(grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    run = partial(_evaluate, signal, instrument, granularity, start, end, options)
+    processes = processes or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = list(pool.map(run, combinations, chunksize=max(1, len(combinations) // (4 * processes))))
+    return sorted(results, key=lambda result: result["return"], reverse=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="SMA crossover parameter sweep over cached candles")
+    parser.add_argument("instrument")
+    parser.add_argument("granularity")
+    parser.add_argument("--fast", default="5,10,20")
+    parser.add_argument("--slow", default="50,100,200")
+    parser.add_argument("--spread", type=float, default=0.0001)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = sweep(
+        sma_cross_signal,
+        {"fast": [int(v) for v in args.fast.split(",")], "slow": [int(v) for v in args.slow.split(",")]},
+        args.instrument, args.granularity, processes=args.processes, spread=FixedSpread(args.spread)
+    )
+    for result in results[:10]:
+        print(result)
+    print(f"{len(results)} runs in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,223 @@
+import itertools
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.domain.entities.trade import Trade
+from src.domain.interfaces.trading_service import TradingService
+
+
+@dataclass
+class FixedSpread:
+    """
+    Constant spread in price units (e.g. 0.0001 for one EUR_USD pip)
+    """
+    spread: float = 0.0001
+
+    def __call__(self, mid: float) -> float:
+        return self.spread
+
+
+@dataclass
+class RelativeSpread:
+    """
+    Spread proportional to price, in basis points
+    """
+    bps: float = 1.0
+
+    def __call__(self, mid: float) -> float:
+        return mid * self.bps / 10_000
+
+
+@dataclass
+class FixedSlippage:
+    """
+    Every market, stop-loss and take-profit fill is `amount` worse than the quote
+    """
+    amount: float = 0.0
+
+    def __call__(self) -> float:
+        return self.amount
+
+
+@dataclass
+class RandomSlippage:
+    """
+    Adverse slippage drawn from |N(0, std)|, seeded so runs are repeatable
+    """
+    std: float = 0.00005
+    seed: int = 0
+    _rng: random.Random = field(default=None, repr=False)
+
+    def __call__(self) -> float:
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        return abs(self._rng.gauss(0, self.std))
+
+
+@dataclass
+class SimulatedTrade:
+    id: str
+    symbol: str
+    units: float
+    price: float
+    open_time: float
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    comment: Optional[str] = None
+    client_id: Optional[str] = None
+    close_price: Optional[float] = None
+    close_time: Optional[float] = None
+    close_reason: Optional[str] = None
+
+    @property
+    def pnl(self) -> Optional[float]:
+        return None if self.close_price is None else self.units * (self.close_price - self.price)
+
+
+@dataclass
+class _Quote:
+    time: float
+    bid: float
+    ask: float
+    bid_high: float
+    bid_low: float
+    ask_high: float
+    ask_low: float
+
+
+class SimulatedBroker(TradingService):
+    """
+    Backtesting broker behind the same TradingService contract as the live brokers, so a
+    strategy written against OandaApiService or MetaApiService runs here unchanged.
+
+    Prices are replayed with `on_bar` (mid OHLC candles, bid/ask derived from the spread
+    model) or `on_tick` (explicit bid/ask). Market orders fill at the current quote plus
+    slippage; a Trade with an open_price rests as a limit order until the price trades
+    through it. Stop-loss and take-profit are checked against each bar's range; when both
+    fall inside the same bar the stop is assumed to have filled first.
+    """
+
+    def __init__(self, balance: float = 100_000.0, spread=None, slippage=None):
+        self.initial_balance = balance
+        self.balance = balance
+        self.spread = spread or FixedSpread()
+        self.slippage = slippage or FixedSlippage()
+        self.quotes: Dict[str, _Quote] = {}
+        self.open_trades: Dict[str, SimulatedTrade] = {}
+        self.pending: Dict[str, SimulatedTrade] = {}
+        self.closed_trades: List[SimulatedTrade] = []
+        self._ids = itertools.count(1)
+
+    # Price updates
+
+    def on_bar(self, symbol: str, time: float, open: float, high: float, low: float, close: float):
+        half = self.spread(close) / 2
+        self._update(symbol, _Quote(
+            time, close - half, close + half,
+            bid_high=high - half, bid_low=low - half, ask_high=high + half, ask_low=low + half
+        ))
+
+    def on_tick(self, symbol: str, time: float, bid: float, ask: float):
+        self._update(symbol, _Quote(time, bid, ask, bid, bid, ask, ask))
+
+    def _update(self, symbol: str, quote: _Quote):
+        self.quotes[symbol] = quote
+        for trade in [t for t in self.pending.values() if t.symbol == symbol]:
+            if trade.units > 0 and quote.ask_low <= trade.price or trade.units < 0 and quote.bid_high >= trade.price:
+                del self.pending[trade.id]
+                trade.open_time = quote.time
+                self.open_trades[trade.id] = trade
+        for trade in [t for t in self.open_trades.values() if t.symbol == symbol]:
+            self._check_exits(trade, quote)
+
+    def _check_exits(self, trade: SimulatedTrade, quote: _Quote):
+        if trade.units > 0:
+            stopped = trade.stop_loss is not None and quote.bid_low <= trade.stop_loss
+            target = trade.take_profit is not None and quote.bid_high >= trade.take_profit
+        else:
+            stopped = trade.stop_loss is not None and quote.ask_high >= trade.stop_loss
+            target = trade.take_profit is not None and quote.ask_low <= trade.take_profit
+        if stopped:
+            self._close(trade, self._slipped(trade.stop_loss, -trade.units), quote.time, "STOP_LOSS")
+        elif target:
+            self._close(trade, trade.take_profit, quote.time, "TAKE_PROFIT")
+
+    # Fills
+
+    def _slipped(self, price: float, units: float) -> float:
+        # Buys fill higher, sells lower.
+        slip = self.slippage()
+        return price + slip if units > 0 else price - slip
+
+    def _quote(self, symbol: str) -> _Quote:
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            raise ValueError(f"No price for {symbol} yet")
+        return quote
+
+    def _close(self, trade: SimulatedTrade, price: float, time: float, reason: str):
+        trade.close_price = price
+        trade.close_time = time
+        trade.close_reason = reason
+        self.balance += trade.pnl
+        del self.open_trades[trade.id]
+        self.closed_trades.append(trade)
+
+    def close_trade(self, trade_id: str) -> SimulatedTrade:
+        trade = self.open_trades[trade_id]
+        quote = self._quote(trade.symbol)
+        exit_price = quote.bid if trade.units > 0 else quote.ask
+        self._close(trade, self._slipped(exit_price, -trade.units), quote.time, "MARKET")
+        return trade
+
+    def close_all(self, symbol: Optional[str] = None):
+        for trade_id in [t.id for t in self.open_trades.values() if symbol is None or t.symbol == symbol]:
+            self.close_trade(trade_id)
+
+    # TradingService
+
+    async def execute_trade(self, trade: Trade):
+        """
+        Sell types go in as negative units; a trade with an open_price becomes a limit order
+        """
+        units = -abs(trade.volume) if "SELL" in trade.type.upper() else abs(trade.volume)
+        quote = self._quote(trade.symbol)
+        simulated = SimulatedTrade(
+            id=str(next(self._ids)), symbol=trade.symbol, units=units, price=trade.open_price,
+            open_time=quote.time, stop_loss=trade.stop_loss, take_profit=trade.take_profit,
+            comment=trade.comment, client_id=trade.client_id
+        )
+        if trade.open_price:
+            self.pending[simulated.id] = simulated
+            return {"orderCreateTransaction": {"id": simulated.id, "type": "LIMIT_ORDER"}}
+        simulated.price = self._slipped(quote.ask if units > 0 else quote.bid, units)
+        self.open_trades[simulated.id] = simulated
+        return {"orderFillTransaction": {"id": simulated.id, "price": simulated.price, "units": units}}
+
+    async def get_market_data(self, symbol: str):
+        quote = self._quote(symbol)
+        return {"instrument": symbol, "time": quote.time, "bid": quote.bid, "ask": quote.ask}
+
+    async def get_positions(self):
+        positions: Dict[str, Dict[str, Any]] = {}
+        for trade in self.open_trades.values():
+            position = positions.setdefault(trade.symbol, {"instrument": trade.symbol, "units": 0.0, "trades": []})
+            position["units"] += trade.units
+            position["trades"].append(trade.id)
+        return list(positions.values())
+
+    async def monitor_position(self, position_id: str):
+        return self.open_trades.get(position_id) or self.pending.get(position_id)
+
+    # Account
+
+    def unrealized_pnl(self) -> float:
+        total = 0.0
+        for trade in self.open_trades.values():
+            quote = self.quotes[trade.symbol]
+            total += trade.units * ((quote.bid if trade.units > 0 else quote.ask) - trade.price)
+        return total
+
+    def equity(self) -> float:
+        return self.balance + self.unrealized_pnl()
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import uuid
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Set
+
+from ...domain.entities.trade import Trade
+from ...domain.interfaces.trading_service import TradingService
+from ...infrastructure.rate_limiter import RateLimitTimeout
+
+
+class BulkOrderService:
+    """
+    Places a basket of trades (a rebalance, a spread, a set of hedges) in one call.
+
+    The batch is validated as a whole first: a malformed leg, or two legs sharing a
+    client id, rejects the entire batch before anything is sent, so a rebalance never
+    half-executes because of a typo. Valid batches are dispatched concurrently; pacing
+    against the broker's limits is left to the adapter's rate limiter, where orders
+    already queue ahead of reads. Broker failures are per leg: every order gets its own
+    result and the others still go through.
+
+    The whole batch answers within `timeout` seconds, so callers never lose the per-leg
+    results to an outer deadline. A leg still waiting for a slot at the deadline is
+    reported `not_sent` (safe to retry). A leg that was sent but has not answered is
+    reported `unknown` and left running; check it by client id before retrying.
+    """
+
+    def __init__(self, trading_service: TradingService, max_orders: int = 50, max_concurrency: int = 8,
+                 timeout: float = 40.0):
+        self.trading_service = trading_service
+        self.max_orders = max_orders
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # Legs past the batch deadline, referenced so they finish instead of being collected.
+        self._unfinished: Set[asyncio.Task] = set()
+
+    def validate(self, trades: List[Trade]) -> List[Optional[str]]:
+        """
+        One error message (or None) per trade
+        """
+        errors: List[Optional[str]] = []
+        client_ids = [trade.client_id for trade in trades if trade.client_id]
+        for trade in trades:
+            side = trade.type.upper()
+            problems = []
+            if not trade.symbol:
+                problems.append("symbol is required")
+            if "BUY" not in side and "SELL" not in side:
+                problems.append(f"type {trade.type!r} is neither a buy nor a sell")
+            if not trade.volume or trade.volume <= 0:
+                problems.append("volume must be positive; use a sell type for short orders")
+            if trade.open_price is not None and trade.open_price <= 0:
+                problems.append("open_price must be positive")
+            if trade.stop_loss is not None and trade.take_profit is not None:
+                if "BUY" in side and trade.stop_loss >= trade.take_profit:
+                    problems.append("stop_loss must be below take_profit for a buy")
+                if "SELL" in side and trade.stop_loss <= trade.take_profit:
+                    problems.append("stop_loss must be above take_profit for a sell")
+            if trade.open_price is not None:
+                if trade.stop_loss is not None and ("BUY" in side) != (trade.stop_loss < trade.open_price):
+                    problems.append("stop_loss is on the wrong side of open_price")
+                if trade.take_profit is not None and ("BUY" in side) != (trade.take_profit > trade.open_price):
+                    problems.append("take_profit is on the wrong side of open_price")
+            if trade.client_id and client_ids.count(trade.client_id) > 1:
+                problems.append(f"client_id {trade.client_id!r} is used by more than one order")
+            errors.append("; ".join(problems) or None)
+        return errors
+
+    async def _place(self, index: int, trade: Trade, semaphore: asyncio.Semaphore, deadline: float) -> Dict[str, Any]:
+        result = {"index": index, "symbol": trade.symbol, "type": trade.type, "volume": trade.volume,
+                  "client_id": trade.client_id}
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            return {**result, "success": False, "status": "not_sent", "error": "Batch deadline passed before sending"}
+        task = loop.create_task(self.trading_service.execute_trade(trade))
+        task.add_done_callback(lambda _: semaphore.release())
+        try:
+            # Shielded: cancelling a request already on the wire would not cancel the order.
+            response = await asyncio.wait_for(asyncio.shield(task), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self._unfinished.add(task)
+            task.add_done_callback(self._unfinished.discard)
+            return {**result, "success": False, "status": "unknown",
+                    "error": "No broker response before the batch deadline; the order may still fill, "
+                             "check it by client id before retrying"}
+        except RateLimitTimeout as e:
+            return {**result, "success": False, "status": "not_sent", "error": str(e)}
+        except Exception as e:
+            return {**result, "success": False, "status": "failed", "error": str(e)}
+        # OANDA answers a FOK order that could not fill with 201 and a cancel/reject transaction.
+        for key in ("orderRejectTransaction", "orderCancelTransaction"):
+            if isinstance(response, dict) and key in response:
+                return {**result, "success": False, "status": "rejected" if "Reject" in key else "cancelled",
+                        "error": response[key].get("rejectReason") or response[key].get("reason"), "order": response}
+        return {**result, "success": True, "status": "accepted", "order": response}
+
+    async def place_trades(self, trades: List[Trade]) -> Dict[str, Any]:
+        """
+        Validate and place a batch of trades
+        :param trades: The legs, in the order results are reported
+        :return: success (every leg accepted), batch_id, counts per status and one result per leg
+        """
+        if not trades:
+            return {"success": False, "error": "No orders given"}
+        if len(trades) > self.max_orders:
+            return {"success": False, "error": f"{len(trades)} orders exceeds the batch limit of {self.max_orders}"}
+
+        errors = self.validate(trades)
+        if any(errors):
+            return {
+                "success": False,
+                "error": "Batch rejected, no orders were sent",
+                "invalid": [{"index": index, "symbol": trade.symbol, "error": error}
+                            for index, (trade, error) in enumerate(zip(trades, errors)) if error]
+            }
+
+        # Tag every leg so fills can be traced back to the batch.
+        batch_id = uuid.uuid4().hex[:8]
+        trades = [trade if trade.client_id else replace(trade, client_id=f"bulk_{batch_id}_{index}")
+                  for index, trade in enumerate(trades)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        results = await asyncio.gather(*[self._place(index, trade, semaphore, deadline)
+                                         for index, trade in enumerate(trades)])
+
+        statuses = [result["status"] for result in results]
+        accepted = statuses.count("accepted")
+        return {
+            "success": accepted == len(results),
+            "batch_id": batch_id,
+            "submitted": len(results),
+            "accepted": accepted,
+            "failed": len(results) - accepted,
+            "not_sent": statuses.count("not_sent"),
+            "unknown": statuses.count("unknown"),
+            "results": results
+        }
+
+
+def bulk_order_service(trading_service: TradingService) -> BulkOrderService:
+    return BulkOrderService(
+        trading_service,
+        max_orders=int(os.getenv("BULK_ORDER_MAX", "50")),
+        max_concurrency=int(os.getenv("BULK_ORDER_CONCURRENCY", "8")),
+        # Keep below the bulk_order_tool node timeout in the tool registry.
+        timeout=float(os.getenv("BULK_ORDER_TIMEOUT", "40"))
+    )
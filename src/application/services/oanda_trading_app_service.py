@@ -5,12 +5,13 @@ class OandaTradingAppService:
     def __init__(self):
         self.oanda_service = OandaApiService()
 
-    def place_trade(self, symbol: str, units: float, take_profit: float = None, stop_loss: float = None) -> Dict[str, Any]:
+    def place_trade(self, symbol: str, units: float, take_profit: float = None, stop_loss: float = None,
+                    client_id: str = None) -> Dict[str, Any]:
         """
         Place a trade using the OANDA API
         """
         try:
-            response = self.oanda_service.place_trade(symbol, units, take_profit, stop_loss)
+            response = self.oanda_service.place_trade(symbol, units, take_profit, stop_loss, client_id)
             return {
                 "success": True,
                 "order": response
@@ -0,0 +1,247 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import tiktoken
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+
+# Per-message framing overhead in the chat format (role, separators).
+MESSAGE_OVERHEAD = 4
+# Rough size of a token, used when the tokenizer cannot be loaded.
+CHARS_PER_TOKEN = 4
+# Room left for the "[truncated N tokens]" note, and the least of a tool result kept when fitting.
+TRUNCATION_NOTE = 12
+MIN_TOOL_TOKENS = 50
+
+
+class ContextAssembler:
+    """
+    Builds the chatbot prompt under a fixed token budget.
+
+    The system prompt is always sent. History is handled in units, an AI message together
+    with the tool results it asked for, since the API rejects one without the other. The
+    current turn (the latest human message and every unit after it) is always sent; if it
+    does not fit, its tool results are cut further until it does. Older units are kept
+    newest-first until the budget is used up; whatever is left goes to retrieved memories,
+    in relevance order. ToolMessages larger than `tool_message_limit` tokens (raw position
+    dumps, search results) are truncated in the prompt copy only, the graph state is left
+    untouched.
+    Token counts are cached per message id so each message is encoded once.
+
+    The tokenizer is loaded on first use, not at import. If it cannot be loaded (its
+    encoding file is downloaded on first use and the host may be offline), counts fall
+    back to a length-based estimate instead of failing the request.
+    """
+
+    def __init__(self, budget: int = 6000, memory_budget: int = 1000, tool_message_limit: int = 1500,
+                 model: str = "gpt-4o-mini", cache_size: int = 50_000):
+        self.budget = budget
+        self.memory_budget = memory_budget
+        self.tool_message_limit = tool_message_limit
+        self.cache_size = cache_size
+        self.model = model
+        self._encoding = None
+        self._estimating = False
+        self._encoding_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._counts: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+        self.invocations = defaultdict(int)
+        self.tokens_sent = defaultdict(int)
+        self.last_tokens = {}
+        self.max_tokens = defaultdict(int)
+        self.truncated_tool_messages = 0
+
+    def _get_encoding(self) -> Optional[tiktoken.Encoding]:
+        """
+        The model's tokenizer, or None when counts are being estimated
+        """
+        if self._encoding is not None or self._estimating:
+            return self._encoding
+        with self._encoding_lock:
+            if self._encoding is None and not self._estimating:
+                try:
+                    try:
+                        self._encoding = tiktoken.encoding_for_model(self.model)
+                    except KeyError:
+                        self._encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    logging.error(f"Could not load the tokenizer for {self.model}, estimating token counts: {str(e)}")
+                    self._estimating = True
+        return self._encoding
+
+    def _tokens(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(encoding.encode(text))
+
+    def _head(self, text: str, limit: int) -> Tuple[str, int]:
+        """
+        The first `limit` tokens of a text and how many tokens were cut
+        """
+        encoding = self._get_encoding()
+        if encoding is None:
+            return text[:limit * CHARS_PER_TOKEN], self._tokens(text) - limit
+        tokens = encoding.encode(text)
+        return encoding.decode(tokens[:limit]), len(tokens) - limit
+
+    def _text(self, message: BaseMessage) -> str:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            content += json.dumps([{"name": call["name"], "args": call["args"]} for call in tool_calls])
+        return content
+
+    def count(self, message: BaseMessage) -> int:
+        """
+        Number of prompt tokens a message costs
+        :param message: The message to count
+        :return: Token count including the per-message overhead
+        """
+        text = self._text(message)
+        if not message.id:
+            return self._tokens(text) + MESSAGE_OVERHEAD
+
+        # Length is part of the key so a message edited in place (fork) is recounted.
+        key = (message.id, len(text))
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                return cached
+        tokens = self._tokens(text) + MESSAGE_OVERHEAD
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def _shrink_tool_message(self, message: BaseMessage, limit: Optional[int] = None) -> BaseMessage:
+        limit = self.tool_message_limit if limit is None else limit
+        if not isinstance(message, ToolMessage) or self.count(message) <= limit:
+            return message
+        head, cut = self._head(self._text(message), limit)
+        self.truncated_tool_messages += 1
+        return message.model_copy(update={
+            "content": f"{head}\n...[truncated {cut} tokens]",
+            # New id so the truncated copy gets its own cached count.
+            "id": f"{message.id}:truncated:{limit}" if message.id else None
+        })
+
+    def _units(self, messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+        """
+        Group the thread into units that are kept or dropped together: an AI message with
+        its tool results, or a single message. Tool results whose AI message is not in
+        the thread are left out, the API would reject them.
+        """
+        units: List[List[BaseMessage]] = []
+        for message in messages:
+            if isinstance(message, ToolMessage):
+                if units and isinstance(units[-1][0], AIMessage) and units[-1][0].tool_calls:
+                    units[-1].append(message)
+                continue
+            units.append([message])
+        return units
+
+    def _fit(self, messages: List[BaseMessage], room: int) -> List[BaseMessage]:
+        """
+        Cut the tool results in `messages` until they cost at most `room` tokens. Results
+        smaller than an equal share are kept whole and the rest split what is left, so one
+        large dump does not squeeze out its siblings. Never drops a message.
+        """
+        shrunk = [self._shrink_tool_message(message) for message in messages]
+        if sum(self.count(message) for message in shrunk) <= room:
+            return shrunk
+        tools = [index for index, message in enumerate(messages) if isinstance(message, ToolMessage)]
+        share = room - sum(self.count(message) for message in messages if not isinstance(message, ToolMessage))
+        for position, index in enumerate(sorted(tools, key=lambda index: self.count(shrunk[index]))):
+            limit = max(share // (len(tools) - position), MIN_TOOL_TOKENS + MESSAGE_OVERHEAD + TRUNCATION_NOTE)
+            if self.count(shrunk[index]) > limit:
+                shrunk[index] = self._shrink_tool_message(messages[index], limit - MESSAGE_OVERHEAD - TRUNCATION_NOTE)
+            share -= self.count(shrunk[index])
+        return shrunk
+
+    def assemble(self, system_prompt: str, memories: Sequence[str], messages: Sequence[BaseMessage],
+                 node: str = "chatbot") -> Tuple[List[BaseMessage], int]:
+        """
+        Build the message list for one LLM call
+        :param system_prompt: The node's system prompt, always included
+        :param memories: Retrieved memories, most relevant first
+        :param messages: The thread's messages, oldest first
+        :param node: Graph node name the metric is recorded under
+        :return: The messages to send and their token count
+        """
+        system = SystemMessage(content=system_prompt)
+        used = self.count(system)
+        available = self.budget - used
+
+        # Most recent turns first, leaving room for at least part of the memory block.
+        turn_budget = max(available - self.memory_budget, 0)
+        units = self._units(messages)
+        current = next((index for index in range(len(units) - 1, -1, -1) if isinstance(units[index][0], HumanMessage)),
+                       len(units) - 1)
+        recent = self._fit([message for unit in units[max(current, 0):] for message in unit], turn_budget)
+        tokens = sum(self.count(message) for message in recent)
+        turn_budget -= tokens
+        available -= tokens
+        for unit in reversed(units[:max(current, 0)]):
+            unit = [self._shrink_tool_message(message) for message in unit]
+            tokens = sum(self.count(message) for message in unit)
+            if tokens > turn_budget:
+                break
+            recent[:0] = unit
+            turn_budget -= tokens
+            available -= tokens
+
+        kept_memories = []
+        memory_tokens = MESSAGE_OVERHEAD
+        for text in memories:
+            tokens = self._tokens(text) + 1
+            if memory_tokens + tokens > available:
+                break
+            kept_memories.append(text)
+            memory_tokens += tokens
+
+        prompt = [system]
+        if kept_memories:
+            prompt.append(SystemMessage(content="Relevant earlier conversation:\n" + "\n".join(kept_memories)))
+            used += memory_tokens
+        prompt.extend(recent)
+        used += sum(self.count(message) for message in recent)
+
+        with self._lock:
+            self.invocations[node] += 1
+            self.tokens_sent[node] += used
+            self.last_tokens[node] = used
+            self.max_tokens[node] = max(self.max_tokens[node], used)
+        return prompt, used
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "cached_counts": len(self._counts),
+                "estimating": self._estimating,
+                "truncated_tool_messages": self.truncated_tool_messages,
+                "nodes": {
+                    node: {
+                        "invocations": self.invocations[node],
+                        "tokens_sent": self.tokens_sent[node],
+                        "avg_tokens": self.tokens_sent[node] / self.invocations[node],
+                        "last_tokens": self.last_tokens[node],
+                        "max_tokens": self.max_tokens[node]
+                    }
+                    for node in self.invocations
+                }
+            }
+
+
+context_assembler = ContextAssembler(
+    budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000")),
+    memory_budget=int(os.getenv("CONTEXT_MEMORY_BUDGET", "1000")),
+    tool_message_limit=int(os.getenv("CONTEXT_TOOL_MESSAGE_LIMIT", "1500"))
+)
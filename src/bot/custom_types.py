@@ -44,6 +44,8 @@ class Currency(TypedDict):
 class State(MessagesState):
     weather_forecast: Annotated[list[Weather], operator.add]
     currency_result: Annotated[list[Currency], operator.add]
+    # Running summary of the turns that were compressed out of `messages`.
+    summary: str
 
 
 class WeatherInput(TypedDict):
@@ -57,6 +59,15 @@ class ToolNodeArgs(TypedDict):
     id: str
 
 
+class OrderLeg(BaseModel):
+    symbol: str
+    side: str
+    units: float
+    price: Optional[float] = None
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+
+
 class InputQuery(BaseModel):
     query: str = Field(..., description="The query to search on the internet")
 
@@ -0,0 +1,131 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper backed by a persistent, content-addressed SQLite cache.
+
+    Vectors are keyed by sha256(model id + text) and stored as float32 blobs, so a
+    text that has been embedded once (in this process or a previous deploy) never goes
+    through the model again. The table is capped at `max_entries`; the least recently
+    used rows are dropped when it grows past the cap. The row count is read once at open
+    and then tracked in memory, so enforcing the cap does not scan the table.
+    """
+
+    def __init__(self, embeddings: Embeddings, path: str, model_id: Optional[str] = None, max_entries: int = 200_000):
+        self.embeddings = embeddings
+        self.model_id = model_id or getattr(embeddings, "model_name", None) or type(embeddings).__name__
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._rows = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        unique = list(set(keys))
+        # Stay well under SQLite's bound parameter limit.
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+        if found:
+            now = time.time()
+            self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        now = time.time()
+        # Insert new keys and count them; a key stored meanwhile by another caller only has
+        # its last_used refreshed (same model and text, so the same vector).
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            [(key, array("f", vector).tobytes(), now) for key, vector in vectors.items()]
+        )
+        inserted = self._conn.total_changes - before
+        if inserted < len(vectors):
+            self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in vectors])
+        self._rows += inserted
+        if self._rows > self.max_entries:
+            deleted = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (self._rows - self.max_entries,)
+            ).rowcount
+            self._rows -= deleted
+            self.evictions += deleted
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            cached = self._lookup(keys)
+            self._conn.commit()
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in cached and key not in missing:
+                    missing[key] = text
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            with self._lock:
+                self._store(computed)
+                self._conn.commit()
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        with self._lock:
+            cached = self._lookup([key])
+            self._conn.commit()
+            if key in cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if key in cached:
+            return cached[key]
+
+        vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self._store({key: vector})
+            self._conn.commit()
+        return vector
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_id": self.model_id,
+                "size": self._rows,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,76 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor that tracks how many calls are waiting and how many are running,
+    so pool sizes can be tuned from queue depth and utilisation.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self.name = name
+        self.size = max_workers
+        self._counter_lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._counter_lock:
+            self.queued += 1
+
+        def call():
+            with self._counter_lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._counter_lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        return super().submit(call)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            return {
+                "size": self.size,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "utilisation": self.active / self.size
+            }
+
+
+# Broker calls get their own pool so a burst of searches cannot starve order placement.
+POOLS: Dict[str, InstrumentedExecutor] = {
+    "broker": InstrumentedExecutor("broker", int(os.getenv("BROKER_POOL_SIZE", "16"))),
+    "http": InstrumentedExecutor("http", int(os.getenv("HTTP_POOL_SIZE", "16"))),
+}
+
+
+async def run_blocking(pool: str, fn: Callable, *args, **kwargs):
+    """
+    Run a blocking call on a named thread pool without freezing the event loop
+    :param pool: Name of the pool in POOLS
+    :param fn: The blocking callable
+    :return: Whatever fn returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(POOLS[pool], functools.partial(fn, *args, **kwargs))
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    return {name: pool.stats() for name, pool in POOLS.items()}
+
+
+def shutdown():
+    for pool in POOLS.values():
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,82 @@
+import os
+import threading
+from typing import Dict
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+
+load_dotenv()
+
+_lock = threading.Lock()
+_http_client = None
+_http_async_client = None
+_models: Dict[str, ChatOpenAI] = {}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        float(os.getenv("LLM_TIMEOUT", "60")),
+        connect=float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+    )
+
+
+def http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Process-wide HTTP clients used for every LLM call, so keep-alive connections
+    and TLS sessions are reused across turns
+    """
+    global _http_client, _http_async_client
+    if _http_async_client is None:
+        with _lock:
+            if _http_async_client is None:
+                _http_client = httpx.Client(limits=_limits(), timeout=_timeout())
+                _http_async_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+    return _http_client, _http_async_client
+
+
+def chat_model(model: str = "gpt-4o-mini") -> ChatOpenAI:
+    """
+    Shared ChatOpenAI instance for a model name
+    :param model: The OpenAI model name
+    :return: A ChatOpenAI bound to the pooled HTTP clients
+
+    Set LLM_BASE_URL to point every model at a local OpenAI-compatible server (tests, load runs).
+    """
+    chat = _models.get(model)
+    if chat is None:
+        client, async_client = http_clients()
+        chat = ChatOpenAI(
+            model=model,
+            base_url=os.getenv("LLM_BASE_URL") or None,
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            http_client=client,
+            http_async_client=async_client
+        )
+        with _lock:
+            chat = _models.setdefault(model, chat)
+    return chat
+
+
+async def aclose():
+    """
+    Close the pooled HTTP clients on shutdown
+    """
+    global _http_client, _http_async_client
+    with _lock:
+        client, async_client = _http_client, _http_async_client
+        _http_client = _http_async_client = None
+        _models.clear()
+    if async_client is not None:
+        await async_client.aclose()
+    if client is not None:
+        client.close()
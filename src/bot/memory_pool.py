@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from langchain.memory import VectorStoreRetrieverMemory
+from langchain_community.vectorstores import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from src.bot.embedding_cache import CachedEmbeddings
+
+
+load_dotenv()
+
+
+class MemoryPool:
+    """
+    Process-wide pool for the conversation memory backend.
+
+    The embedding model and the Chroma client are created lazily, once per process,
+    and shared by every thread. Per-thread VectorStoreRetrieverMemory objects are
+    kept in a bounded LRU and dropped once they have been idle for `idle_ttl` seconds.
+
+    With `storage_mode="per_thread"` every thread gets its own `conversation_{thread_id}`
+    collection. With `storage_mode="shared"` all threads live in `shards` collections
+    named `conversations_{n}`; each record carries its thread_id in metadata and
+    retrieval filters on it, so the number of collections no longer grows with threads.
+    """
+
+    def __init__(self, max_size: int = 256, idle_ttl: float = 900.0, persist_dir: str = "./chroma_db",
+                 embedding_cache_path: Optional[str] = None, embedding_cache_size: int = 200_000,
+                 storage_mode: str = "per_thread", shards: int = 1):
+        if storage_mode not in ("per_thread", "shared"):
+            raise ValueError(f"Unknown memory storage mode: {storage_mode}")
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.persist_dir = persist_dir
+        self.embedding_cache_path = embedding_cache_path
+        self.embedding_cache_size = embedding_cache_size
+        self.storage_mode = storage_mode
+        self.shards = max(1, shards)
+        self._lock = threading.Lock()
+        self._embeddings = None
+        self._client = None
+        self._shard_stores: Dict[str, Chroma] = {}
+        self._memories: "OrderedDict[str, tuple[VectorStoreRetrieverMemory, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    embeddings = HuggingFaceEmbeddings()
+                    if self.embedding_cache_path:
+                        embeddings = CachedEmbeddings(
+                            embeddings,
+                            self.embedding_cache_path,
+                            max_entries=self.embedding_cache_size
+                        )
+                    self._embeddings = embeddings
+        return self._embeddings
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import chromadb
+                    self._client = chromadb.PersistentClient(path=self.persist_dir)
+        return self._client
+
+    def shard_name(self, thread_id: str) -> str:
+        return f"conversations_{zlib.crc32(thread_id.encode('utf-8')) % self.shards}"
+
+    def _shard_store(self, name: str) -> Chroma:
+        store = self._shard_stores.get(name)
+        if store is None:
+            store = Chroma(
+                collection_name=name,
+                embedding_function=self.embeddings,
+                client=self.client
+            )
+            with self._lock:
+                store = self._shard_stores.setdefault(name, store)
+        return store
+
+    def _build(self, thread_id: str) -> VectorStoreRetrieverMemory:
+        if self.storage_mode == "shared":
+            vectorstore = self._shard_store(self.shard_name(thread_id))
+            retriever = vectorstore.as_retriever(search_kwargs={"filter": {"thread_id": thread_id}})
+        else:
+            vectorstore = Chroma(
+                collection_name=f"conversation_{thread_id}",
+                embedding_function=self.embeddings,
+                client=self.client
+            )
+            retriever = vectorstore.as_retriever()
+        return VectorStoreRetrieverMemory(
+            retriever=retriever,
+            memory_key="chat_history"
+        )
+
+    def _evict_idle(self, now: float):
+        # Entries are kept in access order, so the idle ones are all at the front.
+        while self._memories:
+            thread_id, (_, last_used) = next(iter(self._memories.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._memories[thread_id]
+            self.evictions += 1
+
+    def get(self, thread_id: str) -> VectorStoreRetrieverMemory:
+        """
+        Return the memory for a thread, building it on first use
+        :param thread_id: The conversation thread id
+        :return: A VectorStoreRetrieverMemory bound to the thread's collection
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._memories.get(thread_id)
+            if entry is not None:
+                self._memories[thread_id] = (entry[0], now)
+                self._memories.move_to_end(thread_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        memory = self._build(thread_id)
+
+        with self._lock:
+            entry = self._memories.get(thread_id)
+            if entry is not None:
+                # Another caller built it while we were outside the lock; keep theirs.
+                memory = entry[0]
+            self._memories[thread_id] = (memory, now)
+            self._memories.move_to_end(thread_id)
+            while len(self._memories) > self.max_size:
+                self._memories.popitem(last=False)
+                self.evictions += 1
+        return memory
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._memories),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def embedding_cache_stats(self) -> Optional[Dict[str, float]]:
+        # Don't load the model just to report on it.
+        if isinstance(self._embeddings, CachedEmbeddings):
+            return self._embeddings.stats()
+        return None
+
+
+memory_pool = MemoryPool(
+    max_size=int(os.getenv("MEMORY_POOL_SIZE", "256")),
+    idle_ttl=float(os.getenv("MEMORY_POOL_IDLE_TTL", "900")),
+    persist_dir=os.getenv("CHROMA_PERSIST_DIR", "./chroma_db"),
+    # Set EMBEDDING_CACHE_PATH to an empty string to disable the on-disk embedding cache.
+    embedding_cache_path=os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite3"),
+    embedding_cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "200000")),
+    storage_mode=os.getenv("MEMORY_STORAGE_MODE", "per_thread"),
+    shards=int(os.getenv("MEMORY_SHARDS", "1"))
+)
+
+
+def migrate_to_shared(pool: MemoryPool, page_size: int = 1000, keep: bool = False) -> Dict[str, int]:
+    """
+    Move every per-thread `conversation_{thread_id}` collection into the shared shards
+    :param pool: A pool configured with storage_mode="shared"
+    :param page_size: Number of records copied per request
+    :param keep: Keep the old collections after copying them
+    :return: Number of threads and records migrated
+    """
+    if pool.storage_mode != "shared":
+        raise ValueError("Set MEMORY_STORAGE_MODE=shared before migrating")
+
+    prefix = "conversation_"
+    threads = 0
+    records = 0
+    for collection in pool.client.list_collections():
+        # chromadb >= 0.6 returns names, older versions return Collection objects.
+        name = getattr(collection, "name", collection)
+        if not name.startswith(prefix):
+            continue
+        thread_id = name[len(prefix):]
+        source = pool.client.get_collection(name)
+        target = pool._shard_store(pool.shard_name(thread_id))._collection
+
+        offset = 0
+        while True:
+            page = source.get(
+                offset=offset,
+                limit=page_size,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            if not page["ids"]:
+                break
+            target.upsert(
+                ids=[f"{thread_id}:{record_id}" for record_id in page["ids"]],
+                embeddings=page["embeddings"],
+                documents=page["documents"],
+                metadatas=[{**(metadata or {}), "thread_id": thread_id} for metadata in page["metadatas"]]
+            )
+            offset += len(page["ids"])
+        records += offset
+        threads += 1
+        if not keep:
+            pool.client.delete_collection(name)
+        print(f"Migrated {name}: {offset} records")
+
+    return {"threads": threads, "records": records}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Conversation memory maintenance")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="Keep the per-thread collections after copying")
+    args = parser.parse_args()
+
+    result = migrate_to_shared(memory_pool, page_size=args.page_size, keep=args.keep)
+    print(f"Migrated {result['threads']} threads, {result['records']} records")
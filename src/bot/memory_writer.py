@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.bot.memory_pool import MemoryPool, memory_pool
+
+
+SaveRequest = Tuple[str, Dict[str, Any], Dict[str, Any]]
+
+
+class MemoryWriter:
+    """
+    Write-behind pipeline for conversation memory.
+
+    `submit` only enqueues the (thread_id, inputs, outputs) triple, so a chatbot turn no
+    longer waits on the embedding forward pass or the Chroma write. A background task
+    drains the queue in batches of up to `max_batch` requests (or whatever arrived within
+    `flush_interval` seconds), embeds every text of the batch with a single model call and
+    writes the vectors to each thread's collection. The queue is bounded: when it is full
+    `submit` waits, which pushes back on the producers instead of growing without limit.
+    """
+
+    def __init__(self, pool: MemoryPool, max_batch: int = 32, flush_interval: float = 0.5, max_queue: int = 1000):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, thread_id: str, inputs: Dict[str, Any], outputs: Dict[str, Any]):
+        """
+        Queue a save_context call for a thread
+        :param thread_id: The conversation thread id
+        :param inputs: Same shape as VectorStoreRetrieverMemory.save_context inputs
+        :param outputs: Same shape as VectorStoreRetrieverMemory.save_context outputs
+        """
+        self._ensure_started()
+        await self._queue.put((thread_id, inputs, outputs))
+        self.submitted += 1
+
+    async def _next_batch(self) -> List[SaveRequest]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await asyncio.to_thread(self._flush, batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logging.error(f"Failed to persist {len(batch)} memory records: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _flush(self, batch: List[SaveRequest]):
+        by_thread = defaultdict(list)
+        texts = []
+        for thread_id, inputs, outputs in batch:
+            memory = self.pool.get(thread_id)
+            for document in memory._form_documents(inputs, outputs):
+                # Tag every record so shared collections can filter by thread.
+                document.metadata = {**document.metadata, "thread_id": thread_id}
+                # Remember the row in `vectors`; records are grouped by thread, texts are not.
+                by_thread[thread_id].append((memory, document, len(texts)))
+                texts.append(document.page_content)
+        if not texts:
+            return
+
+        # One forward pass for the whole batch.
+        vectors = self.pool.embeddings.embed_documents(texts)
+
+        for thread_id, records in by_thread.items():
+            memory = records[0][0]
+            documents = [document for _, document, _ in records]
+            memory.retriever.vectorstore._collection.add(
+                ids=[str(uuid.uuid4()) for _ in documents],
+                embeddings=[vectors[index] for _, _, index in records],
+                documents=[document.page_content for document in documents],
+                metadatas=[document.metadata for document in documents]
+            )
+
+        self.written += len(batch)
+        self.batches += 1
+
+    async def stop(self):
+        """
+        Flush everything still queued and stop the background task
+        """
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch_size": self.written / self.batches if self.batches else 0.0
+        }
+
+
+memory_writer = MemoryWriter(
+    memory_pool,
+    max_batch=int(os.getenv("MEMORY_WRITE_BATCH", "32")),
+    flush_interval=float(os.getenv("MEMORY_WRITE_INTERVAL", "0.5")),
+    max_queue=int(os.getenv("MEMORY_WRITE_QUEUE", "1000"))
+)
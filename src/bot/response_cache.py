@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from src.bot.memory_pool import memory_pool
+from src.bot.tools.registry import TOOL_REGISTRY
+
+
+def _normalize(text: Any) -> str:
+    if not isinstance(text, str):
+        text = json.dumps(text, sort_keys=True)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """
+    Opt-in cache in front of the chatbot LLM call.
+
+    Entries are keyed on a hash of the normalized message list, the model name and the
+    bound tool schemas, so a hit replays the whole response including its tool-call
+    decision without a network round trip. With `similarity_threshold` > 0, a miss falls
+    back to comparing the embedding of the last user message against cached entries that
+    share the exact same preceding context. Turns whose latest messages are tool results
+    are never cached or served from cache, since those results are fresh by definition.
+    Decisions that call a non-idempotent tool (or one missing from the registry) are not
+    cached: a replay could re-run an order, with its cached arguments, for a merely
+    similar prompt.
+    """
+
+    def __init__(self, enabled: bool = False, ttl: float = 300.0, max_entries: int = 1000,
+                 similarity_threshold: float = 0.0, embeddings_factory=None):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._embeddings_factory = embeddings_factory
+        self._lock = threading.Lock()
+        # key -> (response, expires_at, context_key, vector)
+        self._entries: "OrderedDict[str, Tuple[AIMessage, float, str, Optional[List[float]]]]" = OrderedDict()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embeddings_factory()
+
+    def _bypass(self, messages: Sequence[BaseMessage]) -> bool:
+        # Anything after the last user message that is a tool result makes the turn uncacheable.
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                return False
+            if isinstance(message, ToolMessage):
+                return True
+        return True
+
+    def _keys(self, llm, messages: Sequence[BaseMessage]) -> Tuple[str, str, str]:
+        bound = getattr(llm, "bound", llm)
+        model = getattr(bound, "model_name", None) or type(bound).__name__
+        tools = json.dumps(getattr(llm, "kwargs", {}).get("tools", []), sort_keys=True, default=str)
+        rendered = [f"{message.type}:{_normalize(message.content)}" for message in messages]
+        context = hashlib.sha256("\0".join([model, tools] + rendered[:-1]).encode("utf-8")).hexdigest()
+        key = hashlib.sha256(f"{context}\0{rendered[-1]}".encode("utf-8")).hexdigest()
+        return key, context, messages[-1].content
+
+    def _cacheable(self, response: AIMessage) -> bool:
+        if getattr(response, "invalid_tool_calls", None):
+            return False
+        return all(call["name"] in TOOL_REGISTRY and TOOL_REGISTRY[call["name"]].idempotent
+                   for call in response.tool_calls)
+
+    def _replay(self, response: AIMessage) -> AIMessage:
+        # Fresh ids, otherwise add_messages would overwrite the earlier message in state.
+        tool_calls = [{**call, "id": f"call_{uuid.uuid4().hex[:24]}"} for call in response.tool_calls]
+        return response.model_copy(update={"id": f"run-{uuid.uuid4()}", "tool_calls": tool_calls})
+
+    def _evict(self, now: float):
+        for key in [key for key, entry in self._entries.items() if entry[1] <= now]:
+            del self._entries[key]
+            self.evictions += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def lookup(self, llm, messages: Sequence[BaseMessage]) -> Optional[AIMessage]:
+        """
+        Return a cached response for this prompt, or None
+        :param llm: The bound chat model the prompt is meant for
+        :param messages: The exact messages that would be sent
+        """
+        if not self.enabled or not messages:
+            return None
+        if self._bypass(messages):
+            self.bypassed += 1
+            return None
+
+        key, context, query = self._keys(llm, messages)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._replay(entry[0])
+            candidates = [
+                (cached_key, entry[3]) for cached_key, entry in self._entries.items()
+                if entry[2] == context and entry[3] is not None and entry[1] > now
+            ] if self.similarity_threshold > 0 else []
+
+        if candidates:
+            vector = await asyncio.to_thread(self.embeddings.embed_query, _normalize(query))
+            best_key, best_score = None, self.similarity_threshold
+            for cached_key, cached_vector in candidates:
+                score = _cosine(vector, cached_vector)
+                if score >= best_score:
+                    best_key, best_score = cached_key, score
+            with self._lock:
+                entry = self._entries.get(best_key) if best_key else None
+                if entry is not None:
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    return self._replay(entry[0])
+
+        self.misses += 1
+        return None
+
+    async def store(self, llm, messages: Sequence[BaseMessage], response: AIMessage):
+        """
+        Cache the response for this prompt
+        :param llm: The bound chat model the prompt was sent to
+        :param messages: The exact messages that were sent
+        :param response: The model's reply
+        """
+        if not self.enabled or not messages or self._bypass(messages):
+            return
+        if not self._cacheable(response):
+            self.bypassed += 1
+            return
+        key, context, query = self._keys(llm, messages)
+        vector = None
+        if self.similarity_threshold > 0:
+            vector = await asyncio.to_thread(self.embeddings.embed_query, _normalize(query))
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (response, now + self.ttl, context, vector)
+            self._entries.move_to_end(key)
+            self._evict(now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0
+            }
+
+
+response_cache = ResponseCache(
+    enabled=os.getenv("LLM_RESPONSE_CACHE", "false").lower() in ("1", "true", "yes"),
+    ttl=float(os.getenv("LLM_RESPONSE_CACHE_TTL", "300")),
+    max_entries=int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "1000")),
+    # 0 keeps lookups exact-match only.
+    similarity_threshold=float(os.getenv("LLM_RESPONSE_CACHE_SIMILARITY", "0")),
+    embeddings_factory=lambda: memory_pool.embeddings
+)
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Set
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+
+from src.bot.llm import chat_model
+
+
+SUMMARY_PROMPT = """
+You maintain the running summary of a conversation between a trader and a trading assistant.
+Merge the existing summary with the new messages into one concise summary.
+Keep every fact the assistant may need later: instruments, order sizes, prices, stop-loss and
+take-profit levels, trades placed or rejected, open positions, the user's stated preferences and
+risk limits. Drop greetings and small talk. Answer with the summary only.
+"""
+
+
+class ConversationSummarizer:
+    """
+    Compresses old turns of a thread into `State["summary"]`.
+
+    Runs after a turn has finished streaming, as a background task, so it never adds
+    latency to the response. Once a thread holds more than `threshold` messages, all but
+    the last `keep_recent` are folded into the summary and removed from the checkpoint.
+    """
+
+    def __init__(self, threshold: int = 0, keep_recent: int = 10, model: str = "gpt-4o-mini"):
+        self.threshold = threshold
+        self.keep_recent = keep_recent
+        self.model = model
+        self._in_flight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.runs = 0
+        self.skipped = 0
+        self.removed_messages = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    @property
+    def llm(self):
+        # Looked up on each use so a model closed by llm.aclose() is never reused.
+        return chat_model(self.model)
+
+    def schedule(self, graph, config: Dict):
+        """
+        Summarize the thread in the background if it has grown past the threshold
+        :param graph: The compiled graph owning the thread's checkpoints
+        :param config: Config with configurable.thread_id
+        """
+        thread_id = config["configurable"]["thread_id"]
+        if not self.enabled or thread_id in self._in_flight:
+            return
+        self._in_flight.add(thread_id)
+        task = asyncio.get_running_loop().create_task(self._summarize(graph, {"configurable": {"thread_id": thread_id}}))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _: self._in_flight.discard(thread_id))
+
+    def _split(self, messages: list[BaseMessage]) -> int:
+        cut = len(messages) - self.keep_recent
+        # Never separate tool results from the AI message that requested them.
+        while 0 < cut < len(messages) and isinstance(messages[cut], ToolMessage):
+            cut -= 1
+        return cut
+
+    async def _summarize(self, graph, config: Dict):
+        try:
+            snapshot = await graph.aget_state(config)
+            if snapshot.next:
+                # Interrupted or still running; try again after the next turn.
+                return
+            messages = snapshot.values.get("messages", [])
+            if len(messages) <= self.threshold:
+                return
+            cut = self._split(messages)
+            if cut <= 0:
+                return
+            old = messages[:cut]
+
+            transcript = "\n".join(f"{message.type}: {message.content}" for message in old if message.content)
+            previous = snapshot.values.get("summary") or "(none)"
+            response = await self.llm.ainvoke([
+                SystemMessage(content=SUMMARY_PROMPT),
+                HumanMessage(content=f"Existing summary:\n{previous}\n\nNew messages:\n{transcript}")
+            ])
+
+            latest = await graph.aget_state(config)
+            if latest.config["configurable"]["checkpoint_id"] != snapshot.config["configurable"]["checkpoint_id"]:
+                # A new turn started meanwhile; writing now could race with it.
+                self.skipped += 1
+                return
+            await graph.aupdate_state(
+                config,
+                {"summary": response.content, "messages": [RemoveMessage(id=message.id) for message in old]},
+                as_node="chatbot"
+            )
+            self.runs += 1
+            self.removed_messages += len(old)
+        except Exception as e:
+            logging.error(f"Failed to summarize thread {config['configurable']['thread_id']}: {str(e)}")
+
+    async def stop(self):
+        """
+        Wait for summaries that are already running
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "threshold": self.threshold,
+            "in_flight": len(self._in_flight),
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "removed_messages": self.removed_messages
+        }
+
+
+summarizer = ConversationSummarizer(
+    # 0 disables summarization.
+    threshold=int(os.getenv("SUMMARY_THRESHOLD", "0")),
+    keep_recent=int(os.getenv("SUMMARY_KEEP_RECENT", "10"))
+)
@@ -1,11 +1,22 @@
 import asyncio
+import logging
 import os
 import random
+import time
 from langchain_core.messages import ToolMessage
 from src.bot.custom_types import ToolNodeArgs, WeatherInput
 from langgraph.types import StreamWriter, interrupt, Send
 from langchain_community.tools.tavily_search.tool import TavilySearchResults
-from src.bot.tools.trade_tools import place_trade, get_active_positions
+from src.bot.tools.trade_tools import place_trade
+from src.bot.executors import run_blocking
+from src.application.analysis.indicators import summarize
+from src.application.services.bulk_order_service import bulk_order_service
+from src.domain.entities.trade import Trade
+from src.infrastructure.market_data.bar_builder import GRANULARITIES, bar_builder
+from src.infrastructure.market_data.candle_store import CandleDownloader, candle_columns, candle_store
+from src.infrastructure.market_data.tick_store import parse_time, tick_store
+from src.infrastructure.oanda_api.account_state import account_state
+from src.infrastructure.oanda_api.async_oanda_api_service import shared_async_oanda_service
 
 
 async def weather_node(input: WeatherInput, writer: StreamWriter):
@@ -50,7 +61,7 @@ async def tavily_search_node(input: ToolNodeArgs):
     
     try:
         tavily_search = TavilySearchResults(api_key=api_key, return_direct=True)
-        results = tavily_search.run(query)
+        results = await run_blocking("http", tavily_search.run, query)
         
         # Return in the correct format expected by the graph
         return {
@@ -71,6 +82,10 @@ async def tavily_search_node(input: ToolNodeArgs):
             ]
         }
 
+def client_order_id(tool_call_id: str) -> str:
+    # Ties an order to the tool call that placed it, so an unknown outcome can be looked up.
+    return f"chat_{tool_call_id}"
+
 async def place_trade_node(input: ToolNodeArgs, writer: StreamWriter):
     args = input["args"]
     tool_call_id = input["id"]
@@ -82,7 +97,8 @@ async def place_trade_node(input: ToolNodeArgs, writer: StreamWriter):
     stop_loss = args.get("stop_loss")
 
     # Call the place_trade tool
-    result = place_trade(symbol, units, take_profit, stop_loss)
+    result = await run_blocking("broker", place_trade, symbol, units, take_profit, stop_loss,
+                                client_order_id(tool_call_id))
 
     # Optionally, send an update to the client
     writer({"trade_status": [
@@ -101,11 +117,44 @@ async def place_trade_node(input: ToolNodeArgs, writer: StreamWriter):
         ]
     }
 
+async def bulk_order_node(input: ToolNodeArgs, writer: StreamWriter):
+    tool_call_id = input["id"]
+    try:
+        trades = [
+            Trade(
+                symbol=order.get("symbol"),
+                type=f"ORDER_TYPE_{str(order.get('side', '')).upper()}",
+                volume=float(order.get("units") or 0),
+                open_price=order.get("price"),
+                stop_loss=order.get("stop_loss"),
+                take_profit=order.get("take_profit")
+            )
+            for order in input["args"].get("orders") or []
+        ]
+    except (TypeError, ValueError, AttributeError) as ex:
+        return {"messages": [ToolMessage(content=f"Invalid orders: {ex}", tool_call_id=tool_call_id)]}
+
+    # All legs in one step; the broker's rate limiter paces them.
+    result = await bulk_order_service(shared_async_oanda_service()).place_trades(trades)
+    status = [
+        {"symbol": leg["symbol"], "status": leg["status"], "result": leg}
+        for leg in result.get("results", [])
+    ] or [{"symbol": None, "status": "Batch rejected", "result": result}]
+    writer({"trade_status": status})
+
+    return {
+        "messages": [ToolMessage(content=str(result), tool_call_id=tool_call_id)],
+        "trade_status": status
+    }
+
 async def get_active_positions_node(input: ToolNodeArgs, writer: StreamWriter):
     tool_call_id = input["id"]
 
-    # Call the get_active_positions tool
-    result = get_active_positions()
+    # Served from the stream-fed account snapshot; it falls back to REST when stale.
+    try:
+        result = {"success": True, "positions": await account_state.get_positions()}
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
 
     # Optionally, send an update to the client
     writer({"positions_status": [
@@ -123,4 +172,103 @@ async def get_active_positions_node(input: ToolNodeArgs, writer: StreamWriter):
             {"status": "Positions fetched", "result": result}
         ]
     }
-    
\ No newline at end of file
+
+
+async def account_summary_node(input: ToolNodeArgs):
+    tool_call_id = input["id"]
+    try:
+        summary = await account_state.get_summary()
+        keys = ("currency", "balance", "NAV", "unrealizedPL", "pl", "marginUsed", "marginAvailable",
+                "openPositionCount", "openTradeCount", "pendingOrderCount")
+        content = str({key: summary[key] for key in keys if key in summary})
+    except Exception as ex:
+        content = f"An error occurred: {ex}"
+    return {"messages": [ToolMessage(content=content, tool_call_id=tool_call_id)]}
+
+
+async def live_price_node(input: ToolNodeArgs):
+    symbol = input["args"]["symbol"]
+    tool_call_id = input["id"]
+
+    # Served from the in-memory tick store when the stream is fresh, else from the broker.
+    price = tick_store.last_price(symbol)
+    if price is None or time.time() - price["time"] > float(os.getenv("LIVE_PRICE_MAX_AGE", "10")):
+        try:
+            quote = await shared_async_oanda_service().get_market_data(symbol)
+            if quote:
+                bid, ask = float(quote["bids"][0]["price"]), float(quote["asks"][0]["price"])
+                # Same shape as tick_store.last_price: epoch seconds and a mid.
+                price = {"instrument": symbol, "time": parse_time(quote["time"]), "bid": bid, "ask": ask,
+                         "mid": (bid + ask) / 2}
+            else:
+                price = None
+        except Exception as ex:
+            return {"messages": [ToolMessage(content=f"An error occurred: {ex}", tool_call_id=tool_call_id)]}
+
+    content = str(price) if price else f"No price available for {symbol}"
+    return {"messages": [ToolMessage(content=content, tool_call_id=tool_call_id)]}
+
+
+# Enough history for the slowest indicator (MACD signal needs 26 + 9 bars) to settle.
+INDICATOR_BARS = int(os.getenv("INDICATOR_BARS", "200"))
+
+
+def _fresh(bars, granularity: str) -> bool:
+    """
+    Enough bars, and the last one is the latest bar that can have closed
+    """
+    if len(bars["close"]) < INDICATOR_BARS:
+        return False
+    # Times are bar opens, so the newest closed bar opened at most two bar lengths ago.
+    return bars["time"][-1] >= time.time() - 2 * GRANULARITIES[granularity]
+
+
+def _cached_bars(symbol: str, granularity: str):
+    bars = candle_store.load(symbol, granularity)
+    return {column: values[-INDICATOR_BARS:] for column, values in bars.items()}
+
+
+async def _synced_bars(symbol: str, granularity: str):
+    """
+    The cached bars, topped up from the broker first when the cache is behind. Empty when
+    the cache is too short, too far behind for one request, or the top-up fails.
+    """
+    bars = _cached_bars(symbol, granularity)
+    if len(bars["close"]) < INDICATOR_BARS or _fresh(bars, granularity):
+        return bars
+    last = float(bars["time"][-1])
+    # A longer gap costs less as the single request for the latest bars that follows.
+    if last < time.time() - INDICATOR_BARS * GRANULARITIES[granularity]:
+        return {"close": []}
+    try:
+        await CandleDownloader(candle_store, shared_async_oanda_service()).sync(symbol, granularity, last)
+    except Exception as ex:
+        logging.error(f"Candle cache sync for {symbol} {granularity} failed: {str(ex)}")
+        return {"close": []}
+    # Still behind after a sync only while the market is closed, and then the broker has nothing newer.
+    return _cached_bars(symbol, granularity)
+
+
+async def indicators_node(input: ToolNodeArgs):
+    symbol = input["args"]["symbol"]
+    granularity = input["args"].get("granularity") or "M1"
+    tool_call_id = input["id"]
+
+    # Live bars first, then the local candle cache brought up to date, then the broker.
+    bars = {"close": []}
+    if granularity in GRANULARITIES:
+        bars = bar_builder.bars(symbol, granularity, INDICATOR_BARS)
+        if not _fresh(bars, granularity):
+            bars = await _synced_bars(symbol, granularity)
+    if len(bars["close"]) < INDICATOR_BARS:
+        try:
+            response = await shared_async_oanda_service().get_candles(symbol, granularity, count=INDICATOR_BARS, price="M")
+            bars = candle_columns([candle for candle in response.get("candles", []) if candle.get("complete")])
+        except Exception as ex:
+            return {"messages": [ToolMessage(content=f"An error occurred: {ex}", tool_call_id=tool_call_id)]}
+
+    if len(bars["close"]) == 0:
+        content = f"No candles available for {symbol} {granularity}"
+    else:
+        content = str({"instrument": symbol, "granularity": granularity, "bars": len(bars["close"]), **summarize(bars)})
+    return {"messages": [ToolMessage(content=content, tool_call_id=tool_call_id)]}
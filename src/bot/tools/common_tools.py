@@ -1,7 +1,9 @@
+from typing import List
+
 from langchain_core.tools import tool
 
 from src.bot.tools.currency_api import search_currency_price_node
-from src.bot.custom_types import CurrencyPair, InputQuery
+from src.bot.custom_types import CurrencyPair, InputQuery, OrderLeg
 from src.bot.tools.common_nodes import tavily_search_node
 
 
@@ -17,6 +19,26 @@ async def create_reminder_tool(reminder_text: str) -> str:
     """Call to create a reminder"""
     return "Reminder created"
 
+@tool
+async def live_price_tool(symbol: str) -> str:
+    """Call to get the current bid/ask price of a trading symbol, e.g. EUR_USD"""
+    return "Price"
+
+@tool
+async def account_summary_tool() -> str:
+    """Call to get the trading account summary: balance, NAV, unrealized profit/loss, margin used and available, and open position/order counts"""
+    return "Account"
+
+@tool
+async def technical_indicators_tool(symbol: str, granularity: str = "M1") -> str:
+    """Call to get technical indicators (SMA, EMA, RSI, ATR, Bollinger bands, MACD, volatility) for a trading symbol, e.g. EUR_USD, on a candle granularity such as M1, M5 or H1"""
+    return "Indicators"
+
+@tool
+async def bulk_order_tool(orders: List[OrderLeg]) -> str:
+    """Call to place several orders at once (a basket, rebalance or hedge set). Each order has a symbol such as EUR_USD, a side BUY or SELL, positive units, and optional price (for a limit order), stop_loss and take_profit. If any order is invalid nothing is sent; otherwise each order reports its own result"""
+    return "Orders placed"
+
 @tool
 async def placetrade_tool(placetrade_text: str) -> str:
     """Call to place a trade"""
@@ -6,9 +6,10 @@ from langchain_core.messages import ToolMessage
 from langgraph.types import StreamWriter, interrupt
 
 from src.bot.custom_types import CurrencyPair
+from src.bot.executors import run_blocking
 
 
-def search_currency_price_node(input: CurrencyPair, writer: StreamWriter):
+async def search_currency_price_node(input: CurrencyPair, writer: StreamWriter):
 
     print("target_currencies", input['args'])
     current_date = '2025-03-30' #datetime.datetime.today().strftime('%Y-%m-%d')
@@ -31,7 +32,7 @@ def search_currency_price_node(input: CurrencyPair, writer: StreamWriter):
             'base_currency': base_currency,
             'currencies': ','.join(target_currencies) if target_currencies else None
         }
-        response = requests.get(url, headers=headers, params=params)
+        response = await run_blocking("http", requests.get, url, headers=headers, params=params)
         if response.status_code == 200:
             result = response.json()
             return {"messages": [ToolMessage(content=str(result), tool_call_id=tool_call_id)], "currency_result": [{"currency": f"{base_currency}", "search_status": "", "result": result}]}
@@ -0,0 +1,127 @@
+import asyncio
+import inspect
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set
+
+from langchain_core.messages import ToolMessage
+from langgraph.graph import END
+from langgraph.types import StreamWriter
+
+from src.bot.tools.account_nodes import account_validation_node
+from src.bot.tools.common_nodes import account_summary_node, bulk_order_node, client_order_id, get_active_positions_node, indicators_node, live_price_node, place_trade_node, reminder_node, tavily_search_node, weather_node
+from src.bot.tools.currency_api import search_currency_price_node
+
+
+@dataclass
+class ToolSpec:
+    """
+    Declarative description of a tool the chatbot can call.
+
+    `name` is the tool name the LLM emits, `node` the graph node that runs it.
+    `map_args` turns the LLM tool call into the node's input. `timeout` (seconds, None for
+    no deadline) and `max_concurrency` bound a single fan-out so one slow call cannot
+    stall the superstep. Tools that place orders set `idempotent=False`: they are never
+    cancelled at the deadline, since the order may already be at the broker.
+    """
+    name: str
+    node: str
+    action: Callable
+    map_args: Callable[[Dict[str, Any]], Any] = lambda call: call
+    timeout: Optional[float] = 30.0
+    max_concurrency: int = 8
+    next: str = "chatbot"
+    idempotent: bool = True
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, repr=False)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+
+TOOL_REGISTRY: Dict[str, ToolSpec] = {spec.name: spec for spec in [
+    ToolSpec("weather_tool", "weather", weather_node,
+             map_args=lambda call: {"location": call["args"]["query"], "tool_call_id": call["id"]}, timeout=10),
+    # Waits on a human, so no deadline.
+    ToolSpec("create_reminder_tool", "reminder", reminder_node, timeout=None),
+    ToolSpec("search_tavily_tool", "search_internet", tavily_search_node, timeout=20),
+    ToolSpec("live_price_tool", "live_price", live_price_node, timeout=10),
+    ToolSpec("technical_indicators_tool", "indicators", indicators_node, timeout=20),
+    ToolSpec("search_currency_tool", "search_currency_price", search_currency_price_node, timeout=10, next=END),
+    ToolSpec("brokerage_validation_tool", "brokerage_validation", account_validation_node, timeout=30),
+    ToolSpec("get_active_positions", "get_active_positions", get_active_positions_node, timeout=15),
+    ToolSpec("account_summary_tool", "account_summary", account_summary_node, timeout=15),
+    ToolSpec("place_trade", "place_trade", place_trade_node, timeout=30, max_concurrency=4, idempotent=False),
+    # The service answers within BULK_ORDER_TIMEOUT (40s) with per-leg results; this is only a backstop.
+    ToolSpec("bulk_order_tool", "bulk_order", bulk_order_node, timeout=60, max_concurrency=2, idempotent=False),
+]}
+
+TOOL_NODES: Dict[str, ToolSpec] = {spec.node: spec for spec in TOOL_REGISTRY.values()}
+
+# Upper bound on tool nodes running at once across all threads.
+_fan_out_limit = int(os.getenv("TOOL_MAX_CONCURRENCY", "32"))
+_fan_out: Optional[asyncio.Semaphore] = None
+
+timeouts = defaultdict(int)
+calls = defaultdict(int)
+# Write tools still running after their deadline; referenced so they are not collected.
+_detached: Set[asyncio.Task] = set()
+
+
+def _fan_out_semaphore() -> asyncio.Semaphore:
+    global _fan_out
+    if _fan_out is None:
+        _fan_out = asyncio.Semaphore(_fan_out_limit)
+    return _fan_out
+
+
+def guarded_node(spec: ToolSpec):
+    """
+    Wrap a tool node with its concurrency limit and deadline. On timeout the node
+    answers with an error ToolMessage instead of holding up the graph. A non-idempotent
+    tool keeps running in the background and the message says its outcome is unknown,
+    so the LLM checks positions instead of placing the order again.
+    """
+    accepts_writer = "writer" in inspect.signature(spec.action).parameters
+
+    async def run(input, writer: StreamWriter):
+        tool_call_id = input.get("id") or input.get("tool_call_id")
+        calls[spec.node] += 1
+        async with _fan_out_semaphore(), spec.semaphore:
+            result = spec.action(input, writer) if accepts_writer else spec.action(input)
+            if not inspect.isawaitable(result):
+                return result
+            task = asyncio.ensure_future(result)
+            try:
+                return await asyncio.wait_for(task if spec.idempotent else asyncio.shield(task), spec.timeout)
+            except asyncio.TimeoutError:
+                timeouts[spec.node] += 1
+                if spec.idempotent:
+                    content = f"An error occurred: {spec.name} did not respond within {spec.timeout} seconds"
+                else:
+                    _detached.add(task)
+                    task.add_done_callback(_detached.discard)
+                    content = (
+                        f"Outcome unknown: {spec.name} did not finish within {spec.timeout} seconds and is still "
+                        f"running, so the order may yet be filled. Check positions and orders (client id "
+                        f"{client_order_id(tool_call_id)}) before retrying."
+                    )
+                return {"messages": [ToolMessage(content=content, tool_call_id=tool_call_id)]}
+
+    run.__name__ = spec.node
+    return run
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        spec.node: {
+            "calls": calls[spec.node],
+            "timeouts": timeouts[spec.node],
+            "timeout": spec.timeout,
+            "max_concurrency": spec.max_concurrency
+        }
+        for spec in TOOL_REGISTRY.values()
+    }
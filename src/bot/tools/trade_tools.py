@@ -1,14 +1,22 @@
+from functools import lru_cache
 from src.application.services.oanda_trading_app_service import OandaTradingAppService
 
-def place_trade(symbol: str, units: float, take_profit: float = None, stop_loss: float = None):
-    trading_service = OandaTradingAppService()
+
+@lru_cache(maxsize=None)
+def get_trading_service() -> OandaTradingAppService:
+    # One service per process; the underlying OANDA client comes from the shared pool.
+    return OandaTradingAppService()
+
+def place_trade(symbol: str, units: float, take_profit: float = None, stop_loss: float = None, client_id: str = None):
+    trading_service = get_trading_service()
     return trading_service.place_trade(
         symbol=symbol,
         units=units,
         take_profit=take_profit,
-        stop_loss=stop_loss
+        stop_loss=stop_loss,
+        client_id=client_id
     )
 
 def get_active_positions():
-    trading_service = OandaTradingAppService()
+    trading_service = get_trading_service()
     return trading_service.get_active_positions()
\ No newline at end of file
@@ -98,6 +98,17 @@ def custom_event(value):
     }
 
 
+def price_event(ticks):
+    """Create a compact price event for the client: [instrument, time, bid, ask] rows."""
+    return {
+        "event": "prices",
+        "data": json.dumps(
+            [[tick["instrument"], tick["time"], tick["bid"], tick["ask"]] for tick in ticks],
+            separators=(",", ":")
+        )
+    }
+
+
 def format_state_snapshot(snapshot: StateSnapshot):
     interrupts = []
     for task in snapshot.tasks:
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.infrastructure.market_data.tick_store import ColumnRing, parse_time
+from src.infrastructure.oanda_api.price_hub import price_hub
+
+
+GRANULARITIES = {"S5": 5, "M1": 60, "M5": 300, "M15": 900, "H1": 3600, "H4": 14400, "D": 86400}
+BAR_COLUMNS = ("time", "open", "high", "low", "close", "volume")
+
+BarListener = Callable[[str, str, Dict[str, float]], None]
+
+
+class BarSeries:
+    """
+    Closed bars for one instrument and granularity plus the bar currently forming.
+
+    A tick for a later bucket closes the forming bar. Empty buckets in between are
+    filled with flat, zero-volume bars (up to `max_gap_bars`, so a weekend does not
+    produce thousands of S5 bars). A tick for a bar that is already closed is dropped
+    and counted: listeners have seen that bar, and amending only part of it would leave
+    its OHLC inconsistent.
+    """
+
+    def __init__(self, instrument: str, granularity: str, capacity: int, max_gap_bars: int):
+        self.instrument = instrument
+        self.granularity = granularity
+        self.seconds = GRANULARITIES[granularity]
+        self.max_gap_bars = max_gap_bars
+        self.closed = ColumnRing(capacity, BAR_COLUMNS)
+        self.current: Optional[List[float]] = None
+        self.late_ticks = 0
+
+    def _bar(self, row) -> Dict[str, float]:
+        return dict(zip(BAR_COLUMNS, (float(value) for value in row)))
+
+    def update(self, tick_time: float, price: float) -> List[Dict[str, float]]:
+        """
+        Apply a tick and return the bars it closed, oldest first
+        """
+        start = tick_time - tick_time % self.seconds
+        closed = []
+        if self.current is not None:
+            if start == self.current[0]:
+                self.current[2] = max(self.current[2], price)
+                self.current[3] = min(self.current[3], price)
+                self.current[4] = price
+                self.current[5] += 1
+                return []
+            if start < self.current[0]:
+                return self._late(start, price)
+            closed.append(self._close_current())
+        elif self.closed.count and start <= self.closed.last(1)[0][0]:
+            return self._late(start, price)
+
+        closed.extend(self._fill_gap(start))
+        self.current = [start, price, price, price, price, 1]
+        return closed
+
+    def _close_current(self) -> Dict[str, float]:
+        row = self.current
+        self.closed.append(*row)
+        self.current = None
+        return self._bar(row)
+
+    def _fill_gap(self, start: float) -> List[Dict[str, float]]:
+        if self.closed.count == 0:
+            return []
+        last_start = float(self.closed.last(1)[0][0])
+        last_close = float(self.closed.last(1)[4][0])
+        gap = int((start - last_start) // self.seconds) - 1
+        if gap <= 0 or gap > self.max_gap_bars:
+            return []
+        filled = []
+        for n in range(1, gap + 1):
+            row = (last_start + n * self.seconds, last_close, last_close, last_close, last_close, 0)
+            self.closed.append(*row)
+            filled.append(self._bar(row))
+        return filled
+
+    def _late(self, start: float, price: float) -> List[Dict[str, float]]:
+        self.late_ticks += 1
+        return []
+
+    def close_due(self, now: float) -> List[Dict[str, float]]:
+        """
+        Close the forming bar once its period is over, even if no new tick arrived
+        """
+        if self.current is None or now < self.current[0] + self.seconds:
+            return []
+        return [self._close_current()]
+
+
+class BarBuilder:
+    """
+    Incremental OHLC bars over the live tick stream, for several granularities at once.
+
+    Bars are built on the mid price and kept in columnar ring buffers per instrument and
+    granularity. Listeners added with `on_bar_closed` are called with
+    (instrument, granularity, bar) for every bar that closes.
+    """
+
+    def __init__(self, granularities: Iterable[str] = ("S5", "M1", "M5", "H1"), capacity: int = 10_000,
+                 max_gap_bars: int = 720):
+        self.granularities = list(granularities)
+        for granularity in self.granularities:
+            if granularity not in GRANULARITIES:
+                raise ValueError(f"Unsupported granularity: {granularity}")
+        self.capacity = capacity
+        self.max_gap_bars = max_gap_bars
+        self._series: Dict[Tuple[str, str], BarSeries] = {}
+        self._listeners: List[BarListener] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def on_bar_closed(self, listener: BarListener):
+        self._listeners.append(listener)
+
+    def _emit(self, series: BarSeries, bars: List[Dict[str, float]]):
+        for bar in bars:
+            for listener in self._listeners:
+                try:
+                    listener(series.instrument, series.granularity, bar)
+                except Exception as e:
+                    logging.error(f"Bar listener failed: {str(e)}")
+
+    def _series_for(self, instrument: str, granularity: str) -> BarSeries:
+        series = self._series.get((instrument, granularity))
+        if series is None:
+            series = self._series[(instrument, granularity)] = BarSeries(
+                instrument, granularity, self.capacity, self.max_gap_bars
+            )
+        return series
+
+    def add_tick(self, instrument: str, tick_time: float, bid: float, ask: float):
+        price = (bid + ask) / 2
+        for granularity in self.granularities:
+            series = self._series_for(instrument, granularity)
+            self._emit(series, series.update(tick_time, price))
+
+    def on_tick(self, tick: Dict[str, Any]):
+        self.add_tick(tick["instrument"], parse_time(tick["time"]), tick["bid"], tick["ask"])
+
+    def bars(self, instrument: str, granularity: str, n: int) -> Dict[str, np.ndarray]:
+        """
+        Views over the last n closed bars as columns (time, open, high, low, close, volume)
+        """
+        series = self._series.get((instrument, granularity))
+        if series is None:
+            return {column: np.empty(0) for column in BAR_COLUMNS}
+        return dict(zip(BAR_COLUMNS, series.closed.last(n)))
+
+    def current(self, instrument: str, granularity: str) -> Optional[Dict[str, float]]:
+        """
+        The bar still forming, or None
+        """
+        series = self._series.get((instrument, granularity))
+        if series is None or series.current is None:
+            return None
+        return dict(zip(BAR_COLUMNS, series.current))
+
+    def flush(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        for series in self._series.values():
+            self._emit(series, series.close_due(now))
+
+    async def start(self, interval: float = 1.0):
+        """
+        Close bars on time even when an instrument stops ticking
+        """
+        if self._task is not None:
+            return
+
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                self.flush()
+
+        self._task = asyncio.get_running_loop().create_task(run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": len(self._series),
+            "late_ticks": sum(series.late_ticks for series in self._series.values())
+        }
+
+
+bar_builder = BarBuilder(
+    granularities=[granularity.strip() for granularity in os.getenv("BAR_GRANULARITIES", "S5,M1,M5,H1").split(",")],
+    capacity=int(os.getenv("BAR_CAPACITY", "10000"))
+)
+price_hub.add_listener(bar_builder.on_tick)
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.infrastructure.market_data.bar_builder import BAR_COLUMNS, GRANULARITIES
+from src.infrastructure.market_data.tick_store import parse_time
+from src.infrastructure.oanda_api.async_oanda_api_service import AsyncOandaApiService
+
+
+# OANDA returns at most 5000 candles per request.
+MAX_CANDLES_PER_REQUEST = 5000
+
+
+def _rfc3339(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+
+
+def candle_columns(candles: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    OANDA mid-price candles to BAR_COLUMNS arrays
+    """
+    return {
+        "time": np.array([parse_time(c["time"]) for c in candles]),
+        "open": np.array([float(c["mid"]["o"]) for c in candles]),
+        "high": np.array([float(c["mid"]["h"]) for c in candles]),
+        "low": np.array([float(c["mid"]["l"]) for c in candles]),
+        "close": np.array([float(c["mid"]["c"]) for c in candles]),
+        "volume": np.array([float(c["volume"]) for c in candles])
+    }
+
+
+class CandleStore:
+    """
+    Local columnar cache of historical candles, one directory per instrument and
+    granularity under `root`.
+
+    Each column (time, open, high, low, close, volume) is an append-only float64 file,
+    read back through np.memmap, so loading a year of M1 bars touches only the pages
+    that are actually used. `meta.json` holds the committed row count and is written
+    last, which keeps a crash mid-append from exposing half-written rows.
+    """
+
+    def __init__(self, root: str = "./candle_cache"):
+        self.root = root
+
+    def _dir(self, instrument: str, granularity: str) -> str:
+        return os.path.join(self.root, instrument, granularity)
+
+    def _meta(self, instrument: str, granularity: str) -> Dict:
+        path = os.path.join(self._dir(instrument, granularity), "meta.json")
+        if not os.path.exists(path):
+            return {"rows": 0, "last_time": None}
+        with open(path) as file:
+            return json.load(file)
+
+    def last_time(self, instrument: str, granularity: str) -> Optional[float]:
+        return self._meta(instrument, granularity)["last_time"]
+
+    def append(self, instrument: str, granularity: str, columns: Dict[str, np.ndarray]):
+        """
+        Append rows that are strictly newer than what is cached
+        """
+        meta = self._meta(instrument, granularity)
+        times = columns["time"]
+        if meta["last_time"] is not None:
+            keep = times > meta["last_time"]
+            columns = {name: values[keep] for name, values in columns.items()}
+            times = columns["time"]
+        if len(times) == 0:
+            return 0
+
+        directory = self._dir(instrument, granularity)
+        os.makedirs(directory, exist_ok=True)
+        for name in BAR_COLUMNS:
+            path = os.path.join(directory, f"{name}.f64")
+            with open(path, "r+b" if os.path.exists(path) else "wb") as file:
+                # Truncate anything past the committed rows left behind by an interrupted append.
+                file.truncate(meta["rows"] * 8)
+                file.seek(0, os.SEEK_END)
+                file.write(np.ascontiguousarray(columns[name], dtype=np.float64).tobytes())
+
+        meta = {"rows": meta["rows"] + len(times), "last_time": float(times[-1])}
+        tmp = os.path.join(directory, "meta.json.tmp")
+        with open(tmp, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+        return len(times)
+
+    def load(self, instrument: str, granularity: str, start: Optional[float] = None,
+             end: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Memory-mapped columns for [start, end) in epoch seconds
+        :return: time, open, high, low, close and volume arrays
+        """
+        rows = self._meta(instrument, granularity)["rows"]
+        if rows == 0:
+            return {name: np.empty(0) for name in BAR_COLUMNS}
+        directory = self._dir(instrument, granularity)
+        columns = {
+            name: np.memmap(os.path.join(directory, f"{name}.f64"), dtype=np.float64, mode="r", shape=(rows,))
+            for name in BAR_COLUMNS
+        }
+        lo = int(np.searchsorted(columns["time"], start, side="left")) if start is not None else 0
+        hi = int(np.searchsorted(columns["time"], end, side="left")) if end is not None else rows
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+
+class CandleDownloader:
+    """
+    Fetches candle history from OANDA into a CandleStore.
+
+    The missing range is cut into windows of at most 5000 candles that are fetched in
+    parallel, with at most `concurrency` requests in flight and at least
+    1 / `requests_per_second` between request starts. Only the tail after the last cached
+    candle is ever requested, so repeated syncs are cheap.
+    """
+
+    def __init__(self, store: CandleStore, service: Optional[AsyncOandaApiService] = None,
+                 concurrency: int = 8, requests_per_second: float = 20.0):
+        self.store = store
+        self.service = service or AsyncOandaApiService()
+        self.concurrency = concurrency
+        self.interval = 1 / requests_per_second
+        self._next_slot = 0.0
+        self.requests = 0
+
+    async def _throttle(self):
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _fetch(self, semaphore: asyncio.Semaphore, instrument: str, granularity: str,
+                     start: float, end: float) -> List[Dict]:
+        async with semaphore:
+            await self._throttle()
+            self.requests += 1
+            response = await self.service.get_candles(
+                instrument, granularity, from_time=_rfc3339(start), to_time=_rfc3339(end), price="M"
+            )
+        return [candle for candle in response.get("candles", []) if candle.get("complete")]
+
+    async def sync(self, instrument: str, granularity: str, since: float) -> int:
+        """
+        Bring the cache up to date
+        :param instrument: The instrument (e.g., "EUR_USD")
+        :param granularity: S5, M1, M5, H1, ...
+        :param since: Epoch seconds to start from when nothing is cached yet
+        :return: Number of candles added
+        """
+        seconds = GRANULARITIES[granularity]
+        last = self.store.last_time(instrument, granularity)
+        start = last + seconds if last is not None else since
+        end = time.time()
+        if start >= end:
+            return 0
+
+        window = MAX_CANDLES_PER_REQUEST * seconds
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pages = await asyncio.gather(*[
+            self._fetch(semaphore, instrument, granularity, page_start, min(page_start + window, end))
+            for page_start in np.arange(start, end, window)
+        ])
+
+        candles = {}
+        for page in pages:
+            for candle in page:
+                candles[parse_time(candle["time"])] = candle
+        if not candles:
+            return 0
+        added = self.store.append(instrument, granularity, candle_columns([candles[t] for t in sorted(candles)]))
+        logging.info(f"Cached {added} {granularity} candles for {instrument} in {len(pages)} requests")
+        return added
+
+
+candle_store = CandleStore(root=os.getenv("CANDLE_CACHE_DIR", "./candle_cache"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Download OANDA candles into the local cache")
+    parser.add_argument("instruments", help="Comma separated, e.g. EUR_USD,GBP_USD")
+    parser.add_argument("granularity", choices=sorted(GRANULARITIES))
+    parser.add_argument("--days", type=float, default=365, help="History to fetch when nothing is cached yet")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=20.0, help="Maximum requests per second")
+    args = parser.parse_args()
+
+    async def main():
+        downloader = CandleDownloader(candle_store, concurrency=args.concurrency, requests_per_second=args.rps)
+        try:
+            for instrument in args.instruments.split(","):
+                started = time.perf_counter()
+                added = await downloader.sync(instrument, args.granularity, time.time() - args.days * 86400)
+                print(f"{instrument} {args.granularity}: +{added} candles in {time.perf_counter() - started:.1f}s")
+        finally:
+            await downloader.service.aclose()
+
+    asyncio.run(main())
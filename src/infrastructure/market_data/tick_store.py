@@ -0,0 +1,179 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from src.infrastructure.oanda_api.price_hub import price_hub
+
+
+def parse_time(value: str) -> float:
+    """
+    RFC3339 timestamp (OANDA sends nanoseconds) to epoch seconds
+    """
+    if value.endswith("Z"):
+        value = value[:-1]
+    if "." in value:
+        whole, fraction = value.split(".", 1)
+        value = f"{whole}.{fraction[:6]}"
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+class ColumnRing:
+    """
+    Fixed-size columnar history (e.g. time/bid/ask, or OHLC bars).
+
+    Every row is written twice, at `i` and `i + capacity`, so the last n rows are always
+    one contiguous slice of the doubled arrays: appends stay O(1) and windows are
+    zero-copy NumPy views that never need to be stitched back together.
+    """
+
+    def __init__(self, capacity: int, columns: Tuple[str, ...]):
+        self.capacity = capacity
+        self.columns = columns
+        self.data = {column: np.zeros(2 * capacity, dtype=np.float64) for column in columns}
+        self.count = 0
+
+    def append(self, *values: float):
+        i = self.count % self.capacity
+        j = i + self.capacity
+        for column, value in zip(self.columns, values):
+            array = self.data[column]
+            array[i] = array[j] = value
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def last(self, n: int) -> Tuple[np.ndarray, ...]:
+        n = min(n, len(self))
+        end = (self.count - 1) % self.capacity + self.capacity + 1
+        return tuple(self.data[column][end - n:end] for column in self.columns)
+
+    def since(self, start: float) -> Tuple[np.ndarray, ...]:
+        """
+        Rows whose first column (time) is >= start
+        """
+        columns = self.last(len(self))
+        # Rows arrive in time order, so the window start is a binary search away.
+        offset = int(np.searchsorted(columns[0], start, side="left"))
+        return tuple(column[offset:] for column in columns)
+
+
+TICK_COLUMNS = ("time", "bid", "ask")
+
+
+class TickStore:
+    """
+    In-memory tick history per instrument, fed by the price hub.
+
+    Answers "last price", "last N seconds" and spread statistics from memory, without a
+    broker round trip.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        self._rings: Dict[str, ColumnRing] = {}
+        self._subscription = None
+        self._task: Optional[asyncio.Task] = None
+
+    def append(self, instrument: str, time: float, bid: float, ask: float):
+        ring = self._rings.get(instrument)
+        if ring is None:
+            ring = self._rings[instrument] = ColumnRing(self.capacity, TICK_COLUMNS)
+        ring.append(time, bid, ask)
+
+    def on_tick(self, tick: Dict[str, Any]):
+        self.append(tick["instrument"], parse_time(tick["time"]), tick["bid"], tick["ask"])
+
+    def last_price(self, instrument: str) -> Optional[Dict[str, float]]:
+        """
+        Latest bid/ask for an instrument, or None if it has never ticked
+        """
+        ring = self._rings.get(instrument)
+        if ring is None or ring.count == 0:
+            return None
+        time, bid, ask = ring.last(1)
+        return {
+            "instrument": instrument,
+            "time": float(time[0]),
+            "bid": float(bid[0]),
+            "ask": float(ask[0]),
+            "mid": float((bid[0] + ask[0]) / 2)
+        }
+
+    def last_n(self, instrument: str, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Views over the last n ticks as (time, bid, ask). The views are invalidated once
+        the ring wraps past them, so copy them if they must outlive the next ticks.
+        """
+        ring = self._rings.get(instrument)
+        if ring is None:
+            empty = np.empty(0)
+            return empty, empty, empty
+        return ring.last(n)
+
+    def last_seconds(self, instrument: str, seconds: float, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Views over the ticks of the last `seconds` as (time, bid, ask)
+        """
+        ring = self._rings.get(instrument)
+        if ring is None or ring.count == 0:
+            empty = np.empty(0)
+            return empty, empty, empty
+        if now is None:
+            now = ring.last(1)[0][0]
+        return ring.since(now - seconds)
+
+    def spread_stats(self, instrument: str, seconds: float = 60.0) -> Optional[Dict[str, float]]:
+        """
+        Spread statistics over the last `seconds`
+        """
+        _, bid, ask = self.last_seconds(instrument, seconds)
+        if len(bid) == 0:
+            return None
+        spread = ask - bid
+        return {
+            "instrument": instrument,
+            "ticks": int(len(spread)),
+            "last": float(spread[-1]),
+            "mean": float(spread.mean()),
+            "min": float(spread.min()),
+            "max": float(spread.max()),
+            "std": float(spread.std())
+        }
+
+    async def start(self, instruments: Iterable[str]):
+        """
+        Keep the hub streaming these instruments even when nobody else is subscribed
+        """
+        instruments = list(instruments)
+        if not instruments or self._task is not None:
+            return
+        self._subscription = price_hub.subscribe(instruments, policy="conflate")
+
+        async def drain():
+            # Ticks reach the store through the hub listener; this only holds the stream open.
+            async for _ in self._subscription:
+                pass
+
+        self._task = asyncio.get_running_loop().create_task(drain())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._subscription is not None:
+            await self._subscription.close()
+            self._subscription = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "instruments": {instrument: len(ring) for instrument, ring in self._rings.items()}
+        }
+
+
+tick_store = TickStore(capacity=int(os.getenv("TICK_STORE_CAPACITY", "100000")))
+price_hub.add_listener(tick_store.on_tick)
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from .meta_api_service import MetaApiService
+
+
+class _Entry:
+    def __init__(self, service: MetaApiService):
+        self.service = service
+        self.lock = asyncio.Lock()
+        self.ready = False
+        self.suspect = False
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class MetaApiConnectionManager:
+    """
+    Keeps MetaApi accounts deployed and their RPC connections synchronized between calls.
+
+    The first session for a login pays the warm-up (account lookup, deploy, wait_connected,
+    RPC connect, wait_synchronized); later sessions reuse the same MetaApiService and its
+    connection, so a call costs one RPC round trip. Sessions for the same login run
+    concurrently over the shared connection.
+
+    A session that raises marks its connection suspect. The next session probes it with a
+    cheap server-time call and reconnects only if the probe fails, so ordinary trading
+    errors (invalid stops, no money) do not tear the connection down. Accounts that have
+    had no session for `idle_timeout` seconds are closed and undeployed under the
+    account's lock; a session that arrives meanwhile waits and deploys again afterwards.
+    """
+
+    def __init__(self, service_factory: Callable[..., MetaApiService] = MetaApiService,
+                 idle_timeout: float = 600.0, probe_timeout: float = 10.0):
+        self.service_factory = service_factory
+        self.idle_timeout = idle_timeout
+        self.probe_timeout = probe_timeout
+        self._entries: Dict[str, _Entry] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self.sessions = 0
+        self.warm_hits = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.undeploys = 0
+
+    def _entry(self, login: Optional[str]) -> _Entry:
+        key = login or os.getenv('LOGIN', '208584876')
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(self.service_factory(login=key))
+        return entry
+
+    async def _disconnect(self, service: MetaApiService, undeploy: bool):
+        try:
+            if service.connection:
+                await service.connection.close()
+            if undeploy and service.account:
+                await service.account.undeploy()
+        except Exception as e:
+            logging.error(f"MetaApi cleanup failed for {service.login}: {str(e)}")
+        finally:
+            service.connection = None
+
+    async def _probe(self, service: MetaApiService) -> bool:
+        try:
+            await asyncio.wait_for(service.connection.get_server_time(), self.probe_timeout)
+            return True
+        except Exception as e:
+            logging.error(f"MetaApi connection for {service.login} failed its probe: {str(e)}")
+            return False
+
+    async def _ensure_ready(self, entry: _Entry):
+        async with entry.lock:
+            if entry.ready and entry.suspect:
+                entry.suspect = False
+                if not await self._probe(entry.service):
+                    entry.ready = False
+                    self.reconnects += 1
+                    await self._disconnect(entry.service, undeploy=False)
+            if entry.ready:
+                self.warm_hits += 1
+                return
+            if entry.service.connection:
+                # Left over from an initialize() that failed after connecting.
+                await self._disconnect(entry.service, undeploy=False)
+            # initialize() is idempotent: it finds the existing account and deploy() is a no-op when deployed.
+            await entry.service.initialize()
+            entry.ready = True
+            self.connects += 1
+
+    @asynccontextmanager
+    async def session(self, login: Optional[str] = None) -> AsyncIterator[MetaApiService]:
+        """
+        A connected MetaApiService for the login (LOGIN by default)
+        """
+        if self._reaper is None:
+            self._reaper = asyncio.get_running_loop().create_task(self._reap())
+        entry = self._entry(login)
+        entry.in_use += 1
+        self.sessions += 1
+        try:
+            await self._ensure_ready(entry)
+            yield entry.service
+        except Exception:
+            entry.suspect = True
+            raise
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(max(min(self.idle_timeout / 4, 30.0), 0.01))
+            for key, entry in list(self._entries.items()):
+                if entry.in_use or time.monotonic() - entry.last_used < self.idle_timeout:
+                    continue
+                # Under the entry lock, so a session arriving mid-undeploy waits for it to finish
+                # and then deploys again, rather than being undeployed underneath.
+                async with entry.lock:
+                    if entry.in_use or time.monotonic() - entry.last_used < self.idle_timeout:
+                        continue
+                    if entry.ready:
+                        logging.info(f"MetaApi account {key} idle for {self.idle_timeout}s, undeploying")
+                        entry.ready = False
+                        await self._disconnect(entry.service, undeploy=True)
+                        self.undeploys += 1
+                    if not entry.in_use and self._entries.get(key) is entry:
+                        del self._entries[key]
+
+    async def close(self):
+        """
+        Close every connection and undeploy every account, e.g. on shutdown
+        """
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        entries, self._entries = self._entries, {}
+        for entry in entries.values():
+            async with entry.lock:
+                if entry.ready:
+                    entry.ready = False
+                    await self._disconnect(entry.service, undeploy=True)
+                    self.undeploys += 1
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "accounts": {
+                key: {"ready": entry.ready, "in_use": entry.in_use, "idle": round(now - entry.last_used, 1)}
+                for key, entry in self._entries.items()
+            },
+            "sessions": self.sessions,
+            "warm_hits": self.warm_hits,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "undeploys": self.undeploys,
+            "idle_timeout": self.idle_timeout
+        }
+
+
+metaapi_connections = MetaApiConnectionManager(
+    idle_timeout=float(os.getenv("METAAPI_IDLE_TIMEOUT", "600")),
+    probe_timeout=float(os.getenv("METAAPI_PROBE_TIMEOUT", "10"))
+)
@@ -1,6 +1,8 @@
 from metaapi_cloud_sdk import MetaApi
 from ...domain.interfaces.trading_service import TradingService
 from ...domain.entities.trade import Trade
+from ..rate_limiter import DEADLINES, ORDER, READ, AccountScheduler, scheduler_for
+from ..single_flight import AsyncSingleFlight
 import os
 import logging
 
@@ -9,16 +11,30 @@ logging.basicConfig(
     level=logging.INFO,         # Log level
     format='%(asctime)s [%(levelname)s] %(message)s'
 )
+
+# Identical reads in flight at the same time (price per symbol, positions per login)
+# share one RPC call.
+reads = AsyncSingleFlight("metaapi_reads")
+
+
 class MetaApiService(TradingService):
-    def __init__(self):
+    def __init__(self, login: str = None, password: str = None, server_name: str = None):
         self.token = os.getenv('TOKEN', 'eyJhbGciOiJSUzUxMiIsInR5cCI6IskpXVCJ9.eyJfaWQiOiJlYmExMGY2NmRkODI0Y2Y0MGViMzEwYTBiMmZmOGEyZiIsImFjY2Vzc1J1bGVzIjpbeyJpZCI6InRyYWRpbmctYWNjb3VudC1tYW5hZ2VtZW50LWFwaSIsIm1ldGhvZHMiOlsidHJhZGluZy1hY2NvdW50LW1hbmFnZW1lbnQtYXBpOnJlc3Q6cHVibGljOio6KiJdLCJyb2xlcyI6WyJyZWFkZXIiLCJ3cml0ZXIiXSwicmVzb3VyY2VzIjpbIio6JFVTRVJfSUQkOioiXX0seyJpZCI6Im1ldGFhcGktcmVzdC1hcGkiLCJtZXRob2RzIjpbIm1ldGFhcGktYXBpOnJlc3Q6cHVibGljOio6KiJdLCJyb2xlcyI6WyJyZWFkZXIiLCJ3cml0ZXIiXSwicmVzb3VyY2VzIjpbIio6JFVTRVJfSUQkOioiXX0seyJpZCI6Im1ldGFhcGktcnBjLWFwaSIsIm1ldGhvZHMiOlsibWV0YWFwaS1hcGk6d3M6cHVibGljOio6KiJdLCJyb2xlcyI6WyJyZWFkZXIiLCJ3cml0ZXIiXSwicmVzb3VyY2VzIjpbIio6JFVTRVJfSUQkOioiXX0seyJpZCI6Im1ldGFhcGktcmVhbC10aW1lLXN0cmVhbWluZy1hcGkiLCJtZXRob2RzIjpbIm1ldGFhcGktYXBpOndzOnB1YmxpYzoqOioiXSwicm9sZXMiOlsicmVhZGVyIiwid3JpdGVyIl0sInJlc291cmNlcyI6WyIqOiRVU0VSX0lEJDoqIl19LHsiaWQiOiJtZXRhc3RhdHMtYXBpIiwibWV0aG9kcyI6WyJtZXRhc3RhdHMtYXBpOnJlc3Q6cHVibGljOio6KiJdLCJyb2xlcyI6WyJyZWFkZXIiLCJ3cml0ZXIiXSwicmVzb3VyY2VzIjpbIio6JFVTRVJfSUQkOioiXX0seyJpZCI6InJpc2stbWFuYWdlbWVudC1hcGkiLCJtZXRob2RzIjpbInJpc2stbWFuYWdlbWVudC1hcGk6cmVzdDpwdWJsaWM6KjoqIl0sInJvbGVzIjpbInJlYWRlciIsIndyaXRlciJdLCJyZXNvdXJjZXMiOlsiKjokVVNFUl9JRCQ6KiJdfSx7ImlkIjoiY29weWZhY3RvcnktYXBpIiwibWV0aG9kcyI6WyJjb3B5ZmFjdG9yeS1hcGk6cmVzdDpwdWJsaWM6KjoqIl0sInJvbGVzIjpbInJlYWRlciIsIndyaXRlciJdLCJyZXNvdXJjZXMiOlsiKjokVVNFUl9JRCQ6KiJdfSx7ImlkIjoibXQtbWFuYWdlci1hcGkiLCJtZXRob2RzIjpbIm10LW1hbmFnZXItYXBpOnJlc3Q6ZGVhbGluZzoqOioiLCJtdC1tYW5hZ2VyLWFwaTpyZXN0OnB1YmxpYzoqOioiXSwicm9sZXMiOlsicmVhZGVyIiwid3JpdGVyIl0sInJlc291cmNlcyI6WyIqOiRVU0VSX0lEJDoqIl19LHsiaWQiOiJiaWxsaW5nLWFwaSIsIm1ldGhvZHMiOlsiYmlsbGluZy1hcGk6cmVzdDpwdWJsaWM6KjoqIl0sInJvbGVzIjpbInJlYWRlciJdLCJyZXNvdXJjZXMiOlsiKjokVVNFUl9JRCQ6KiJdfV0sImlnbm9yZVJhdGVMaW1pdHMiOmZhbHNlLCJ0b2tlbklkIjoiMjAyMTAyMTMiLCJpbXBlcnNvbmF0ZWQiOmZhbHNlLCJyZWFsVXNlcklkIjoiZWJhMTBmNjZkZDgyNGNmNDBlYjMxMGEwYjJmZjhhMmYiLCJpYXQiOjE3NDM4NTA2MDAsImV4cCI6MTc1MTYyNjYwMH0.YjrnJOBxTmTK5Of0gJM5GhF8IAnrjvuBDHVHSaslcFd7h5D267Ac8GvRfppLhQTF5uDiRM5g_7m0GCGSKKnASkm3KLaXJj87pG-J-gZ6LGL5XOdOIotvh5jSMUPJalQZWQKsjsdlP6wKTncN5BBr3FvV4D5jNsAbS2vSoMjGrBCpvvXYCTaxucFgb2Ze5UWKxzzPjnurz6hzaEFOHDl9DsaTqW7_-4pXS93kXZETisLKGpgmNYOC7X4x5imcV2SZS_nnGM-dPHb7xK66ugkNtvLTwlDG4aaXnB02PU--Esk7irFU7xSdP44tdRfYvWsXFaTZnJc5MHpl3flfWm1xKIVWFkCRbSVMOHdOLbCiYXNJ4DA93EDdMQjRQAVBGfL3VaaoMO7yOGJkRV0esnacOUHCL43XK-KgP-sfs-5AOqcHpDLCj8NClWC6r_z_U08euOnIDNLg1zRyUYPbalOk2CKkIkv0hxzUFgCqEjcC3Lb8ubePfWgbff0denhKn5tI10FhZWXyJ6yUePhEsCGSahAJuA5-IBnQ2Lcbr_Jj8vZfCW-whgpykNqwqwUL4L_cJtGSbk9G_KA0oQ2Jm1_CzfNog-dSjHhp7Xo61nVpvH0d16TwPGgJ3l8CtUWS4V0nQmmDdvHEvQaQ_6jOer_KL9uU04bgZI0H4MU2Tyn-DdU')
-        self.login = os.getenv('LOGIN', '208584876')
-        self.password = os.getenv('PASSWORD', '85236580@Ex')
-        self.server_name = os.getenv('SERVER', 'Exness-MT5Trial9')
+        self.login = login or os.getenv('LOGIN', '208584876')
+        self.password = password or os.getenv('PASSWORD', '85236580@Ex')
+        self.server_name = server_name or os.getenv('SERVER', 'Exness-MT5Trial9')
         self.api = MetaApi(self.token)
         self.connection = None
         self.account = None
 
+    @property
+    def scheduler(self) -> AccountScheduler:
+        return scheduler_for("metaapi", self.login)
+
+    async def _rpc(self, fn, *args, priority: int = READ):
+        # TooManyRequestsException is retried at MetaApi's recommendedRetryTime.
+        return await self.scheduler.call_async(fn, *args, priority=priority, timeout=DEADLINES[priority])
+
     async def initialize(self):
         logging.info("trying to initialize")
         try:
@@ -52,7 +68,8 @@ class MetaApiService(TradingService):
     async def execute_trade(self, trade: Trade):
         try:
             if trade.type == "ORDER_TYPE_BUY":
-                result = await self.connection.create_limit_buy_order(
+                result = await self._rpc(
+                    self.connection.create_limit_buy_order,
                     trade.symbol,
                     trade.volume,
                     trade.open_price,
@@ -65,8 +82,10 @@ class MetaApiService(TradingService):
                             'type': 'ORDER_TIME_SPECIFIED',
                             'time': trade.expiration
                         } if trade.expiration else None
-                    }
+                    },
+                    priority=ORDER
                 )
+                reads.forget(("positions", self.login))
                 return result
         except Exception as e:
             logging.error(f"Failed to execute trade: {str(e)}")
@@ -75,21 +94,21 @@ class MetaApiService(TradingService):
     async def get_market_data(self, symbol: str):
         try:
             logging.info(f"Symbol pass: {symbol}")
-            return await self.connection.get_symbol_price(symbol)
+            return await reads.do(("price", self.login, symbol), self._rpc, self.connection.get_symbol_price, symbol)
         except Exception as e:
             logging.error("Failed to get market data: {str(e)}")
             raise Exception(f"Failed to get market data: {str(e)}")
 
     async def get_positions(self):
         try:
-            return await self.connection.get_positions()
+            return await reads.do(("positions", self.login), self._rpc, self.connection.get_positions)
         except Exception as e:
             logging.error(f"Failed to get positions: {str(e)}")
             raise Exception(f"Failed to get positions: {str(e)}")
 
     async def monitor_position(self, position_id: str):
         try:
-            return await self.connection.get_position(position_id)
+            return await self._rpc(self.connection.get_position, position_id)
         except Exception as e:
             logging.error(f"Failed to monitor position: {str(e)}")
             raise Exception(f"Failed to monitor position: {str(e)}")
\ No newline at end of file
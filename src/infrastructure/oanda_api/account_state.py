@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.infrastructure.oanda_api.async_oanda_api_service import AsyncOandaApiService, shared_async_oanda_service
+from src.infrastructure.oanda_api.price_hub import Subscription, price_hub
+
+
+# Account fields refreshed from the `state` part of an account changes response.
+STATE_FIELDS = ("unrealizedPL", "NAV", "marginUsed", "marginAvailable", "positionValue",
+                "marginCloseoutPercent", "withdrawalLimit")
+
+
+class AccountState:
+    """
+    Local copy of an OANDA account: summary (balance, NAV, margin), open positions,
+    open trades and pending orders.
+
+    Seeded once from AccountDetails, then kept current from the transaction stream:
+    every transaction triggers one `/changes?sinceTransactionID=` call (bursts collapse
+    into a single call) that carries exactly the orders, trades and positions that moved
+    plus fresh account state. Between transactions, positions in the account currency are
+    re-marked from price hub ticks, so NAV and unrealized P/L follow the market without a
+    request.
+
+    Reads are served from memory while the stream is healthy. When it has been quiet (no
+    transaction or heartbeat) for longer than `max_staleness` seconds, the next read
+    re-seeds over REST instead of returning stale data.
+    """
+
+    def __init__(self, service_factory: Callable[[], AsyncOandaApiService] = shared_async_oanda_service,
+                 max_staleness: float = 15.0, max_backoff: float = 30.0):
+        self.service_factory = service_factory
+        self.max_staleness = max_staleness
+        self.max_backoff = max_backoff
+        self.account: Dict[str, Any] = {}
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.trades: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.last_transaction_id: Optional[str] = None
+        self.last_update = 0.0
+        # Set when changes may have been missed; only a full re-seed clears it.
+        self.needs_reseed = False
+        self.connected = False
+        self._refresh_lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._prices: Optional[Subscription] = None
+        self._price_task: Optional[asyncio.Task] = None
+        self.local_reads = 0
+        self.rest_refreshes = 0
+        self.change_syncs = 0
+        self.transactions = 0
+        price_hub.add_listener(self.on_tick)
+
+    @property
+    def service(self) -> AsyncOandaApiService:
+        return self.service_factory()
+
+    # Seeding and changes
+
+    def _seed(self, account: Dict[str, Any], last_transaction_id: str):
+        self.positions = {
+            position["instrument"]: position for position in account.get("positions", [])
+            if float(position["long"]["units"]) or float(position["short"]["units"])
+        }
+        self.trades = {trade["id"]: trade for trade in account.get("trades", [])}
+        self.orders = {order["id"]: order for order in account.get("orders", []) if order.get("state", "PENDING") == "PENDING"}
+        self.account = {key: value for key, value in account.items() if key not in ("positions", "trades", "orders")}
+        self.last_transaction_id = last_transaction_id
+        self.last_update = time.monotonic()
+        self.needs_reseed = False
+
+    async def refresh(self):
+        """
+        Re-seed from AccountDetails. Concurrent callers share one request.
+        """
+        started = time.monotonic()
+        async with self._refresh_lock:
+            if self.last_update > started and not self.needs_reseed:
+                return
+            response = await self.service.get_account_details()
+            self._seed(response["account"], response["lastTransactionID"])
+            self.rest_refreshes += 1
+        self._resubscribe_prices()
+
+    def apply_changes(self, response: Dict[str, Any]):
+        changes = response.get("changes", {})
+        for order in changes.get("ordersCreated", []):
+            self.orders[order["id"]] = order
+        for key in ("ordersCancelled", "ordersFilled", "ordersTriggered"):
+            for order in changes.get(key, []):
+                self.orders.pop(order["id"], None)
+        for key in ("tradesOpened", "tradesReduced"):
+            for trade in changes.get(key, []):
+                self.trades[trade["id"]] = trade
+        for trade in changes.get("tradesClosed", []):
+            self.trades.pop(trade["id"], None)
+        for position in changes.get("positions", []):
+            if float(position["long"]["units"]) or float(position["short"]["units"]):
+                self.positions[position["instrument"]] = position
+            else:
+                self.positions.pop(position["instrument"], None)
+        for transaction in changes.get("transactions", []):
+            self.apply_transaction(transaction)
+
+        state = response.get("state", {})
+        self.account.update({key: state[key] for key in STATE_FIELDS if key in state})
+        for calculated in state.get("positions", []):
+            position = self.positions.get(calculated["instrument"])
+            if position is not None:
+                position["unrealizedPL"] = calculated["netUnrealizedPL"]
+                position["long"]["unrealizedPL"] = calculated["longUnrealizedPL"]
+                position["short"]["unrealizedPL"] = calculated["shortUnrealizedPL"]
+        for calculated in state.get("trades", []):
+            trade = self.trades.get(calculated["id"])
+            if trade is not None:
+                trade["unrealizedPL"] = calculated["unrealizedPL"]
+
+        self.account.update(
+            openPositionCount=len(self.positions), openTradeCount=len(self.trades), pendingOrderCount=len(self.orders)
+        )
+        self.last_transaction_id = response.get("lastTransactionID", self.last_transaction_id)
+        self.last_update = time.monotonic()
+        self._resubscribe_prices()
+
+    def apply_transaction(self, transaction: Dict[str, Any]):
+        # Fills, financing and transfers carry the resulting balance; nothing to recompute.
+        if "accountBalance" in transaction:
+            self.account["balance"] = transaction["accountBalance"]
+
+    async def _sync_changes(self):
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            if self.last_transaction_id is None:
+                continue
+            try:
+                self.apply_changes(await self.service.get_account_changes(self.last_transaction_id))
+                self.change_syncs += 1
+            except Exception as e:
+                logging.error(f"Account changes sync failed: {str(e)}")
+                # Heartbeats keep last_update current, so staleness alone would not catch this.
+                self.needs_reseed = True
+
+    # Prices
+
+    def on_tick(self, tick: Dict[str, Any]):
+        position = self.positions.get(tick["instrument"])
+        currency = self.account.get("currency")
+        # Only instruments quoted in the account currency can be marked without a conversion rate.
+        if position is None or not currency or not tick["instrument"].endswith(f"_{currency}"):
+            return
+        total = 0.0
+        for side, price in (("long", tick["bid"]), ("short", tick["ask"])):
+            units = float(position[side]["units"])
+            if units:
+                pl = units * (price - float(position[side]["averagePrice"]))
+                position[side]["unrealizedPL"] = str(round(pl, 4))
+                total += pl
+        previous = float(position.get("unrealizedPL", 0))
+        position["unrealizedPL"] = str(round(total, 4))
+        delta = total - previous
+        for key in ("unrealizedPL", "NAV", "marginAvailable"):
+            if key in self.account:
+                self.account[key] = str(round(float(self.account[key]) + delta, 4))
+
+    def _resubscribe_prices(self):
+        if self._task is None:
+            return
+        instruments = frozenset(self.positions)
+        if self._prices is not None and self._prices.instruments == instruments:
+            return
+        previous, previous_task = self._prices, self._price_task
+        self._prices, self._price_task = None, None
+        if instruments:
+            self._prices = price_hub.subscribe(instruments, policy="conflate")
+
+            async def drain(subscription: Subscription):
+                # Ticks reach on_tick through the hub listener; this only holds the stream open.
+                async for _ in subscription:
+                    pass
+
+            self._price_task = asyncio.get_running_loop().create_task(drain(self._prices))
+        if previous_task is not None:
+            previous_task.cancel()
+        if previous is not None:
+            asyncio.get_running_loop().create_task(previous.close())
+
+    # Transaction stream
+
+    async def _consume(self):
+        stream = self.service.stream_transactions()
+        # Catch up on anything that happened while disconnected before trusting the stream.
+        self._changed.set()
+        async for message in stream:
+            self.connected = True
+            self.last_update = time.monotonic()
+            if message.get("type") == "HEARTBEAT":
+                continue
+            self.transactions += 1
+            if self.last_transaction_id is not None and int(message["id"]) <= int(self.last_transaction_id):
+                continue
+            self.apply_transaction(message)
+            self._changed.set()
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            consumer = asyncio.create_task(self._consume())
+            try:
+                # Same watchdog as the price hub: OANDA heartbeats every 5 seconds.
+                while not consumer.done():
+                    await asyncio.wait({consumer}, timeout=self.max_staleness)
+                    if not consumer.done() and time.monotonic() - self.last_update > self.max_staleness:
+                        logging.error(f"No transaction heartbeat for {self.max_staleness}s, reconnecting")
+                        consumer.cancel()
+                        await asyncio.wait({consumer})
+                if not consumer.cancelled() and consumer.exception():
+                    logging.error(f"Transaction stream failed: {str(consumer.exception())}")
+                elif self.connected:
+                    backoff = 1.0
+            finally:
+                self.connected = False
+                if not consumer.done():
+                    consumer.cancel()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def start(self):
+        async with self._start_lock:
+            if self._task is not None:
+                return
+            if self.last_transaction_id is None:
+                await self.refresh()
+            loop = asyncio.get_running_loop()
+            self._task = loop.create_task(self._run())
+            self._sync_task = loop.create_task(self._sync_changes())
+            self._resubscribe_prices()
+
+    async def stop(self):
+        for task in (self._task, self._sync_task, self._price_task):
+            if task is not None:
+                task.cancel()
+        self._task = self._sync_task = self._price_task = None
+        if self._prices is not None:
+            await self._prices.close()
+            self._prices = None
+        self.connected = False
+
+    # Reads
+
+    def fresh(self) -> bool:
+        return (self.last_transaction_id is not None and not self.needs_reseed
+                and time.monotonic() - self.last_update <= self.max_staleness)
+
+    async def _ensure_fresh(self):
+        if self._task is None:
+            await self.start()
+        if self.fresh():
+            self.local_reads += 1
+        else:
+            await self.refresh()
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        await self._ensure_fresh()
+        return list(self.positions.values())
+
+    async def get_position(self, instrument: str) -> Optional[Dict[str, Any]]:
+        await self._ensure_fresh()
+        return self.positions.get(instrument)
+
+    async def get_trades(self) -> List[Dict[str, Any]]:
+        await self._ensure_fresh()
+        return list(self.trades.values())
+
+    async def get_pending_orders(self) -> List[Dict[str, Any]]:
+        await self._ensure_fresh()
+        return list(self.orders.values())
+
+    async def get_summary(self) -> Dict[str, Any]:
+        await self._ensure_fresh()
+        return {**self.account, "lastTransactionID": self.last_transaction_id}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seeded": self.last_transaction_id is not None,
+            "connected": self.connected,
+            "needs_reseed": self.needs_reseed,
+            "age": round(time.monotonic() - self.last_update, 1) if self.last_update else None,
+            "last_transaction_id": self.last_transaction_id,
+            "positions": len(self.positions),
+            "local_reads": self.local_reads,
+            "rest_refreshes": self.rest_refreshes,
+            "change_syncs": self.change_syncs,
+            "transactions": self.transactions
+        }
+
+
+account_state = AccountState(
+    max_staleness=float(os.getenv("ACCOUNT_STATE_MAX_STALENESS", "15")),
+    max_backoff=float(os.getenv("ACCOUNT_STATE_MAX_BACKOFF", "30"))
+)
@@ -0,0 +1,289 @@
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from ...domain.entities.trade import Trade
+from ...domain.interfaces.trading_service import TradingService
+from ..rate_limiter import DEADLINES, ORDER, READ, AccountScheduler, scheduler_for
+from ..single_flight import AsyncSingleFlight
+
+
+ENVIRONMENTS = {
+    "practice": "https://api-fxpractice.oanda.com",
+    "live": "https://api-fxtrade.oanda.com",
+}
+
+STREAM_ENVIRONMENTS = {
+    "practice": "https://stream-fxpractice.oanda.com",
+    "live": "https://stream-fxtrade.oanda.com",
+}
+
+
+# Identical reads in flight at the same time (price per symbol, positions or account per
+# account) share one request and one result.
+reads = AsyncSingleFlight("oanda_async_reads")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header, in either delta-seconds or HTTP-date form
+    :return: The delay, or None when the header is missing or unparsable
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class OandaApiError(Exception):
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AsyncOandaApiService(TradingService):
+    """
+    Native asyncio client for the OANDA v20 REST API.
+
+    Set OANDA_API_URL (or pass `base_url`) to point it at a local mock v20 server, or pass
+    an `httpx.AsyncClient` built on a mock transport.
+    """
+
+    def __init__(self, api_token: Optional[str] = None, account_id: Optional[str] = None,
+                 base_url: Optional[str] = None, client: Optional[httpx.AsyncClient] = None,
+                 stream_url: Optional[str] = None):
+        self.api_token = api_token or os.getenv("OANDA_API_TOKEN", "8199890480410b1b7f60b3f4961ffabd-87fbedbd3788b503a7a3e933c1aa790f")
+        self.account_id = account_id or os.getenv("OANDA_ACCOUNT_ID", "101-004-31438010-001")
+        environment = os.getenv("OANDA_ENVIRONMENT", "practice")
+        self.base_url = base_url or os.getenv("OANDA_API_URL") or ENVIRONMENTS[environment]
+        self.stream_url = stream_url or os.getenv("OANDA_STREAM_URL") or base_url or os.getenv("OANDA_API_URL") or STREAM_ENVIRONMENTS[environment]
+        self.client = client or httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("OANDA_POOL_SIZE", "10")),
+                keepalive_expiry=float(os.getenv("OANDA_KEEPALIVE", "120"))
+            ),
+            timeout=float(os.getenv("OANDA_TIMEOUT", "10"))
+        )
+        self.headers = {
+            "Authorization": f"Bearer {self.api_token}",
+            "Content-Type": "application/json",
+            "Accept-Datetime-Format": "RFC3339"
+        }
+
+    @property
+    def scheduler(self) -> AccountScheduler:
+        # Shared with OandaApiService: both count against the same account limit.
+        return scheduler_for("oanda", self.account_id)
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        # Writes (orders, cancels, closes) go ahead of queued reads and get a longer deadline.
+        priority = READ if method == "GET" else ORDER
+        return await self.scheduler.call_async(
+            self._send, method, path, priority=priority, timeout=DEADLINES[priority], **kwargs
+        )
+
+    async def _send(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        response = await self.client.request(method, path, headers=self.headers, **kwargs)
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("errorMessage", response.text)
+            except ValueError:
+                message = response.text
+            raise OandaApiError(response.status_code, message, parse_retry_after(response.headers.get("Retry-After")))
+        return response.json()
+
+    def _order_data(self, symbol: str, units: float, take_profit: float = None, stop_loss: float = None,
+                    price: float = None, client_id: str = None, comment: str = None, expiration=None) -> Dict[str, Any]:
+        order = {
+            "type": "LIMIT" if price else "MARKET",
+            "instrument": symbol,
+            "units": str(units),
+            "timeInForce": "FOK",
+            "positionFill": "DEFAULT"
+        }
+        if price:
+            order["price"] = str(price)
+            order["timeInForce"] = "GTD" if expiration else "GTC"
+            if expiration:
+                order["gtdTime"] = expiration.isoformat()
+        if take_profit:
+            order["takeProfitOnFill"] = {"price": str(take_profit)}
+        if stop_loss:
+            order["stopLossOnFill"] = {"price": str(stop_loss)}
+        if client_id or comment:
+            order["clientExtensions"] = {key: value for key, value in (("id", client_id), ("comment", comment)) if value}
+        return {"order": order}
+
+    async def place_trade(self, symbol: str, units: float, take_profit: float = None, stop_loss: float = None) -> Dict[str, Any]:
+        """
+        Place a market order
+        :param symbol: The trading symbol (e.g., "EUR_USD")
+        :param units: Positive for buy, negative for sell
+        :param take_profit: Optional take profit price
+        :param stop_loss: Optional stop loss price
+        :return: Order response
+        """
+        response = await self._request(
+            "POST", f"/v3/accounts/{self.account_id}/orders",
+            json=self._order_data(symbol, units, take_profit, stop_loss)
+        )
+        self._forget_account_reads()
+        return response
+
+    async def execute_trade(self, trade: Trade):
+        """
+        Place an order for a Trade entity. Sell types go out as negative units; a trade
+        with an open_price becomes a LIMIT order, otherwise a MARKET order.
+        """
+        units = -abs(trade.volume) if "SELL" in trade.type.upper() else abs(trade.volume)
+        response = await self._request(
+            "POST", f"/v3/accounts/{self.account_id}/orders",
+            json=self._order_data(
+                trade.symbol, units, trade.take_profit, trade.stop_loss,
+                price=trade.open_price, client_id=trade.client_id,
+                comment=trade.comment, expiration=trade.expiration
+            )
+        )
+        self._forget_account_reads()
+        return response
+
+    def _forget_account_reads(self):
+        # An order changes positions and account state; do not serve a micro-TTL result from before it.
+        reads.forget(("positions", self.account_id))
+        reads.forget(("account", self.account_id))
+
+    async def get_market_data(self, symbol: str):
+        """
+        Current bid/ask for a symbol
+        :param symbol: The trading symbol (e.g., "EUR_USD")
+        :return: The OANDA price object
+        """
+        async def fetch():
+            response = await self._request(
+                "GET", f"/v3/accounts/{self.account_id}/pricing", params={"instruments": symbol}
+            )
+            prices = response.get("prices", [])
+            return prices[0] if prices else None
+
+        return await reads.do(("price", self.account_id, symbol), fetch)
+
+    async def get_pricing(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        async def fetch():
+            response = await self._request(
+                "GET", f"/v3/accounts/{self.account_id}/pricing", params={"instruments": ",".join(symbols)}
+            )
+            return response.get("prices", [])
+
+        return await reads.do(("pricing", self.account_id, tuple(sorted(symbols))), fetch)
+
+    async def get_positions(self):
+        async def fetch():
+            response = await self._request("GET", f"/v3/accounts/{self.account_id}/openPositions")
+            return response.get("positions", [])
+
+        return await reads.do(("positions", self.account_id), fetch)
+
+    async def monitor_position(self, position_id: str):
+        """
+        OANDA keys positions by instrument, so position_id is the instrument (e.g., "EUR_USD")
+        """
+        response = await self._request("GET", f"/v3/accounts/{self.account_id}/positions/{position_id}")
+        return response.get("position")
+
+    async def get_account_details(self) -> Dict[str, Any]:
+        return await reads.do(("account", self.account_id), self._request, "GET", f"/v3/accounts/{self.account_id}")
+
+    async def get_candles(self, instrument: str, granularity: str = "M1", count: int = None,
+                          from_time: str = None, to_time: str = None, price: str = "MBA") -> Dict[str, Any]:
+        """
+        Candles for an instrument
+        :param instrument: The instrument (e.g., "EUR_USD")
+        :param granularity: S5, M1, M5, H1, D, ...
+        :param count: Number of candles, mutually exclusive with from_time + to_time
+        :param from_time: RFC3339 start time
+        :param to_time: RFC3339 end time
+        :param price: Any combination of M (mid), B (bid), A (ask)
+        :return: The candles response
+        """
+        params = {"granularity": granularity, "price": price}
+        if count:
+            params["count"] = count
+        if from_time:
+            params["from"] = from_time
+        if to_time:
+            params["to"] = to_time
+        return await self._request("GET", f"/v3/instruments/{instrument}/candles", params=params)
+
+    async def list_accounts(self) -> List[Dict[str, Any]]:
+        response = await self._request("GET", "/v3/accounts")
+        return response.get("accounts", [])
+
+    async def stream_pricing(self, symbols: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream PRICE and HEARTBEAT messages for the given symbols
+        :param symbols: List of symbols (e.g., ["EUR_USD", "GBP_USD"])
+        """
+        async with self.client.stream(
+            "GET", f"{self.stream_url}/v3/accounts/{self.account_id}/pricing/stream",
+            headers=self.headers,
+            params={"instruments": ",".join(symbols)},
+            # The stream stays open; liveness is checked with heartbeats by the caller.
+            timeout=httpx.Timeout(None, connect=float(os.getenv("OANDA_TIMEOUT", "10")))
+        ) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise OandaApiError(response.status_code, response.text)
+            async for line in response.aiter_lines():
+                if line:
+                    yield json.loads(line)
+
+    async def get_account_changes(self, since_transaction_id: str) -> Dict[str, Any]:
+        """
+        Orders, trades and positions changed since a transaction, plus the current account state
+        :param since_transaction_id: The lastTransactionID already applied
+        :return: The changes response (changes, state, lastTransactionID)
+        """
+        return await self._request(
+            "GET", f"/v3/accounts/{self.account_id}/changes", params={"sinceTransactionID": since_transaction_id}
+        )
+
+    async def stream_transactions(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the account's transactions and HEARTBEAT messages
+        """
+        async with self.client.stream(
+            "GET", f"{self.stream_url}/v3/accounts/{self.account_id}/transactions/stream",
+            headers=self.headers,
+            timeout=httpx.Timeout(None, connect=float(os.getenv("OANDA_TIMEOUT", "10")))
+        ) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise OandaApiError(response.status_code, response.text)
+            async for line in response.aiter_lines():
+                if line:
+                    yield json.loads(line)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def shared_async_oanda_service() -> AsyncOandaApiService:
+    # One client per process so graph nodes share its connection pool.
+    return AsyncOandaApiService()
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import oandapyV20
+from oandapyV20.endpoints.accounts import AccountSummary
+from oandapyV20.exceptions import V20Error
+from oandapyV20.oandapyV20 import TRADING_ENVIRONMENTS
+from requests.adapters import HTTPAdapter
+
+from src.infrastructure.oanda_api.async_oanda_api_service import parse_retry_after
+
+
+# Retry-After of the last 429 seen by this thread. oandapyV20 raises V20Error with the status
+# and body only, so a session hook keeps the header for `request` to attach to the error.
+_throttled = threading.local()
+
+
+def _remember_retry_after(response, *args, **kwargs):
+    if response.status_code == 429:
+        _throttled.retry_after = response.headers.get("Retry-After")
+
+
+def request(client: oandapyV20.API, endpoint) -> Any:
+    """
+    client.request for a pooled client, with the broker's Retry-After (in seconds, or None)
+    set as `retry_after` on a 429 V20Error
+    """
+    _throttled.retry_after = None
+    try:
+        return client.request(endpoint)
+    except V20Error as e:
+        if e.code == 429:
+            e.retry_after = parse_retry_after(_throttled.retry_after)
+        raise
+
+
+class OandaClientPool:
+    """
+    Process-wide registry of oandapyV20 clients, one per (token, account, environment).
+
+    Each client keeps a pooled requests session with keep-alive connections, so orders
+    and reads reuse an open TCP/TLS connection instead of paying a handshake per call.
+    Sessions idle for longer than `max_idle` seconds are recycled before use, since the
+    broker will have dropped their connections by then.
+    """
+
+    def __init__(self, pool_size: int = 10, max_idle: float = 120.0, timeout: float = 10.0, retries: int = 0):
+        self.pool_size = pool_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str, str], Tuple[oandapyV20.API, float]] = {}
+        self.created = 0
+        self.recycled = 0
+
+    def _build(self, api_token: str, environment: str) -> oandapyV20.API:
+        if environment not in TRADING_ENVIRONMENTS:
+            # Any other environment name (e.g. "paper") is served from OANDA_API_URL, such as
+            # the local v20-compatible paper broker.
+            url = os.getenv("OANDA_API_URL")
+            if not url:
+                raise ValueError(f"Unknown OANDA environment {environment} and no OANDA_API_URL set")
+            TRADING_ENVIRONMENTS[environment] = {"api": url, "stream": os.getenv("OANDA_STREAM_URL", url)}
+        client = oandapyV20.API(
+            access_token=api_token,
+            environment=environment,
+            headers={"Connection": "keep-alive"},
+            request_params={"timeout": self.timeout}
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=self.retries)
+        client.client.mount("https://", adapter)
+        client.client.mount("http://", adapter)
+        client.client.hooks["response"].append(_remember_retry_after)
+        self.created += 1
+        return client
+
+    def get(self, account_id: str, api_token: str, environment: str = "practice") -> oandapyV20.API:
+        """
+        Return the shared client for an account
+        :param account_id: The OANDA account id
+        :param api_token: The API token used for the account
+        :param environment: "practice", "live", or a custom name served from OANDA_API_URL
+        :return: An oandapyV20.API with a pooled session
+        """
+        key = (api_token, account_id, environment)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and now - entry[1] > self.max_idle:
+                entry[0].client.close()
+                entry = None
+                self.recycled += 1
+            client = entry[0] if entry is not None else self._build(api_token, environment)
+            self._clients[key] = (client, now)
+            return client
+
+    def health_check(self) -> Dict[str, Any]:
+        """
+        Ping every pooled account with a lightweight AccountSummary request
+        :return: Status and latency per account
+        """
+        with self._lock:
+            clients = list(self._clients.items())
+        results = {}
+        for (_, account_id, environment), (client, _) in clients:
+            started = time.perf_counter()
+            try:
+                client.request(AccountSummary(accountID=account_id))
+                results[f"{environment}:{account_id}"] = {
+                    "healthy": True,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+                }
+            except Exception as e:
+                results[f"{environment}:{account_id}"] = {"healthy": False, "error": str(e)}
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "pool_size": self.pool_size,
+                "created": self.created,
+                "recycled": self.recycled
+            }
+
+    def close(self):
+        with self._lock:
+            for client, _ in self._clients.values():
+                client.client.close()
+            self._clients.clear()
+
+
+oanda_client_pool = OandaClientPool(
+    pool_size=int(os.getenv("OANDA_POOL_SIZE", "10")),
+    max_idle=float(os.getenv("OANDA_KEEPALIVE", "120")),
+    timeout=float(os.getenv("OANDA_TIMEOUT", "10"))
+)
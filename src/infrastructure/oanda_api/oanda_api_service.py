@@ -1,24 +1,49 @@
 import oandapyV20
 import os
+from src.infrastructure.oanda_api.client_pool import oanda_client_pool, request
+from src.infrastructure.rate_limiter import DEADLINES, ORDER, READ, AccountScheduler, scheduler_for
+from src.infrastructure.single_flight import SingleFlight
 from oandapyV20.endpoints.accounts import AccountDetails, AccountList
 from oandapyV20.endpoints.orders import OrderCreate
 from oandapyV20.endpoints.positions import OpenPositions
 from oandapyV20.endpoints.pricing import PricingStream 
 from typing import Dict, Any, List
 
+
+# Identical reads in flight at the same time (positions or account details per account)
+# share one request.
+reads = SingleFlight("oanda_reads")
+
+
 class OandaApiService:
     def __init__(self):
         self.api_token = os.getenv("OANDA_API_TOKEN", "8199890480410b1b7f60b3f4961ffabd-87fbedbd3788b503a7a3e933c1aa790f")
         self.account_id = os.getenv("OANDA_ACCOUNT_ID", "101-004-31438010-001")
-        self.client = oandapyV20.API(access_token=self.api_token)
+        self.environment = os.getenv("OANDA_ENVIRONMENT", "practice")
+
+    @property
+    def client(self) -> oandapyV20.API:
+        # Shared keep-alive client from the process-wide pool.
+        return oanda_client_pool.get(self.account_id, self.api_token, self.environment)
 
-    def place_trade(self, symbol: str, units: float, take_profit: float = None, stop_loss: float = None) -> Dict[str, Any]:
+    @property
+    def scheduler(self) -> AccountScheduler:
+        return scheduler_for("oanda", self.account_id)
+
+    def _request(self, endpoint, priority: int = READ):
+        # Rate limited per account; a 429 is retried after the broker's Retry-After, which
+        # `request` attaches to the V20Error.
+        return self.scheduler.call(request, self.client, endpoint, priority=priority, timeout=DEADLINES[priority])
+
+    def place_trade(self, symbol: str, units: float, take_profit: float = None, stop_loss: float = None,
+                    client_id: str = None) -> Dict[str, Any]:
         """
         Place a trade order
         :param symbol: The trading symbol (e.g., "EUR_USD")
         :param units: Positive for buy, negative for sell
         :param take_profit: Optional take profit price
         :param stop_loss: Optional stop loss price
+        :param client_id: Optional client order id, to find the order again if the response is lost
         :return: Order response
         """
         order_data = {
@@ -35,9 +60,13 @@ class OandaApiService:
             order_data["order"]["takeProfitOnFill"] = {"price": str(take_profit)}
         if stop_loss:
             order_data["order"]["stopLossOnFill"] = {"price": str(stop_loss)}
+        if client_id:
+            order_data["order"]["clientExtensions"] = {"id": client_id}
 
         order_create = OrderCreate(self.account_id, data=order_data)
-        response = self.client.request(order_create)
+        response = self._request(order_create, ORDER)
+        reads.forget(("positions", self.account_id))
+        reads.forget(("account", self.account_id))
         return response
 
     def get_active_positions(self) -> List[Dict[str, Any]]:
@@ -45,9 +74,10 @@ class OandaApiService:
         Get all open positions for the account
         :return: List of open positions
         """
-        open_positions = OpenPositions(self.account_id)
-        response = self.client.request(open_positions)
-        return response.get("positions", [])
+        def fetch():
+            return self._request(OpenPositions(self.account_id)).get("positions", [])
+
+        return reads.do(("positions", self.account_id), fetch)
 
     def monitor_market(self, symbols: List[str]):
         """
@@ -73,15 +103,11 @@ class OandaApiService:
         Get account details
         :return: Account details
         """
-        request = AccountDetails(accountID=self.account_id)
-        response = self.client.request(request)
-        return response
+        return reads.do(("account", self.account_id), lambda: self._request(AccountDetails(accountID=self.account_id)))
 
     def list_accounts(self) -> List[Dict[str, Any]]:
         """
         List all accounts associated with the API token
         :return: List of accounts
         """
-        request = AccountList()
-        response = self.client.request(request)
-        return response.get("accounts", [])
\ No newline at end of file
+        return reads.do(("accounts", self.api_token), lambda: self._request(AccountList()).get("accounts", []))
\ No newline at end of file
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from src.infrastructure.oanda_api.async_oanda_api_service import AsyncOandaApiService
+
+
+POLICIES = ("drop_oldest", "drop_newest", "conflate")
+
+
+def parse_tick(price: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten an OANDA PRICE message to instrument, time, bid and ask
+    """
+    return {
+        "instrument": price["instrument"],
+        "time": price["time"],
+        "bid": float(price["bids"][0]["price"]),
+        "ask": float(price["asks"][0]["price"])
+    }
+
+
+class Subscription:
+    """
+    One consumer's view of the hub. Iterate it with `async for` to receive ticks.
+
+    When the consumer falls behind, `drop_oldest` discards the oldest queued tick,
+    `drop_newest` discards the incoming one, and `conflate` keeps only the latest tick
+    per instrument so a slow reader always sees current prices.
+    """
+
+    def __init__(self, hub: "PriceHub", instruments: FrozenSet[str], maxsize: int, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.hub = hub
+        self.instruments = instruments
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def publish(self, tick: Dict[str, Any]):
+        if self.policy == "conflate":
+            if tick["instrument"] in self._latest:
+                self.dropped += 1
+            self._latest[tick["instrument"]] = tick
+            self._ready.set()
+            return
+        if self._queue.full():
+            self.dropped += 1
+            if self.policy == "drop_newest":
+                return
+            self._queue.get_nowait()
+        self._queue.put_nowait(tick)
+
+    async def get(self) -> Dict[str, Any]:
+        if self.policy == "conflate":
+            while not self._latest:
+                self._ready.clear()
+                await self._ready.wait()
+            instrument = next(iter(self._latest))
+            return self._latest.pop(instrument)
+        return await self._queue.get()
+
+    async def drain(self) -> List[Dict[str, Any]]:
+        """
+        Wait for at least one tick, then return everything pending at once
+        """
+        if self.policy == "conflate":
+            while not self._latest:
+                self._ready.clear()
+                await self._ready.wait()
+            ticks = list(self._latest.values())
+            self._latest.clear()
+            return ticks
+        ticks = [await self._queue.get()]
+        while not self._queue.empty():
+            ticks.append(self._queue.get_nowait())
+        return ticks
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        if self.closed:
+            raise StopAsyncIteration
+        return await self.get()
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            await self.hub.unsubscribe(self)
+
+
+class _Upstream:
+    def __init__(self, instruments: FrozenSet[str]):
+        self.instruments = instruments
+        self.subscribers: Set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.last_message = 0.0
+
+
+class PriceHub:
+    """
+    Shares one upstream OANDA pricing stream per instrument set between any number of
+    in-process subscribers (graph nodes, SSE clients, strategies).
+
+    The upstream is opened on the first subscription and closed when the last subscriber
+    leaves. A stream that goes quiet for longer than `heartbeat_timeout` (OANDA sends a
+    heartbeat every 5 seconds) is treated as dead and reconnected with exponential backoff.
+    Listeners registered with `add_listener` see every tick of every stream, synchronously,
+    and are meant for cheap in-memory consumers. Overlapping instrument sets each have their
+    own upstream, so a listener is only called for a tick newer than the last one it was
+    given for that instrument; the copies arriving on the other streams are skipped.
+    """
+
+    def __init__(self, service_factory: Callable[[], AsyncOandaApiService] = AsyncOandaApiService,
+                 heartbeat_timeout: float = 15.0, max_backoff: float = 30.0):
+        self.service_factory = service_factory
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_backoff = max_backoff
+        self._service: Optional[AsyncOandaApiService] = None
+        self._upstreams: Dict[FrozenSet[str], _Upstream] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # Time of the last tick handed to listeners, per instrument.
+        self._dispatched: Dict[str, str] = {}
+        self.ticks = 0
+        self.duplicates = 0
+        self.reconnects = 0
+
+    @property
+    def service(self) -> AsyncOandaApiService:
+        if self._service is None:
+            self._service = self.service_factory()
+        return self._service
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        self._listeners.append(listener)
+
+    def subscribe(self, instruments: Iterable[str], maxsize: int = 100, policy: str = "drop_oldest") -> Subscription:
+        """
+        Subscribe to live ticks
+        :param instruments: Instruments to receive (e.g., ["EUR_USD", "GBP_USD"])
+        :param maxsize: Queue size before the slow consumer policy applies
+        :param policy: "drop_oldest", "drop_newest" or "conflate"
+        :return: A Subscription to iterate over
+        """
+        key = frozenset(instruments)
+        if not key:
+            raise ValueError("At least one instrument is required")
+        subscription = Subscription(self, key, maxsize, policy)
+        upstream = self._upstreams.get(key)
+        if upstream is None:
+            upstream = self._upstreams[key] = _Upstream(key)
+        upstream.subscribers.add(subscription)
+        if upstream.task is None or upstream.task.done():
+            upstream.task = asyncio.get_running_loop().create_task(self._run(upstream))
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        upstream = self._upstreams.get(subscription.instruments)
+        if upstream is None:
+            return
+        upstream.subscribers.discard(subscription)
+        if not upstream.subscribers:
+            del self._upstreams[subscription.instruments]
+            if upstream.task:
+                upstream.task.cancel()
+                try:
+                    await upstream.task
+                except asyncio.CancelledError:
+                    pass
+
+    def _publish(self, upstream: _Upstream, tick: Dict[str, Any]):
+        self.ticks += 1
+        for subscription in upstream.subscribers:
+            subscription.publish(tick)
+        # OANDA times share one fixed-width RFC 3339 format, so they compare as strings.
+        last = self._dispatched.get(tick["instrument"])
+        if last is not None and tick["time"] <= last:
+            self.duplicates += 1
+            return
+        self._dispatched[tick["instrument"]] = tick["time"]
+        for listener in self._listeners:
+            try:
+                listener(tick)
+            except Exception as e:
+                logging.error(f"Price listener failed: {str(e)}")
+
+    async def _consume(self, upstream: _Upstream):
+        async for message in self.service.stream_pricing(sorted(upstream.instruments)):
+            upstream.connected = True
+            upstream.last_message = time.monotonic()
+            if message.get("type") == "PRICE":
+                self._publish(upstream, parse_tick(message))
+
+    async def _run(self, upstream: _Upstream):
+        backoff = 1.0
+        while upstream.subscribers:
+            upstream.last_message = time.monotonic()
+            consumer = asyncio.create_task(self._consume(upstream))
+            try:
+                # Watchdog: the stream itself never times out, heartbeats tell us it is alive.
+                while not consumer.done():
+                    await asyncio.wait({consumer}, timeout=self.heartbeat_timeout)
+                    if not consumer.done() and time.monotonic() - upstream.last_message > self.heartbeat_timeout:
+                        logging.error(f"No heartbeat for {self.heartbeat_timeout}s on {sorted(upstream.instruments)}, reconnecting")
+                        consumer.cancel()
+                        await asyncio.wait({consumer})
+                if not consumer.cancelled() and consumer.exception():
+                    logging.error(f"Pricing stream for {sorted(upstream.instruments)} failed: {str(consumer.exception())}")
+                elif upstream.connected:
+                    # Data flowed before the stream dropped; retry quickly.
+                    backoff = 1.0
+            finally:
+                upstream.connected = False
+                if not consumer.done():
+                    consumer.cancel()
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def close(self):
+        for upstream in list(self._upstreams.values()):
+            for subscription in list(upstream.subscribers):
+                await subscription.close()
+        if self._service is not None:
+            await self._service.aclose()
+            self._service = None
+
+    def stats(self) -> Dict[str, Any]:
+        subscribers = [s for upstream in self._upstreams.values() for s in upstream.subscribers]
+        return {
+            "upstreams": len(self._upstreams),
+            "connected": sum(1 for upstream in self._upstreams.values() if upstream.connected),
+            "subscribers": len(subscribers),
+            "ticks": self.ticks,
+            "duplicates": self.duplicates,
+            "dropped": sum(s.dropped for s in subscribers),
+            "reconnects": self.reconnects
+        }
+
+
+price_hub = PriceHub(
+    heartbeat_timeout=float(os.getenv("PRICE_STREAM_HEARTBEAT_TIMEOUT", "15")),
+    max_backoff=float(os.getenv("PRICE_STREAM_MAX_BACKOFF", "30"))
+)
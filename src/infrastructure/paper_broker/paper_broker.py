@@ -0,0 +1,543 @@
+import heapq
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.domain.entities.trade import Trade
+from src.domain.interfaces.trading_service import TradingService
+from src.infrastructure.oanda_api.price_hub import price_hub
+
+
+class PaperBrokerError(Exception):
+    """
+    Order rejected or unknown specifier. `status_code` mirrors what OANDA would answer.
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def rfc3339_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f000Z")
+
+
+@dataclass(slots=True)
+class PaperTrade:
+    id: str
+    instrument: str
+    units: float
+    price: float
+    open_time: str
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    client_extensions: Optional[Dict[str, str]] = None
+    realized_pl: float = 0.0
+    open: bool = True
+
+    def to_v20(self) -> Dict[str, Any]:
+        trade = {
+            "id": self.id,
+            "instrument": self.instrument,
+            "price": str(self.price),
+            "openTime": self.open_time,
+            "state": "OPEN" if self.open else "CLOSED",
+            "currentUnits": str(self.units),
+            "realizedPL": str(round(self.realized_pl, 5))
+        }
+        if self.stop_loss is not None:
+            trade["stopLossOrder"] = {"price": str(self.stop_loss)}
+        if self.take_profit is not None:
+            trade["takeProfitOrder"] = {"price": str(self.take_profit)}
+        if self.client_extensions:
+            trade["clientExtensions"] = self.client_extensions
+        return trade
+
+
+@dataclass(slots=True)
+class PaperOrder:
+    id: str
+    instrument: str
+    units: float
+    price: float
+    create_time: str
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    client_extensions: Optional[Dict[str, str]] = None
+    state: str = "PENDING"
+
+    def to_v20(self) -> Dict[str, Any]:
+        order = {
+            "id": self.id,
+            "type": "LIMIT",
+            "instrument": self.instrument,
+            "units": str(self.units),
+            "price": str(self.price),
+            "timeInForce": "GTC",
+            "createTime": self.create_time,
+            "state": self.state
+        }
+        if self.stop_loss is not None:
+            order["stopLossOnFill"] = {"price": str(self.stop_loss)}
+        if self.take_profit is not None:
+            order["takeProfitOnFill"] = {"price": str(self.take_profit)}
+        if self.client_extensions:
+            order["clientExtensions"] = self.client_extensions
+        return order
+
+
+@dataclass
+class OrderBook:
+    """
+    Resting orders and exit triggers for one instrument.
+
+    Every side is a heap keyed so the order that triggers first is on top, so a price
+    update only looks at orders that actually cross. Cancelled or already-closed entries
+    are skipped lazily when they reach the top.
+    """
+    bid: float = 0.0
+    ask: float = 0.0
+    time: str = ""
+    version: int = 0
+    # Limit buys fill when ask <= price (highest price first), limit sells when bid >= price.
+    buy_limits: List[Tuple[float, int, PaperOrder]] = field(default_factory=list)
+    sell_limits: List[Tuple[float, int, PaperOrder]] = field(default_factory=list)
+    # Long exits trigger on the bid, short exits on the ask.
+    long_stops: List[Tuple[float, int, PaperTrade]] = field(default_factory=list)
+    long_targets: List[Tuple[float, int, PaperTrade]] = field(default_factory=list)
+    short_stops: List[Tuple[float, int, PaperTrade]] = field(default_factory=list)
+    short_targets: List[Tuple[float, int, PaperTrade]] = field(default_factory=list)
+    # Open trades oldest first, for FIFO netting. Netting keeps them all on one side, so
+    # the position is fully described by its net units and cost (sum of units * price).
+    trades: Deque[PaperTrade] = field(default_factory=deque)
+    units: float = 0.0
+    cost: float = 0.0
+
+    def unrealized_pl(self) -> float:
+        return self.units * (self.bid if self.units > 0 else self.ask) - self.cost
+
+
+class PaperBroker(TradingService):
+    """
+    In-process paper-trading broker.
+
+    Supports market and limit orders, stop-loss and take-profit on fill or on an open
+    trade, FIFO position netting (an order against an open position reduces its oldest
+    trades first, as on a v20 account) and account balance, margin and equity. Responses
+    use the OANDA v20 JSON shapes, so the REST surface in `v20_app` can hand them out
+    as-is and OANDA clients can point at it unchanged.
+
+    Market orders fill at the current quote, so set prices with `set_price` (or
+    `follow_price_hub`) before trading an instrument. All state sits behind one lock;
+    every operation is a few dict and heap updates, which keeps it well above tens of
+    thousands of orders per second in-process.
+    """
+
+    def __init__(self, account_id: str = "101-000-0000000-001", balance: float = 100_000.0,
+                 margin_rate: float = 0.02, currency: str = "USD"):
+        self.account_id = account_id
+        self.currency = currency
+        self.margin_rate = margin_rate
+        self.balance = balance
+        self.realized_pl = 0.0
+        self._books: Dict[str, OrderBook] = {}
+        self._orders: Dict[str, PaperOrder] = {}
+        self._trades: Dict[str, PaperTrade] = {}
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+        self.last_transaction_id = "0"
+        self.orders_filled = 0
+        self.orders_rejected = 0
+
+    def _next_id(self) -> str:
+        self.last_transaction_id = str(next(self._ids))
+        return self.last_transaction_id
+
+    def _book(self, instrument: str) -> OrderBook:
+        book = self._books.get(instrument)
+        if book is None:
+            book = self._books[instrument] = OrderBook()
+        return book
+
+    # Prices
+
+    def set_price(self, instrument: str, bid: float, ask: float, time: Optional[str] = None):
+        """
+        Update the quote and run whatever limit orders, stops and targets it crosses
+        """
+        with self._lock:
+            book = self._book(instrument)
+            book.bid, book.ask, book.time = bid, ask, time or rfc3339_now()
+            book.version += 1
+            self._match(book)
+
+    def on_tick(self, tick: Dict[str, Any]):
+        self.set_price(tick["instrument"], tick["bid"], tick["ask"], tick["time"])
+
+    def follow_price_hub(self):
+        """
+        Track live prices for every instrument the price hub streams
+        """
+        price_hub.add_listener(self.on_tick)
+
+    def _match(self, book: OrderBook):
+        while book.buy_limits and -book.buy_limits[0][0] >= book.ask:
+            _, _, order = heapq.heappop(book.buy_limits)
+            if order.state == "PENDING":
+                self._fill_limit(order, book)
+        while book.sell_limits and book.sell_limits[0][0] <= book.bid:
+            _, _, order = heapq.heappop(book.sell_limits)
+            if order.state == "PENDING":
+                self._fill_limit(order, book)
+        self._trigger(book, book.long_stops, lambda price: -price >= book.bid, "STOP_LOSS_ORDER", "stop_loss")
+        self._trigger(book, book.long_targets, lambda price: price <= book.bid, "TAKE_PROFIT_ORDER", "take_profit")
+        self._trigger(book, book.short_stops, lambda price: price <= book.ask, "STOP_LOSS_ORDER", "stop_loss")
+        self._trigger(book, book.short_targets, lambda price: -price >= book.ask, "TAKE_PROFIT_ORDER", "take_profit")
+
+    def _trigger(self, book: OrderBook, heap, crossed, reason: str, attribute: str):
+        while heap and crossed(heap[0][0]):
+            key, _, trade = heapq.heappop(heap)
+            # Skip entries left behind by a closed trade or a modified stop/target.
+            if trade.open and getattr(trade, attribute) == abs(key):
+                self._close_trade(trade, abs(trade.units), book, reason)
+
+    def _fill_limit(self, order: PaperOrder, book: OrderBook) -> Dict[str, Any]:
+        order.state = "FILLED"
+        self._orders.pop(order.id, None)
+        # A price that gapped through the limit fills at the better market price.
+        price = min(order.price, book.ask) if order.units > 0 else max(order.price, book.bid)
+        return self._fill(order.instrument, order.units, price, book, order.id, "LIMIT_ORDER",
+                          order.stop_loss, order.take_profit, order.client_extensions)
+
+    # Fills and netting
+
+    def _arm(self, trade: PaperTrade, book: OrderBook):
+        sequence = next(self._sequence)
+        if trade.units > 0:
+            if trade.stop_loss is not None:
+                heapq.heappush(book.long_stops, (-trade.stop_loss, sequence, trade))
+            if trade.take_profit is not None:
+                heapq.heappush(book.long_targets, (trade.take_profit, sequence, trade))
+        else:
+            if trade.stop_loss is not None:
+                heapq.heappush(book.short_stops, (trade.stop_loss, sequence, trade))
+            if trade.take_profit is not None:
+                heapq.heappush(book.short_targets, (-trade.take_profit, sequence, trade))
+
+    def _fill(self, instrument: str, units: float, price: float, book: OrderBook, order_id: str, reason: str,
+              stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+              client_extensions: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        fill = {
+            "id": self._next_id(),
+            "type": "ORDER_FILL",
+            "orderID": order_id,
+            "instrument": instrument,
+            "units": str(units),
+            "price": str(price),
+            "reason": reason,
+            "time": book.time
+        }
+        remaining = units
+        closed, pl = [], 0.0
+        # Reduce opposite trades oldest first.
+        while remaining and book.trades and (book.trades[0].units > 0) != (remaining > 0):
+            trade = book.trades[0]
+            reduce = min(abs(remaining), abs(trade.units))
+            trade_pl = self._reduce(trade, reduce, price, book)
+            pl += trade_pl
+            entry = {"tradeID": trade.id, "units": str(reduce if remaining > 0 else -reduce),
+                     "realizedPL": str(round(trade_pl, 5))}
+            if trade.open:
+                fill["tradeReduced"] = entry
+            else:
+                closed.append(entry)
+            remaining += -reduce if remaining > 0 else reduce
+        if closed:
+            fill["tradesClosed"] = closed
+        if remaining:
+            trade = PaperTrade(fill["id"], instrument, remaining, price, book.time, stop_loss, take_profit, client_extensions)
+            self._trades[trade.id] = trade
+            book.trades.append(trade)
+            book.units += remaining
+            book.cost += remaining * price
+            self._arm(trade, book)
+            fill["tradeOpened"] = {"tradeID": trade.id, "units": str(remaining)}
+        fill["pl"] = str(round(pl, 5))
+        fill["accountBalance"] = str(round(self.balance, 5))
+        self.orders_filled += 1
+        return fill
+
+    def _reduce(self, trade: PaperTrade, units: float, price: float, book: OrderBook) -> float:
+        direction = 1 if trade.units > 0 else -1
+        pl = direction * units * (price - trade.price)
+        trade.units -= direction * units
+        trade.realized_pl += pl
+        book.units -= direction * units
+        book.cost -= direction * units * trade.price
+        self.balance += pl
+        self.realized_pl += pl
+        if trade.units == 0:
+            trade.open = False
+            del self._trades[trade.id]
+            book.trades.remove(trade)
+            if not book.trades:
+                book.units = book.cost = 0.0
+        return pl
+
+    def _close_trade(self, trade: PaperTrade, units: float, book: OrderBook, reason: str) -> Dict[str, Any]:
+        direction = 1 if trade.units > 0 else -1
+        price = book.bid if direction > 0 else book.ask
+        pl = self._reduce(trade, units, price, book)
+        self.orders_filled += 1
+        entry = {"tradeID": trade.id, "units": str(-direction * units), "realizedPL": str(round(pl, 5))}
+        fill = {
+            "id": self._next_id(),
+            "type": "ORDER_FILL",
+            "instrument": trade.instrument,
+            "units": str(-direction * units),
+            "price": str(price),
+            "reason": reason,
+            "time": book.time,
+            "pl": str(round(pl, 5)),
+            "accountBalance": str(round(self.balance, 5))
+        }
+        if trade.open:
+            fill["tradeReduced"] = entry
+        else:
+            fill["tradesClosed"] = [entry]
+        return fill
+
+    # Orders
+
+    def _reject(self, reason: str, status_code: int = 400):
+        self.orders_rejected += 1
+        raise PaperBrokerError(reason, status_code)
+
+    def _margin_used(self) -> float:
+        return sum(abs(book.units) * (book.bid + book.ask) / 2 for book in self._books.values()) * self.margin_rate
+
+    def submit_order(self, instrument: str, units: float, price: Optional[float] = None,
+                     take_profit: Optional[float] = None, stop_loss: Optional[float] = None,
+                     client_extensions: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Place a market order, or a GTC limit order when `price` is given
+        :param units: Positive for buy, negative for sell
+        :return: v20 order response (orderCreateTransaction plus orderFillTransaction when filled)
+        """
+        with self._lock:
+            if not units:
+                self._reject("Order units must be non-zero")
+            book = self._books.get(instrument)
+            if book is None or not book.ask:
+                self._reject(f"No price for {instrument}")
+            order_id = self._next_id()
+            create = {
+                "id": order_id,
+                "type": "LIMIT_ORDER" if price else "MARKET_ORDER",
+                "instrument": instrument,
+                "units": str(units),
+                "time": book.time
+            }
+            marketable = price and (units > 0 and book.ask <= price or units < 0 and book.bid >= price)
+            if price and not marketable:
+                order = PaperOrder(order_id, instrument, units, price, book.time, stop_loss, take_profit, client_extensions)
+                self._orders[order_id] = order
+                heapq.heappush(book.buy_limits if units > 0 else book.sell_limits,
+                               (-price if units > 0 else price, next(self._sequence), order))
+                return {"orderCreateTransaction": create, "lastTransactionID": self.last_transaction_id}
+
+            if abs(book.units + units) > abs(book.units):
+                required = abs(units) * (book.bid + book.ask) / 2 * self.margin_rate
+                if self.balance + self.unrealized_pl() - self._margin_used() < required:
+                    self._reject("INSUFFICIENT_MARGIN")
+            fill = self._fill(instrument, units, book.ask if units > 0 else book.bid, book, order_id,
+                              "LIMIT_ORDER" if price else "MARKET_ORDER", stop_loss, take_profit, client_extensions)
+            return {"orderCreateTransaction": create, "orderFillTransaction": fill,
+                    "lastTransactionID": self.last_transaction_id}
+
+    def submit_v20_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handle the `order` body of a v20 POST /orders request
+        """
+        kind = order.get("type", "MARKET")
+        if kind in ("STOP_LOSS", "TAKE_PROFIT"):
+            return self.set_trade_orders(
+                order["tradeID"], **{"stop_loss" if kind == "STOP_LOSS" else "take_profit": float(order["price"])}
+            )
+        if kind not in ("MARKET", "LIMIT"):
+            self._reject(f"Unsupported order type {kind}")
+        return self.submit_order(
+            order["instrument"], float(order["units"]),
+            price=float(order["price"]) if kind == "LIMIT" else None,
+            take_profit=float(order["takeProfitOnFill"]["price"]) if order.get("takeProfitOnFill") else None,
+            stop_loss=float(order["stopLossOnFill"]["price"]) if order.get("stopLossOnFill") else None,
+            client_extensions=order.get("clientExtensions")
+        )
+
+    def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        with self._lock:
+            order = self._orders.pop(order_id, None)
+            if order is None:
+                self._reject(f"Order {order_id} not found", 404)
+            # The heap entry stays behind and is skipped when it reaches the top.
+            order.state = "CANCELLED"
+            return {
+                "orderCancelTransaction": {"id": self._next_id(), "type": "ORDER_CANCEL", "orderID": order_id},
+                "lastTransactionID": self.last_transaction_id
+            }
+
+    def set_trade_orders(self, trade_id: str, stop_loss: Optional[float] = None,
+                         take_profit: Optional[float] = None) -> Dict[str, Any]:
+        with self._lock:
+            trade = self._trades.get(trade_id)
+            if trade is None:
+                self._reject(f"Trade {trade_id} not found", 404)
+            if stop_loss is not None:
+                trade.stop_loss = stop_loss
+            if take_profit is not None:
+                trade.take_profit = take_profit
+            book = self._book(trade.instrument)
+            self._arm(trade, book)
+            self._match(book)
+            return {"trade": trade.to_v20(), "lastTransactionID": self.last_transaction_id}
+
+    def close_trade(self, trade_id: str, units: Optional[float] = None) -> Dict[str, Any]:
+        with self._lock:
+            trade = self._trades.get(trade_id)
+            if trade is None:
+                self._reject(f"Trade {trade_id} not found", 404)
+            close_units = abs(units or trade.units)
+            # OANDA refuses a partial close larger than the trade instead of reversing it.
+            if close_units > abs(trade.units):
+                self._reject("CLOSE_TRADE_UNITS_EXCEED_TRADE_SIZE")
+            book = self._book(trade.instrument)
+            fill = self._close_trade(trade, close_units, book, "TRADE_CLOSE")
+            return {"orderFillTransaction": fill, "lastTransactionID": self.last_transaction_id}
+
+    def close_position(self, instrument: str) -> Dict[str, Any]:
+        with self._lock:
+            book = self._books.get(instrument)
+            units = book.units if book else 0
+            if not units:
+                self._reject(f"No open position for {instrument}", 404)
+            fill = self._fill(instrument, -units, book.bid if units > 0 else book.ask, book, self._next_id(),
+                              "MARKET_ORDER_POSITION_CLOSEOUT")
+            return {"orderFillTransaction": fill, "lastTransactionID": self.last_transaction_id}
+
+    # Reads
+
+    def price(self, instrument: str) -> Optional[Dict[str, Any]]:
+        book = self._books.get(instrument)
+        if book is None or not book.ask:
+            return None
+        return {
+            "type": "PRICE",
+            "instrument": instrument,
+            "time": book.time,
+            "tradeable": True,
+            "bids": [{"price": str(book.bid), "liquidity": 10_000_000}],
+            "asks": [{"price": str(book.ask), "liquidity": 10_000_000}],
+            "closeoutBid": str(book.bid),
+            "closeoutAsk": str(book.ask)
+        }
+
+    def price_versions(self) -> Dict[str, int]:
+        return {instrument: book.version for instrument, book in self._books.items()}
+
+    def unrealized_pl(self) -> float:
+        return sum(book.unrealized_pl() for book in self._books.values())
+
+    def position(self, instrument: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            book = self._books.get(instrument)
+            if book is None or not book.trades:
+                return None
+            long = [trade for trade in book.trades if trade.units > 0]
+            short = [trade for trade in book.trades if trade.units < 0]
+
+            def side(trades: List[PaperTrade], exit_price: float) -> Dict[str, Any]:
+                units = sum(trade.units for trade in trades)
+                side = {
+                    "units": str(units),
+                    "tradeIDs": [trade.id for trade in trades],
+                    "unrealizedPL": str(round(sum(trade.units * (exit_price - trade.price) for trade in trades), 5))
+                }
+                if units:
+                    side["averagePrice"] = str(round(sum(trade.units * trade.price for trade in trades) / units, 6))
+                return side
+
+            return {"instrument": instrument, "long": side(long, book.bid), "short": side(short, book.ask)}
+
+    def positions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self.position(instrument) for instrument, book in self._books.items() if book.trades]
+
+    def open_trades(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [trade.to_v20() for trade in self._trades.values()]
+
+    def pending_orders(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [order.to_v20() for order in self._orders.values()]
+
+    def account(self) -> Dict[str, Any]:
+        with self._lock:
+            unrealized = self.unrealized_pl()
+            margin = self._margin_used()
+            return {
+                "id": self.account_id,
+                "currency": self.currency,
+                "balance": str(round(self.balance, 5)),
+                "pl": str(round(self.realized_pl, 5)),
+                "unrealizedPL": str(round(unrealized, 5)),
+                "NAV": str(round(self.balance + unrealized, 5)),
+                "marginRate": str(self.margin_rate),
+                "marginUsed": str(round(margin, 5)),
+                "marginAvailable": str(round(self.balance + unrealized - margin, 5)),
+                "openTradeCount": len(self._trades),
+                "openPositionCount": sum(1 for book in self._books.values() if book.trades),
+                "pendingOrderCount": len(self._orders),
+                "lastTransactionID": self.last_transaction_id
+            }
+
+    def equity(self) -> float:
+        with self._lock:
+            return self.balance + self.unrealized_pl()
+
+    # TradingService
+
+    async def execute_trade(self, trade: Trade):
+        """
+        Sell types go in as negative units; a trade with an open_price becomes a limit order
+        """
+        units = -abs(trade.volume) if "SELL" in trade.type.upper() else abs(trade.volume)
+        extensions = {key: value for key, value in (("id", trade.client_id), ("comment", trade.comment)) if value}
+        return self.submit_order(trade.symbol, units, trade.open_price or None, trade.take_profit,
+                                 trade.stop_loss, extensions or None)
+
+    async def get_market_data(self, symbol: str):
+        return self.price(symbol)
+
+    async def get_positions(self):
+        return self.positions()
+
+    async def monitor_position(self, position_id: str):
+        """
+        Positions are keyed by instrument, as on OANDA
+        """
+        return self.position(position_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "instruments": len(self._books),
+            "open_trades": len(self._trades),
+            "pending_orders": len(self._orders),
+            "orders_filled": self.orders_filled,
+            "orders_rejected": self.orders_rejected,
+            "last_transaction_id": self.last_transaction_id,
+            "equity": round(self.equity(), 2)
+        }
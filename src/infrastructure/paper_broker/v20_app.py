@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.infrastructure.paper_broker.paper_broker import PaperBroker, PaperBrokerError, rfc3339_now
+
+
+def create_app(broker: PaperBroker) -> FastAPI:
+    """
+    OANDA v20 REST surface over a PaperBroker.
+
+    Covers the endpoints this project calls: accounts, orders, trades, positions, pricing
+    and the pricing stream. Point OandaApiService (OANDA_ENVIRONMENT=paper plus
+    OANDA_API_URL) or AsyncOandaApiService (OANDA_API_URL) at it to trade against the
+    simulator. Prices come from PUT /paper/prices/{instrument}, `PaperBroker.follow_price_hub`
+    or the synthetic feed started by the CLI.
+    """
+    app = FastAPI(title="Paper broker", description="OANDA v20 compatible paper-trading broker")
+
+    @app.exception_handler(PaperBrokerError)
+    async def broker_error(request: Request, error: PaperBrokerError):
+        return JSONResponse({"errorMessage": str(error), "lastTransactionID": broker.last_transaction_id},
+                            status_code=error.status_code)
+
+    def account(account_id: str):
+        if account_id != broker.account_id:
+            raise PaperBrokerError("The Account specified does not exist", 404)
+
+    @app.get("/v3/accounts")
+    async def list_accounts():
+        return {"accounts": [{"id": broker.account_id, "tags": []}]}
+
+    @app.get("/v3/accounts/{account_id}")
+    async def account_details(account_id: str):
+        account(account_id)
+        details = broker.account()
+        details.update(trades=broker.open_trades(), positions=broker.positions(), orders=broker.pending_orders())
+        return {"account": details, "lastTransactionID": broker.last_transaction_id}
+
+    @app.get("/v3/accounts/{account_id}/summary")
+    async def account_summary(account_id: str):
+        account(account_id)
+        return {"account": broker.account(), "lastTransactionID": broker.last_transaction_id}
+
+    @app.post("/v3/accounts/{account_id}/orders", status_code=201)
+    async def create_order(account_id: str, body: Dict = Body(...)):
+        account(account_id)
+        return broker.submit_v20_order(body["order"])
+
+    @app.get("/v3/accounts/{account_id}/orders")
+    @app.get("/v3/accounts/{account_id}/pendingOrders")
+    async def pending_orders(account_id: str):
+        account(account_id)
+        return {"orders": broker.pending_orders(), "lastTransactionID": broker.last_transaction_id}
+
+    @app.put("/v3/accounts/{account_id}/orders/{order_id}/cancel")
+    async def cancel_order(account_id: str, order_id: str):
+        account(account_id)
+        return broker.cancel_order(order_id)
+
+    @app.get("/v3/accounts/{account_id}/trades")
+    @app.get("/v3/accounts/{account_id}/openTrades")
+    async def open_trades(account_id: str):
+        account(account_id)
+        return {"trades": broker.open_trades(), "lastTransactionID": broker.last_transaction_id}
+
+    @app.put("/v3/accounts/{account_id}/trades/{trade_id}/close")
+    async def close_trade(account_id: str, trade_id: str, body: Optional[Dict] = Body(None)):
+        account(account_id)
+        units = (body or {}).get("units", "ALL")
+        return broker.close_trade(trade_id, None if units == "ALL" else float(units))
+
+    @app.put("/v3/accounts/{account_id}/trades/{trade_id}/orders")
+    async def trade_orders(account_id: str, trade_id: str, body: Dict = Body(...)):
+        account(account_id)
+        return broker.set_trade_orders(
+            trade_id,
+            stop_loss=float(body["stopLoss"]["price"]) if body.get("stopLoss") else None,
+            take_profit=float(body["takeProfit"]["price"]) if body.get("takeProfit") else None
+        )
+
+    @app.get("/v3/accounts/{account_id}/positions")
+    @app.get("/v3/accounts/{account_id}/openPositions")
+    async def open_positions(account_id: str):
+        account(account_id)
+        return {"positions": broker.positions(), "lastTransactionID": broker.last_transaction_id}
+
+    @app.get("/v3/accounts/{account_id}/positions/{instrument}")
+    async def position(account_id: str, instrument: str):
+        account(account_id)
+        found = broker.position(instrument)
+        if found is None:
+            raise PaperBrokerError(f"No position for {instrument}", 404)
+        return {"position": found, "lastTransactionID": broker.last_transaction_id}
+
+    @app.put("/v3/accounts/{account_id}/positions/{instrument}/close")
+    async def close_position(account_id: str, instrument: str):
+        account(account_id)
+        return broker.close_position(instrument)
+
+    @app.get("/v3/accounts/{account_id}/pricing")
+    async def pricing(account_id: str, instruments: str):
+        account(account_id)
+        prices = [broker.price(instrument) for instrument in instruments.split(",")]
+        return {"prices": [price for price in prices if price]}
+
+    @app.get("/v3/accounts/{account_id}/pricing/stream")
+    async def pricing_stream(account_id: str, instruments: str, poll: float = 0.05):
+        account(account_id)
+        symbols = instruments.split(",")
+
+        async def lines():
+            seen: Dict[str, int] = {}
+            idle = 0.0
+            while True:
+                versions = broker.price_versions()
+                for symbol in symbols:
+                    if versions.get(symbol, 0) != seen.get(symbol, 0):
+                        seen[symbol] = versions[symbol]
+                        idle = 0.0
+                        yield json.dumps(broker.price(symbol)) + "\n"
+                if idle >= 5:
+                    idle = 0.0
+                    yield json.dumps({"type": "HEARTBEAT", "time": rfc3339_now()}) + "\n"
+                await asyncio.sleep(poll)
+                idle += poll
+
+        return StreamingResponse(lines(), media_type="application/octet-stream")
+
+    @app.put("/paper/prices/{instrument}")
+    async def set_price(instrument: str, body: Dict = Body(...)):
+        broker.set_price(instrument, float(body["bid"]), float(body["ask"]), body.get("time"))
+        return broker.price(instrument)
+
+    @app.get("/paper/stats")
+    async def stats():
+        return broker.stats()
+
+    return app
+
+
+async def synthetic_prices(broker: PaperBroker, instruments: List[str], ticks_per_second: float = 10.0,
+                           spread: float = 0.0001):
+    """
+    Random-walk quotes for load tests that should not depend on a live feed
+    """
+    mids = {instrument: 1.0 + random.random() for instrument in instruments}
+    while True:
+        for instrument in instruments:
+            mids[instrument] += random.uniform(-0.0005, 0.0005)
+            broker.set_price(instrument, mids[instrument] - spread / 2, mids[instrument] + spread / 2)
+        await asyncio.sleep(1 / ticks_per_second)
+
+
+paper_broker = PaperBroker(
+    account_id=os.getenv("PAPER_ACCOUNT_ID", "101-000-0000000-001"),
+    balance=float(os.getenv("PAPER_BALANCE", "100000")),
+    margin_rate=float(os.getenv("PAPER_MARGIN_RATE", "0.02"))
+)
+app = create_app(paper_broker)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the OANDA v20 compatible paper broker")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--synthetic", default="", help="Comma separated instruments to drive with a random walk")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        @app.on_event("startup")
+        async def start_feed():
+            asyncio.get_running_loop().create_task(synthetic_prices(paper_broker, args.synthetic.split(",")))
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
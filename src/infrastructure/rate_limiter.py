@@ -0,0 +1,292 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Lanes, lowest first: order placement and cancels pre-empt informational reads.
+ORDER = 0
+READ = 1
+LANES = {ORDER: "order", READ: "read"}
+
+
+class RateLimitTimeout(TimeoutError):
+    """
+    The request could not be sent before its deadline
+    """
+
+
+def throttle_delay(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Whether an exception is a rate-limit rejection, and how long the broker asked us to wait
+    :return: (throttled, retry_after seconds or None)
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        retry_after = getattr(error, "retry_after", None)
+        return True, float(retry_after) if retry_after is not None else None
+    # MetaApi raises TooManyRequestsException with the time it will accept requests again.
+    if type(error).__name__ == "TooManyRequestsException":
+        retry_time = (getattr(error, "metadata", None) or {}).get("recommendedRetryTime")
+        if retry_time:
+            when = datetime.fromisoformat(str(retry_time).replace("Z", "+00:00"))
+            return True, max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+        return True, None
+    return False, None
+
+
+class _Waiter:
+    def __init__(self, priority: int, deadline: Optional[float], loop: Optional[asyncio.AbstractEventLoop]):
+        self.priority = priority
+        self.deadline = deadline
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+
+    def _resolve(self):
+        if not self.future.done():
+            if self.error is not None:
+                self.future.set_exception(self.error)
+            else:
+                self.future.set_result(None)
+
+    def wake(self, error: Optional[BaseException] = None) -> bool:
+        """
+        Hand the waiter its token (or error). False if its event loop is gone.
+        """
+        self.error = error
+        if self.loop is None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+            return True
+        except RuntimeError:
+            # The loop closed while this waiter was queued; nobody is left to wake.
+            self.cancelled = True
+            return False
+
+
+class AccountScheduler:
+    """
+    Token bucket for one broker account, shared by every client that talks to it
+    (blocking oandapyV20 calls on the broker pool as well as asyncio clients).
+
+    Requests wait in priority lanes and are released at `rate` per second with bursts up
+    to `burst`; a queued order always goes before a queued read. Each request carries a
+    deadline and fails with RateLimitTimeout rather than waiting past it.
+
+    A 429 pauses the bucket for the broker's Retry-After (or one second) and halves the
+    sending rate, which then recovers gradually with successful calls. So a burst drains
+    at the limit instead of turning into a storm of rejected retries.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.rate = rate
+        self.current_rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self.granted = {lane: 0 for lane in LANES}
+        self.timeouts = 0
+        self.throttled = 0
+        self.retries = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.current_rate)
+        self._updated = now
+
+    def _enqueue(self, priority: int, timeout: Optional[float], loop: Optional[asyncio.AbstractEventLoop]) -> Optional[_Waiter]:
+        """
+        Take a token right away if nothing of equal or higher priority is waiting,
+        otherwise queue. Returns None when the token was granted immediately.
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._refill(now)
+            if now >= self._paused_until and self.tokens >= 1 and (not self._queue or self._queue[0][0] > priority):
+                self.tokens -= 1
+                self.granted[priority] += 1
+                return None
+            waiter = _Waiter(priority, now + timeout if timeout is not None else None, loop)
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch, name=f"rate-limiter-{self.name}", daemon=True)
+                self._dispatcher.start()
+            self._condition.notify()
+            return waiter
+
+    def _dispatch(self):
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                self._refill(now)
+                if now < self._paused_until:
+                    self._condition.wait(self._paused_until - now)
+                    continue
+                if self.tokens < 1:
+                    self._condition.wait((1 - self.tokens) / self.current_rate)
+                    continue
+                _, _, waiter = heapq.heappop(self._queue)
+                if waiter.cancelled or not waiter.wake():
+                    continue
+                self.tokens -= 1
+                self.granted[waiter.priority] += 1
+
+    def _expire(self, now: float):
+        expired = [entry for entry in self._queue if entry[2].deadline is not None and entry[2].deadline <= now]
+        if not expired:
+            return
+        self._queue = [entry for entry in self._queue if entry not in expired]
+        heapq.heapify(self._queue)
+        for _, _, waiter in expired:
+            self.timeouts += 1
+            waiter.wake(RateLimitTimeout(f"{self.name}: {LANES[waiter.priority]} request not sent before its deadline"))
+
+    def acquire(self, priority: int = READ, timeout: Optional[float] = None):
+        """
+        Block the calling thread until a token is granted
+        """
+        waiter = self._enqueue(priority, timeout, None)
+        if waiter is None:
+            return
+        # The dispatcher fails expired waiters; the extra second only guards against a lost wake-up.
+        if not waiter.event.wait(None if timeout is None else timeout + 1):
+            waiter.cancelled = True
+            raise RateLimitTimeout(f"{self.name}: {LANES[priority]} request not sent before its deadline")
+        if waiter.error is not None:
+            raise waiter.error
+
+    async def acquire_async(self, priority: int = READ, timeout: Optional[float] = None):
+        waiter = self._enqueue(priority, timeout, asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            waiter.cancelled = True
+            raise
+
+    def on_throttled(self, retry_after: Optional[float]):
+        with self._condition:
+            self.throttled += 1
+            self.current_rate = max(self.rate / 16, self.current_rate / 2)
+            self.tokens = 0
+            self._paused_until = max(self._paused_until, time.monotonic() + (retry_after if retry_after is not None else 1.0))
+            self._condition.notify()
+
+    def on_success(self):
+        if self.current_rate < self.rate:
+            with self._condition:
+                self.current_rate = min(self.rate, self.current_rate + self.rate / 20)
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+    def call(self, fn: Callable[..., Any], *args, priority: int = READ, timeout: Optional[float] = None,
+             retries: int = 3, **kwargs) -> Any:
+        """
+        Run a blocking broker call within the limit, retrying rate-limit rejections
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for attempt in range(retries + 1):
+            self.acquire(priority, self._remaining(deadline))
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                throttled, retry_after = throttle_delay(e)
+                if not throttled or attempt == retries:
+                    raise
+                self.on_throttled(retry_after)
+                self.retries += 1
+                logging.info(f"{self.name}: rate limited, retrying after {retry_after or 1.0}s")
+                continue
+            self.on_success()
+            return result
+
+    async def call_async(self, fn: Callable[..., Any], *args, priority: int = READ, timeout: Optional[float] = None,
+                         retries: int = 3, **kwargs) -> Any:
+        """
+        asyncio counterpart of `call` for coroutine functions
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for attempt in range(retries + 1):
+            await self.acquire_async(priority, self._remaining(deadline))
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                throttled, retry_after = throttle_delay(e)
+                if not throttled or attempt == retries:
+                    raise
+                self.on_throttled(retry_after)
+                self.retries += 1
+                logging.info(f"{self.name}: rate limited, retrying after {retry_after or 1.0}s")
+                continue
+            self.on_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            queued = {name: 0 for name in LANES.values()}
+            for priority, _, waiter in self._queue:
+                if not waiter.cancelled:
+                    queued[LANES[priority]] += 1
+            return {
+                "rate": self.rate,
+                "current_rate": round(self.current_rate, 2),
+                "tokens": round(self.tokens, 2),
+                "queued": queued,
+                "granted": {LANES[lane]: count for lane, count in self.granted.items()},
+                "timeouts": self.timeouts,
+                "throttled": self.throttled,
+                "retries": self.retries
+            }
+
+
+# Per-lane default deadlines in seconds.
+DEADLINES = {
+    ORDER: float(os.getenv("BROKER_ORDER_DEADLINE", "10")),
+    READ: float(os.getenv("BROKER_READ_DEADLINE", "5")),
+}
+
+_schedulers: Dict[str, AccountScheduler] = {}
+_lock = threading.Lock()
+
+
+def scheduler_for(broker: str, account: str) -> AccountScheduler:
+    """
+    The shared scheduler for a broker account. Limits come from
+    {BROKER}_RATE_LIMIT (requests per second) and {BROKER}_RATE_BURST.
+    """
+    key = f"{broker}:{account}"
+    with _lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            prefix = broker.upper()
+            rate = float(os.getenv(f"{prefix}_RATE_LIMIT", "100"))
+            scheduler = _schedulers[key] = AccountScheduler(
+                key, rate=rate, burst=float(os.getenv(f"{prefix}_RATE_BURST", str(rate)))
+            )
+        return scheduler
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {key: scheduler.stats() for key, scheduler in _schedulers.items()}
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+# Reuse a finished read for this many seconds (0 disables); applies to every group by default.
+DEFAULT_TTL = float(os.getenv("BROKER_READ_TTL", "0"))
+
+_groups: List["_Group"] = []
+
+
+class _Group:
+    def __init__(self, name: str, ttl: Optional[float]):
+        self.name = name
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        # In-flight calls by key: _Call for SingleFlight, asyncio.Task for AsyncSingleFlight.
+        self._calls: Dict[Hashable, Any] = {}
+        self.requests = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.ttl_hits = 0
+        _groups.append(self)
+
+    def _cached(self, key: Hashable) -> Tuple[bool, Any]:
+        if self.ttl > 0:
+            entry = self._results.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.ttl_hits += 1
+                return True, entry[1]
+        return False, None
+
+    def _remember(self, key: Hashable, result: Any):
+        if self.ttl > 0:
+            self._results[key] = (time.monotonic(), result)
+
+    def forget(self, key: Optional[Hashable] = None):
+        """
+        Drop cached results, e.g. after an order changes the positions they describe. A call
+        still in flight is detached too: it may have read the state from before the change,
+        so later callers start a fresh one instead of joining it.
+        """
+        if key is None:
+            self._results.clear()
+            self._calls.clear()
+        else:
+            self._results.pop(key, None)
+            self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self.coalesced + self.ttl_hits
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "ttl_hits": self.ttl_hits,
+            "saved_calls": saved,
+            "coalescing_ratio": round(self.requests / self.upstream_calls, 2) if self.upstream_calls else None,
+            "ttl": self.ttl
+        }
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(_Group):
+    """
+    Collapses identical concurrent blocking reads (e.g. from the broker thread pool) into
+    one upstream call. The first caller for a key runs it; callers arriving while it is in
+    flight wait and receive the same result or exception. With a `ttl`, a finished result
+    is also handed out for that many seconds.
+
+    Results are shared, not copied, so callers must not mutate them.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        super().__init__(name, ttl)
+        self._lock = threading.Lock()
+
+    def forget(self, key: Optional[Hashable] = None):
+        with self._lock:
+            super().forget(key)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            self.requests += 1
+            hit, result = self._cached(key)
+            if hit:
+                return result
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.upstream_calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                # A forgotten call is already detached and its result must not be cached.
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                    if call.error is None:
+                        self._remember(key, call.result)
+            call.done.set()
+
+
+class AsyncSingleFlight(_Group):
+    """
+    asyncio counterpart of SingleFlight. The upstream call runs as its own task, so a
+    caller that is cancelled (e.g. by a tool timeout) does not cancel it for the others.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        super().__init__(name, ttl)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is not task:
+            return
+        del self._calls[key]
+        if not task.cancelled() and task.exception() is None:
+            self._remember(key, task.result())
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        self.requests += 1
+        hit, result = self._cached(key)
+        if hit:
+            return result
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.get_running_loop().create_task(fn(*args, **kwargs))
+            task.add_done_callback(lambda finished: self._finished(key, finished))
+            self.upstream_calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+def stats() -> Dict[str, Any]:
+    return {group.name: group.stats() for group in _groups}
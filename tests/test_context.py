@@ -0,0 +1,89 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.bot.context import ContextAssembler
+
+
+class WordEncoding:
+    """
+    One token per space-separated word, so sizes in the tests are exact
+    """
+
+    def encode(self, text):
+        return text.split(" ")
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def assembler(**kwargs) -> ContextAssembler:
+    context = ContextAssembler(**kwargs)
+    context._encoding = WordEncoding()
+    return context
+
+
+def parallel_turn(results: int, size: int):
+    calls = [{"name": "get_price", "args": {"instrument": f"PAIR_{index}"}, "id": f"call_{index}"}
+             for index in range(results)]
+    return [
+        HumanMessage(content="older question", id="h0"),
+        AIMessage(content="older answer", id="a0"),
+        HumanMessage(content="price every pair I hold", id="h1"),
+        AIMessage(content="", tool_calls=calls, id="a1"),
+        *[ToolMessage(content=" ".join(["tick"] * size), tool_call_id=call["id"], id=f"t{index}")
+          for index, call in enumerate(calls)]
+    ]
+
+
+def test_parallel_tool_results_larger_than_the_budget_are_cut_not_dropped():
+    context = assembler(budget=6000, memory_budget=1000, tool_message_limit=1500)
+    messages = parallel_turn(results=4, size=2000)
+
+    prompt, used = context.assemble("You are a trading assistant", [], messages)
+
+    assert used <= context.budget
+    assert isinstance(prompt[0], SystemMessage)
+    assert [type(message) for message in prompt[-6:]] == [HumanMessage, AIMessage, *[ToolMessage] * 4]
+    assert prompt[-6].content == "price every pair I hold"
+    assert [message.tool_call_id for message in prompt[-4:]] == [f"call_{index}" for index in range(4)]
+    assert all("[truncated" in message.content for message in prompt[-4:])
+
+
+def test_small_tool_results_are_kept_whole_when_a_sibling_is_cut():
+    context = assembler(budget=3000, memory_budget=0, tool_message_limit=5000)
+    messages = parallel_turn(results=2, size=10)
+    messages[-1] = messages[-1].model_copy(update={"content": " ".join(["tick"] * 4000)})
+
+    prompt, used = context.assemble("system", [], messages)
+
+    assert used <= context.budget
+    assert prompt[-2].content == messages[-2].content
+    assert "[truncated" in prompt[-1].content
+
+
+def test_older_units_are_dropped_whole():
+    context = assembler(budget=200, memory_budget=0)
+    calls = [{"name": "get_positions", "args": {}, "id": "old"}]
+    messages = [
+        HumanMessage(content="positions?", id="h0"),
+        AIMessage(content="", tool_calls=calls, id="a0"),
+        ToolMessage(content=" ".join(["row"] * 300), tool_call_id="old", id="t0"),
+        AIMessage(content="you hold three", id="a1"),
+        HumanMessage(content="thanks", id="h1"),
+    ]
+
+    prompt, _ = context.assemble("system", [], messages)
+
+    assert not any(isinstance(message, ToolMessage) for message in prompt)
+    assert not any(getattr(message, "tool_calls", None) for message in prompt)
+    assert prompt[-1].content == "thanks"
+
+
+def test_counts_are_estimated_when_the_tokenizer_cannot_load(monkeypatch):
+    def offline(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr("tiktoken.encoding_for_model", offline)
+    context = ContextAssembler()
+
+    assert context.count(HumanMessage(content="x" * 40)) == 10 + 4
+    assert context.stats()["estimating"]
@@ -0,0 +1,47 @@
+import asyncio
+
+from src.infrastructure.oanda_api.price_hub import PriceHub
+
+
+TIMES = ["2024-05-01T12:00:00.000000001Z", "2024-05-01T12:00:00.500000000Z", "2024-05-01T12:00:01.000000000Z"]
+
+
+class ReplayService:
+    """
+    Streams the same three ticks per instrument on every connection, like OANDA does
+    for overlapping instrument sets
+    """
+
+    async def stream_pricing(self, instruments):
+        for time in TIMES:
+            for instrument in instruments:
+                yield {"type": "PRICE", "instrument": instrument, "time": time,
+                       "bids": [{"price": "1.1"}], "asks": [{"price": "1.2"}]}
+            await asyncio.sleep(0)
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+def test_listeners_see_each_tick_once_across_overlapping_subscriptions():
+    async def run():
+        hub = PriceHub(service_factory=ReplayService)
+        seen = []
+        hub.add_listener(seen.append)
+        euro = hub.subscribe(["EUR_USD"])
+        both = hub.subscribe(["EUR_USD", "GBP_USD"])
+        euro_ticks = [await euro.get() for _ in TIMES]
+        both_ticks = [await both.get() for _ in range(2 * len(TIMES))]
+        await hub.close()
+        return hub, seen, euro_ticks, both_ticks
+
+    hub, seen, euro_ticks, both_ticks = asyncio.run(run())
+
+    # Every subscription still gets its own stream in full.
+    assert [tick["time"] for tick in euro_ticks] == TIMES
+    assert sorted(tick["instrument"] for tick in both_ticks) == ["EUR_USD"] * 3 + ["GBP_USD"] * 3
+    # Listeners get each (instrument, time) once.
+    assert sorted((tick["instrument"], tick["time"]) for tick in seen) == \
+        sorted((instrument, time) for instrument in ("EUR_USD", "GBP_USD") for time in TIMES)
+    assert hub.duplicates == len(TIMES)
@@ -0,0 +1,31 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.bot.response_cache import ResponseCache
+
+
+def decision(tool: str) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": tool, "args": {}, "id": "call_1"}], id="run-1")
+
+
+def test_read_only_tool_decisions_are_replayed_with_fresh_ids():
+    cache = ResponseCache(enabled=True)
+    prompt = [HumanMessage(content="What are my open positions?")]
+
+    asyncio.run(cache.store(None, prompt, decision("get_active_positions")))
+    replay = asyncio.run(cache.lookup(None, prompt))
+
+    assert [call["name"] for call in replay.tool_calls] == ["get_active_positions"]
+    assert replay.tool_calls[0]["id"] != "call_1"
+    assert replay.id != "run-1"
+
+
+def test_order_decisions_are_never_cached():
+    cache = ResponseCache(enabled=True)
+    prompt = [HumanMessage(content="Buy 1000 EUR_USD")]
+
+    asyncio.run(cache.store(None, prompt, decision("place_trade")))
+
+    assert asyncio.run(cache.lookup(None, prompt)) is None
+    assert cache.stats()["size"] == 0